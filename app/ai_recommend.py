@@ -1,7 +1,19 @@
+import asyncio
+import hashlib
+import json
 import os
-from typing import Optional
+import queue
+import threading
+import time
+import unicodedata
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from huggingface_hub import InferenceClient
+from huggingface_hub import AsyncInferenceClient, InferenceClient
+
+from app.cache import MemoryLRUCache, TieredCache, open_disk_cache
+from app.metrics import inc, observe, span
+from app.scheduler import AcquireAborted, ApiScheduler, QuotaWaitTimeout, current_priority, get_scheduler, priority
+from app.singleflight import SingleFlight
 
 
 class AIRecommendError(Exception):
@@ -11,24 +23,53 @@ class AIRecommendError(Exception):
 
 HF_DYNAMIC_TOKEN: Optional[str] = None
 
+# Itt TUDSZ MODELLT CSERÉLNI ha kell
+# Olyat válassz, ami támogatja a chat / conversational hívást.
+MODEL_ID = "meta-llama/Meta-Llama-3-8B-Instruct"
+
+# Meleg kliensek (token, model_id) szerint – nem építünk újat minden hívásnál
+_clients: Dict[Tuple[str, str], InferenceClient] = {}
+_clients_lock = threading.Lock()
+
 
 def set_hf_token(token: str) -> None:
     """GUI-ból beállított HF token (csak memóriában)."""
     global HF_DYNAMIC_TOKEN
     HF_DYNAMIC_TOKEN = token.strip()
+    _drop_clients(keep_token=HF_DYNAMIC_TOKEN)
 
 
 def clear_hf_token() -> None:
     global HF_DYNAMIC_TOKEN
     HF_DYNAMIC_TOKEN = None
+    _drop_clients(keep_token=os.getenv("HF_API_TOKEN"))
 
 
-def _get_hf_client() -> InferenceClient:
+def set_model(model_id: str) -> None:
     """
-    InferenceClient:
-    - ha van GUI-ból beállított token → azt használja
-    - különben HF_API_TOKEN környezeti változót
+    Modell cseréje futás közben.
+    A korábbi modellek kliensei a registryben maradnak, visszaváltáskor újra melegek.
     """
+    global MODEL_ID
+    model_id = (model_id or "").strip()
+    if not model_id:
+        raise AIRecommendError("Üres modell azonosítót nem lehet beállítani.")
+    MODEL_ID = model_id
+
+
+def get_model() -> str:
+    return MODEL_ID
+
+
+def _drop_clients(keep_token: Optional[str] = None) -> None:
+    """Token váltáskor a többi tokenhez tartozó kliensek eldobása."""
+    with _clients_lock:
+        for key in [k for k in _clients if k[0] != keep_token]:
+            del _clients[key]
+
+
+def _hf_token() -> str:
+    """GUI-ból beállított token, különben HF_API_TOKEN környezeti változó."""
     if HF_DYNAMIC_TOKEN:
         token = HF_DYNAMIC_TOKEN
     else:
@@ -39,48 +80,148 @@ def _get_hf_client() -> InferenceClient:
             "Nincs HuggingFace API token megadva.\n"
             "Beállítások menüben add meg, vagy állítsd be HF_API_TOKEN környezeti változóként."
         )
+    return token
+
+
+def _get_hf_client(model_id: Optional[str] = None) -> InferenceClient:
+    """
+    InferenceClient:
+    - ha van GUI-ból beállított token → azt használja
+    - különben HF_API_TOKEN környezeti változót
+    Ugyanarra a (token, modell) párra mindig ugyanazt a klienst adja vissza.
+    """
+    token = _hf_token()
+    key = (token, model_id or MODEL_ID)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # HF_BASE_URL: OpenAI-kompatibilis végpont (pl. helyi stub a benchmarkokhoz)
+            base_url = os.getenv("HF_BASE_URL")
+            if base_url:
+                client = InferenceClient(base_url=base_url, token=token)
+            else:
+                client = InferenceClient(model=key[1], token=token)
+            _clients[key] = client
+    return client
+
+
+SYSTEM_PROMPT = (
+    "Te egy utazási tanácsadó asszisztens vagy. "
+    "A felhasználó leírja, milyen jellegű utazást szeretne "
+    "(pl. 'északi ország, látványos drónozásra alkalmas helyekkel, "
+    "ne legyen túl hideg'), te pedig 3–5 konkrét úti célt ajánlasz.\n\n"
+    "Fontos:\n"
+    "- Valós városokat/régiókat mondj.\n"
+    "- Ne csak Olaszországot ismételgesd; nézd meg, mire kérdez rá (északi, tengerpart, hegyek, stb.).\n"
+    "- Írj rövid leírást mindegyikhez (1–3 mondat), felsorolásban.\n"
+)
+
+# Mintavételezési paraméterek (a sima és a streamelt hívás is ezeket használja)
+GENERATION_PARAMS = {
+    "max_tokens": 600,
+    "temperature": 0.7,
+    "top_p": 0.9,
+}
+
+
+def _build_messages(user_request: str) -> list:
+    text = (user_request or "").strip()
+    if not text:
+        raise AIRecommendError("Üres kérést nem küldhetsz az AI-nak.")
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ]
+
+
+# ==== Válasz cache (memória LRU + lemez) ====
+AI_CACHE_TTL = 24 * 3600.0
+
+_ai_cache: Optional[TieredCache] = None
+
+
+def get_ai_cache() -> TieredCache:
+    """Közös AI válasz cache (lustán jön létre; lemez nélkül is működik)."""
+    global _ai_cache
+    if _ai_cache is None:
+        _ai_cache = TieredCache(
+            MemoryLRUCache(max_entries=256),
+            open_disk_cache("ai_answers.sqlite3", max_entries=2000),
+        )
+    return _ai_cache
+
+
+def normalize_prompt(user_request: str) -> str:
+    """
+    Cache kulcshoz: kisbetűs, írásjelek nélküli, egyszeres szóközös alak.
+    Így pl. "Északi ország, drónozás!" és "északi ország drónozás" ugyanaz.
+    """
+    text = (user_request or "").casefold()
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P") else ch for ch in text
+    )
+    return " ".join(text.split())
+
+
+def _cache_key(user_request: str, model_id: str) -> str:
+    """Kulcs: normalizált prompt + modell + system prompt + mintavételezési paraméterek."""
+    raw = json.dumps(
+        [normalize_prompt(user_request), model_id, SYSTEM_PROMPT, GENERATION_PARAMS],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-    # Itt TUDSZ MODELLT CSERÉLNI ha kell
-    # Olyat válassz, ami támogatja a chat / conversational hívást.
-    model_id = "meta-llama/Meta-Llama-3-8B-Instruct"
 
-    return InferenceClient(model=model_id, token=token)
+_ai_flight = SingleFlight("ai")
 
 
-def ask_travel_ai(user_request: str) -> str:
+def ask_travel_ai(user_request: str, use_cache: bool = True) -> str:
     """
     Egyszerű chat-szerű hívás.
     Bemenet: felhasználói kérés.
     Kimenet: a modell teljes válasza szövegként (ezt fogjuk betolni a QTextEdit-be).
+    use_cache=False: a cache megkerülése (friss generálás, de az eredményt eltároljuk).
     """
-    text = (user_request or "").strip()
-    if not text:
-        raise AIRecommendError("Üres kérést nem küldhetsz az AI-nak.")
+    messages = _build_messages(user_request)
+    model_id = MODEL_ID
 
-    client = _get_hf_client()
-
-    system_msg = (
-        "Te egy utazási tanácsadó asszisztens vagy. "
-        "A felhasználó leírja, milyen jellegű utazást szeretne "
-        "(pl. 'északi ország, látványos drónozásra alkalmas helyekkel, "
-        "ne legyen túl hideg'), te pedig 3–5 konkrét úti célt ajánlasz.\n\n"
-        "Fontos:\n"
-        "- Valós városokat/régiókat mondj.\n"
-        "- Ne csak Olaszországot ismételgesd; nézd meg, mire kérdez rá (északi, tengerpart, hegyek, stb.).\n"
-        "- Írj rövid leírást mindegyikhez (1–3 mondat), felsorolásban.\n"
-    )
+    key = _cache_key(user_request, model_id)
+    if use_cache:
+        cached = get_ai_cache().get(key)
+        if cached is not None:
+            inc("ai_cache.hit")
+            return cached
+        inc("ai_cache.miss")
+
+    # azonos (normalizált) kérdésre már futó generálás eredményét kapjuk meg
+    return _ai_flight.do(key, _generate_answer, messages, model_id, key)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """HF 429 (Too Many Requests) – a huggingface_hub HTTP hibáin response is van."""
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def _generate_answer(messages: list, model_id: str, key: str) -> str:
+    client = _get_hf_client(model_id)
 
     try:
-        completion = client.chat_completion(
-            messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": text},
-            ],
-            max_tokens=600,
-            temperature=0.7,
-            top_p=0.9,
-        )
+        # kvóta / prioritás: a "hf" ütemező adja a helyet (429-nél visszafog)
+        with get_scheduler("hf").slot() as slot:
+            try:
+                with span("hf.chat_completion"):
+                    completion = client.chat_completion(messages=messages, **GENERATION_PARAMS)
+            except Exception as e:
+                if _is_rate_limited(e):
+                    slot.throttled()
+                raise
+    except QuotaWaitTimeout as e:
+        raise AIRecommendError(f"Az AI szolgáltatás most foglalt, próbáld újra később ({e}).") from e
     except Exception as e:
+        inc("hf.errors")
         raise AIRecommendError(f"Hiba a HuggingFace híváskor: {e}") from e
 
     # új HF InferenceClient.chat_completion válaszstruktúra
@@ -91,4 +232,285 @@ def ask_travel_ai(user_request: str) -> str:
             f"Nem sikerült kiolvasni az AI válaszát: {e}\nNyers válasz: {completion}"
         ) from e
 
-    return content.strip()
+    answer = content.strip()
+    get_ai_cache().set(key, answer, AI_CACHE_TTL)
+    return answer
+
+
+def ask_travel_ai_stream(
+    user_request: str,
+    should_stop: Optional[Callable[[], bool]] = None,
+    use_cache: bool = True,
+) -> Iterator[str]:
+    """
+    Streamelt változat: a válasz darabjait (tokeneket) adja vissza, ahogy megérkeznek.
+    Ha should_stop() igazat ad, a generálást idő előtt abbahagyjuk.
+    Cache találatnál a teljes válasz egy darabban jön; csak a végigfutott
+    (nem leállított) generálás kerül a cache-be.
+    """
+    messages = _build_messages(user_request)
+    model_id = MODEL_ID
+
+    key = _cache_key(user_request, model_id)
+    if use_cache:
+        cached = get_ai_cache().get(key)
+        if cached is not None:
+            inc("ai_cache.hit")
+            yield cached
+            return
+        inc("ai_cache.miss")
+
+    client = _get_hf_client(model_id)
+
+    # a stream a teljes generálás alatt foglal egy párhuzamos helyet
+    scheduler = get_scheduler("hf")
+    try:
+        scheduler.acquire()
+    except QuotaWaitTimeout as e:
+        raise AIRecommendError(f"Az AI szolgáltatás most foglalt, próbáld újra később ({e}).") from e
+
+    started = time.perf_counter()
+    try:
+        stream = client.chat_completion(messages=messages, stream=True, **GENERATION_PARAMS)
+    except Exception as e:
+        scheduler.release(throttled=_is_rate_limited(e))
+        inc("hf.errors")
+        raise AIRecommendError(f"Hiba a HuggingFace híváskor: {e}") from e
+
+    parts = []
+    completed = False
+    throttled = False
+    try:
+        for chunk in stream:
+            if should_stop is not None and should_stop():
+                break
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not parts:
+                    observe("hf.stream.first_token", (time.perf_counter() - started) * 1000.0)
+                parts.append(delta)
+                yield delta
+        else:
+            completed = True
+    except Exception as e:
+        throttled = _is_rate_limited(e)
+        inc("hf.errors")
+        raise AIRecommendError(f"Hiba a HuggingFace válasz olvasásakor: {e}") from e
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+        scheduler.release(throttled)
+        # a teljes idő a fogyasztó (pl. GUI) tempóját is tartalmazza
+        observe("hf.stream.total", (time.perf_counter() - started) * 1000.0)
+        inc("hf.stream.chunks", len(parts))
+
+    if completed and parts:
+        get_ai_cache().set(key, "".join(parts).strip(), AI_CACHE_TTL)
+
+
+# ==== Kötegelt ajánlás: sok prompt párhuzamosan (AsyncInferenceClient) ====
+# egyszerre legfeljebb ennyi kérés fut; a "hf" ütemező korlátja ezen felül is érvényes
+AI_BATCH_CONCURRENCY = 4
+
+# egy kérés időkorlátja (mp), a kvótára várakozás nem számít bele
+AI_BATCH_TIMEOUT = 120.0
+
+
+class BatchAnswer(NamedTuple):
+    index: int                         # a prompt helye a bemenetben
+    prompt: str
+    answer: Optional[str]              # None, ha hiba volt
+    error: Optional[AIRecommendError]
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _get_async_hf_client(model_id: str) -> AsyncInferenceClient:
+    """Kötegenként új kliens: a HTTP kapcsolatai a köteg eseményhurkához tartoznak."""
+    token = _hf_token()
+    base_url = os.getenv("HF_BASE_URL")
+    if base_url:
+        return AsyncInferenceClient(base_url=base_url, token=token)
+    return AsyncInferenceClient(model=model_id, token=token)
+
+
+async def _acquire_async(scheduler: ApiScheduler, level: int) -> None:
+    """
+    A blokkoló ApiScheduler.acquire külön szálon, megszakítható várakozással:
+    ha közben a kérést visszavonják (időkorlát, köteg leállítása), a jegy
+    kikerül a sorból, a szál azonnal visszatér, a már megkapott hely pedig
+    visszakerül – nem foglal később tokent a közös keretből.
+    """
+    abort = threading.Event()
+    acquiring = asyncio.ensure_future(asyncio.to_thread(scheduler.acquire, level, None, abort))
+    try:
+        await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        scheduler.abort(abort)
+        try:
+            await acquiring
+        except (AcquireAborted, QuotaWaitTimeout):
+            pass
+        else:
+            # a hely épp a visszavonás előtt jött meg
+            scheduler.release()
+        raise
+
+
+async def _generate_answer_async(
+    client: AsyncInferenceClient, messages: list, key: str, level: int, timeout: float
+) -> str:
+    scheduler = get_scheduler("hf")
+    try:
+        await _acquire_async(scheduler, level)
+    except QuotaWaitTimeout as e:
+        raise AIRecommendError(f"Az AI szolgáltatás most foglalt, próbáld újra később ({e}).") from e
+
+    throttled = False
+    try:
+        with span("hf.chat_completion"):
+            completion = await asyncio.wait_for(
+                client.chat_completion(messages=messages, **GENERATION_PARAMS), timeout
+            )
+    except asyncio.TimeoutError as e:
+        inc("hf.timeouts")
+        raise AIRecommendError(f"Az AI nem válaszolt {timeout:g} mp alatt.") from e
+    except Exception as e:
+        throttled = _is_rate_limited(e)
+        inc("hf.errors")
+        raise AIRecommendError(f"Hiba a HuggingFace híváskor: {e}") from e
+    finally:
+        scheduler.release(throttled)
+
+    try:
+        content = completion.choices[0].message["content"]
+    except Exception as e:
+        raise AIRecommendError(
+            f"Nem sikerült kiolvasni az AI válaszát: {e}\nNyers válasz: {completion}"
+        ) from e
+
+    answer = content.strip()
+    get_ai_cache().set(key, answer, AI_CACHE_TTL)
+    return answer
+
+
+async def ask_travel_ai_batch_async(
+    prompts: Iterable[str],
+    max_concurrency: int = AI_BATCH_CONCURRENCY,
+    timeout: float = AI_BATCH_TIMEOUT,
+    use_cache: bool = True,
+) -> AsyncIterator[BatchAnswer]:
+    """
+    Sok prompt egyszerre; az eredmények elkészülési sorrendben jönnek
+    (BatchAnswer.index mutatja a bemeneti helyet). Egy hibás / lassú kérés
+    csak a saját elemét rontja el (error mezőben), a köteg fut tovább.
+    A cache-ben lévő válaszok azonnal jönnek; az azonos (normalizált)
+    promptokra egyetlen kérés megy ki.
+    """
+    prompts = list(prompts)
+    model_id = MODEL_ID
+    level = current_priority()
+
+    pending: Dict[str, Tuple[list, List[int]]] = {}  # cache kulcs → (messages, indexek)
+    for index, prompt in enumerate(prompts):
+        try:
+            messages = _build_messages(prompt)
+        except AIRecommendError as e:
+            yield BatchAnswer(index, prompt, None, e)
+            continue
+        key = _cache_key(prompt, model_id)
+        if use_cache:
+            cached = get_ai_cache().get(key)
+            if cached is not None:
+                inc("ai_cache.hit")
+                yield BatchAnswer(index, prompt, cached, None, cached=True)
+                continue
+            inc("ai_cache.miss")
+        if key in pending:
+            inc("singleflight.ai.saved")
+            pending[key][1].append(index)
+        else:
+            pending[key] = (messages, [index])
+
+    if not pending:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(key: str, client: AsyncInferenceClient):
+        async with semaphore:
+            try:
+                return key, await _generate_answer_async(client, pending[key][0], key, level, timeout), None
+            except AIRecommendError as e:
+                return key, None, e
+
+    async with _get_async_hf_client(model_id) as client:
+        tasks = [asyncio.ensure_future(run(key, client)) for key in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, answer, error = await next_done
+                for index in pending[key][1]:
+                    yield BatchAnswer(index, prompts[index], answer, error)
+        finally:
+            # leállításkor a még futó / várakozó kérések visszavonása
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def ask_travel_ai_batch(
+    prompts: Iterable[str],
+    max_concurrency: int = AI_BATCH_CONCURRENCY,
+    timeout: float = AI_BATCH_TIMEOUT,
+    use_cache: bool = True,
+) -> Iterator[BatchAnswer]:
+    """
+    Mint az ask_travel_ai_batch_async, szálas hívóknak (GUI TaskRunner, CLI):
+    a köteg saját eseményhurokban, háttérszálon fut. A generátor idő előtti
+    lezárása a még futó kéréseket visszavonja.
+    """
+    prompts = list(prompts)
+    level = current_priority()
+    results: "queue.Queue" = queue.Queue()
+    finished = object()
+    started = threading.Event()
+    runner = {}
+
+    async def pump():
+        runner["loop"], runner["task"] = asyncio.get_running_loop(), asyncio.current_task()
+        started.set()
+        try:
+            # a hívó szál prioritása (pl. háttér) a köteg kéréseire is érvényes
+            with priority(level):
+                async for item in ask_travel_ai_batch_async(prompts, max_concurrency, timeout, use_cache):
+                    results.put(item)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(finished)
+
+    thread = threading.Thread(target=asyncio.run, args=(pump(),), name="ai-batch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        if thread.is_alive():
+            started.wait()
+            try:
+                runner["loop"].call_soon_threadsafe(runner["task"].cancel)
+            except RuntimeError:
+                pass  # közben lefutott, a hurok már zárva
@@ -0,0 +1,272 @@
+"""
+Offline repülős becslés: helyi repülőtér adatbázis + rácsos térbeli index.
+
+A "Repülő" mód így nem kér driving útvonalat a Directions API-tól (ami lassú,
+kvótát fogyaszt, óceánon át pedig el sem készül): a helyeket a beépített
+adatbázisból oldjuk fel, a legközelebbi nagy repülőtérre illesztjük, és a
+két repülőtér közti gömbi (haversine) távolsággal számolunk – hálózat nélkül.
+
+    est = estimate_flight("Budapest", "Lisszabon")
+    est.distance_km, est.origin.iata, est.destination.iata
+"""
+import csv
+import os
+import re
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.gazetteer import get_gazetteer, normalize_place
+from app.route_info import RouteInfo
+
+EARTH_RADIUS_KM = 6371.0088
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "airports.csv")
+
+# rács cellamérete (fok); ~170 repülőtérnél ez pár tucat nem üres cella
+GRID_CELL_DEG = 10.0
+
+# egyszerű menetidő modell: fel- / leszállás, gurulás + utazósebesség
+FLIGHT_OVERHEAD_MIN = 30.0
+FLIGHT_CRUISE_KMH = 800.0
+
+
+class FlightEstimateError(Exception):
+    """A hely nem oldható fel offline (nincs a repülőtér adatbázisban)."""
+    pass
+
+
+class Airport(NamedTuple):
+    iata: str
+    name: str
+    city: str
+    country: str
+    lat: float
+    lon: float
+
+
+class FlightEstimate(NamedTuple):
+    origin: Airport
+    destination: Airport
+    distance_km: float
+    duration_min: float
+
+    def to_route_info(self) -> RouteInfo:
+        """A get_route_info() eredményével azonos típus (GUI / CLI számára)."""
+        return RouteInfo(
+            distance_km=self.distance_km,
+            duration_min=self.duration_min,
+            origin_airport=f"{self.origin.iata} – {self.origin.name}",
+            destination_airport=f"{self.destination.iata} – {self.destination.name}",
+        )
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Gömbi távolság (km); skalárt vagy tömböt is elfogad (broadcasting)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class AirportIndex:
+    """
+    Tömb alapú repülőtér index: koordináták float64 tömbökben, a rács cellái
+    szerint rendezve (cella → [kezdet, vég) szelet), így a legközelebbi
+    repülőtér keresése csak a környező cellákat vizsgálja.
+    """
+
+    __slots__ = ("airports", "lat", "lon", "_cells", "_order", "_names", "_n_lat", "_n_lon")
+
+    def __init__(self, airports: List[Airport], names: dict):
+        self.airports = airports
+        self.lat = np.array([a.lat for a in airports], dtype=np.float64)
+        self.lon = np.array([a.lon for a in airports], dtype=np.float64)
+        self._names = names
+        self._n_lat = int(np.ceil(180.0 / GRID_CELL_DEG))
+        self._n_lon = int(np.ceil(360.0 / GRID_CELL_DEG))
+
+        cell = self._cell_id(*self._cell_of(self.lat, self.lon))
+        self._order = np.argsort(cell, kind="stable")
+        self._cells = cell[self._order]
+
+    @classmethod
+    def load(cls, path: str = DATA_PATH) -> "AirportIndex":
+        airports = []
+        names = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                idx = len(airports)
+                airports.append(Airport(
+                    row["iata"], row["name"], row["city"], row["country"],
+                    float(row["lat"]), float(row["lon"]),
+                ))
+                names.setdefault(row["iata"].casefold(), idx)
+                for alias in [row["city"]] + (row.get("aliases") or "").split("|"):
+                    if alias.strip():
+                        # több repülőtér egy városban: az első (a fő) nyer
+                        names.setdefault(normalize_place(alias), idx)
+        return cls(airports, names)
+
+    def __len__(self) -> int:
+        return len(self.airports)
+
+    def _cell_of(self, lat, lon):
+        row = np.clip(((np.asarray(lat) + 90.0) // GRID_CELL_DEG).astype(int), 0, self._n_lat - 1)
+        col = ((np.asarray(lon) + 180.0) // GRID_CELL_DEG).astype(int) % self._n_lon
+        return row, col
+
+    def _cell_id(self, row, col):
+        return row * self._n_lon + col
+
+    def _candidates(self, row: int, col: int, ring: int) -> np.ndarray:
+        """A (row, col) körüli, pontosan ring távolságú cellák repülőterei."""
+        rows = range(max(0, row - ring), min(self._n_lat - 1, row + ring) + 1)
+        span = min(ring, self._n_lon // 2)
+        ids = []
+        for r in rows:
+            if abs(r - row) == ring:
+                cols = range(col - span, col + span + 1)
+            else:
+                cols = {col - span, col + span}
+            for c in set(cc % self._n_lon for cc in cols):
+                ids.append(r * self._n_lon + c)
+        ids = np.asarray(ids)
+        starts = np.searchsorted(self._cells, ids, side="left")
+        ends = np.searchsorted(self._cells, ids, side="right")
+        if not len(ids) or not (ends > starts).any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._order[s:e] for s, e in zip(starts, ends)])
+
+    def _searched_bound_km(self, lat: float, lon: float, row: int, col: int, ring: int) -> float:
+        """Alsó korlát a még nem vizsgált cellák bármely pontjáig (km)."""
+        lat_lo = (row - ring) * GRID_CELL_DEG - 90.0
+        lat_hi = (row + ring + 1) * GRID_CELL_DEG - 90.0
+        bounds = []
+        if lat_lo > -90.0:
+            bounds.append(np.radians(lat - lat_lo) * EARTH_RADIUS_KM)
+        if lat_hi < 90.0:
+            bounds.append(np.radians(lat_hi - lat) * EARTH_RADIUS_KM)
+        if 2 * ring + 1 < self._n_lon:
+            lon_lo = (col - ring) * GRID_CELL_DEG - 180.0
+            lon_hi = (col + ring + 1) * GRID_CELL_DEG - 180.0
+            dlon = np.radians(min(lon - lon_lo, lon_hi - lon))
+            # gömbi távolság a legközelebbi határoló félmeridiánig
+            # (90° fölött annak legközelebbi pontja már a pólus)
+            if dlon < np.pi / 2:
+                bounds.append(np.arcsin(np.sin(dlon) * np.cos(np.radians(lat))) * EARTH_RADIUS_KM)
+            else:
+                bounds.append(np.radians(90.0 - abs(lat)) * EARTH_RADIUS_KM)
+        return min(bounds) if bounds else float("inf")
+
+    def nearest(self, lat: float, lon: float) -> Tuple[Airport, float]:
+        """Legközelebbi repülőtér és a távolsága (km)."""
+        row, col = (int(v) for v in self._cell_of(lat, lon))
+        best_idx, best_km = -1, float("inf")
+        max_ring = max(self._n_lat, self._n_lon // 2)
+        for ring in range(max_ring + 1):
+            cand = self._candidates(row, col, ring)
+            if len(cand):
+                dist = haversine_km(lat, lon, self.lat[cand], self.lon[cand])
+                k = int(np.argmin(dist))
+                if dist[k] < best_km:
+                    best_idx, best_km = int(cand[k]), float(dist[k])
+            if best_idx >= 0 and best_km <= self._searched_bound_km(lat, lon, row, col, ring):
+                break
+        if best_idx < 0:
+            raise FlightEstimateError("Üres repülőtér adatbázis.")
+        return self.airports[best_idx], best_km
+
+    def lookup(self, place: str) -> Optional[Airport]:
+        """IATA kód, város vagy alias alapján (pl. "FCO", "Róma", "Roma, Italy")."""
+        text = place.strip()
+        if not text:
+            return None
+        idx = self._names.get(text.casefold()) if len(text) == 3 else None
+        if idx is None:
+            idx = self._names.get(normalize_place(text))
+        if idx is None and "," in text:
+            # "Budapest, Magyarország" → "Budapest"
+            idx = self._names.get(normalize_place(text.split(",", 1)[0]))
+        return self.airports[idx] if idx is not None else None
+
+    def match(self, place: str) -> Airport:
+        """
+        Hely → repülőtér: közvetlen találat (IATA / város / alias), különben
+        "lat, lon" koordinátából vagy a helynév indexből (app.gazetteer)
+        a legközelebbi repülőtér.
+        """
+        airport = self.lookup(place)
+        if airport is not None:
+            return airport
+        coords = parse_coordinates(place)
+        if coords is None:
+            gazetteer = get_gazetteer()
+            found = gazetteer.find(place) if gazetteer is not None else None
+            if found is not None:
+                coords = (found.lat, found.lon)
+        if coords is None:
+            raise FlightEstimateError(f"Ismeretlen hely a repülőtér adatbázisban: {place}")
+        return self.nearest(*coords)[0]
+
+
+_COORD_RE = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*[,;]\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+def parse_coordinates(text: str) -> Optional[Tuple[float, float]]:
+    """"47.4979, 19.0402" → (47.4979, 19.0402); érvénytelen esetén None."""
+    m = _COORD_RE.match(text)
+    if not m:
+        return None
+    lat, lon = float(m.group(1)), float(m.group(2))
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return lat, lon
+
+
+_index: Optional[AirportIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index() -> AirportIndex:
+    """Közös index (első használatkor töltjük be)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AirportIndex.load()
+        return _index
+
+
+def flight_duration_min(distance_km):
+    return FLIGHT_OVERHEAD_MIN + np.asarray(distance_km) / FLIGHT_CRUISE_KMH * 60.0
+
+
+def estimate_flight(origin: str, destination: str) -> FlightEstimate:
+    """
+    Repülős távolság / idő hálózat nélkül: hely → repülőtér (név szerint vagy
+    a legközelebbi), majd a két repülőtér közti gömbi távolság.
+    """
+    index = get_airport_index()
+    origin_airport = index.match(origin)
+    destination_airport = index.match(destination)
+    distance = float(haversine_km(
+        origin_airport.lat, origin_airport.lon, destination_airport.lat, destination_airport.lon
+    ))
+    return FlightEstimate(origin_airport, destination_airport, distance, float(flight_duration_min(distance)))
+
+
+def get_flight_info(origin: str, destination: str, use_cache: bool = True) -> RouteInfo:
+    """
+    Offline becslés; ha valamelyik hely nincs az adatbázisban, a korábbi
+    módon driving útvonalból becsülünk (Directions API).
+    """
+    try:
+        return estimate_flight(origin, destination).to_route_info()
+    except FlightEstimateError as e:
+        from app.google_routes import get_route_info
+
+        info = get_route_info(origin, destination, "driving", use_cache=use_cache)
+        return info.with_warning(f"{e} – közúti távolság alapján becsülve.")
@@ -0,0 +1,110 @@
+"""
+Alternatív útvonalak beárazása és rangsorolása.
+
+A Directions alternatives=true válaszából kapott útvonalakat egyetlen
+vektorizált lépésben árazzuk be mindhárom költségmodellel (autó,
+tömegközlekedés, repülő), majd idő, költség vagy súlyozott pontszám
+szerint rendezzük:
+
+    score = w * idő / legjobb idő + (1 - w) * költség / legolcsóbb
+
+(1.0 = minden szempontból a legjobb; w = TIME_WEIGHT alapértelmezésben).
+"""
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.cost_model import car_cost, flight_cost, transit_cost
+from app.route_info import RouteInfo
+
+RANK_BY = ("time", "cost", "score")
+
+# a súlyozott pontszámban az idő súlya (a költségé 1 - TIME_WEIGHT)
+TIME_WEIGHT = 0.5
+
+# ha nincs beállított saját jármű (a járműbeállító ablak alapértékei)
+DEFAULT_CONSUMPTION = 7.0
+DEFAULT_FUEL_PRICE = 650.0
+
+
+class RankedRoute(NamedTuple):
+    rank: int
+    info: RouteInfo
+    duration_min: float  # forgalommal, ha van
+    car_ft: float
+    transit_ft: float    # ársáv közepe
+    flight_ft: float     # ársáv közepe
+    cost_ft: float       # a travelmode-hoz tartozó költség
+    score: float
+
+
+def rank_routes(
+    routes: Sequence[RouteInfo],
+    travelmode: str = "driving",
+    by: str = "time",
+    time_weight: float = TIME_WEIGHT,
+    consumption: Optional[float] = None,
+    fuel_price: Optional[float] = None,
+) -> List[RankedRoute]:
+    """Útvonalak rangsora (1. = legjobb); egyenlőségnél a Directions sorrendje marad."""
+    if by not in RANK_BY:
+        raise ValueError(f"Ismeretlen rangsor: {by} (lehet: {', '.join(RANK_BY)})")
+    if not routes:
+        return []
+
+    n = len(routes)
+    distance = np.fromiter((r.distance_km for r in routes), dtype=float, count=n)
+    duration = np.fromiter(
+        (r.traffic_duration_min if r.traffic_duration_min is not None else r.duration_min for r in routes),
+        dtype=float,
+        count=n,
+    )
+
+    # egy hívás modellenként, az összes alternatívára
+    car = car_cost(
+        distance,
+        DEFAULT_CONSUMPTION if consumption is None else consumption,
+        DEFAULT_FUEL_PRICE if fuel_price is None else fuel_price,
+    ).one_way
+    transit_band = transit_cost(distance)
+    transit = (transit_band.low_one_way + transit_band.high_one_way) / 2.0
+    flight_band = flight_cost(distance)
+    flight = (flight_band.low_one_way + flight_band.high_one_way) / 2.0
+    cost = transit if travelmode == "transit" else car
+
+    score = (
+        time_weight * duration / max(duration.min(), 1e-9)
+        + (1.0 - time_weight) * cost / max(cost.min(), 1e-9)
+    )
+    key = {"time": duration, "cost": cost, "score": score}[by]
+    order = np.argsort(key, kind="stable")
+
+    return [
+        RankedRoute(
+            rank=rank,
+            info=routes[i],
+            duration_min=float(duration[i]),
+            car_ft=float(car[i]),
+            transit_ft=float(transit[i]),
+            flight_ft=float(flight[i]),
+            cost_ft=float(cost[i]),
+            score=float(score[i]),
+        )
+        for rank, i in enumerate(order.tolist(), start=1)
+    ]
+
+
+def get_ranked_alternatives(
+    origin: str,
+    destination: str,
+    travelmode: str = "driving",
+    by: str = "time",
+    consumption: Optional[float] = None,
+    fuel_price: Optional[float] = None,
+    use_cache: bool = True,
+) -> List[RankedRoute]:
+    """Lekérés (alternatives=true) + rangsor; háttérszálból / CLI-ből hívható."""
+    from app.google_routes import get_route_alternatives
+
+    routes = get_route_alternatives(origin, destination, travelmode, use_cache=use_cache)
+    return rank_routes(routes, travelmode, by, consumption=consumption, fuel_price=fuel_price)
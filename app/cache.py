@@ -0,0 +1,250 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def default_cache_dir() -> str:
+    """
+    Cache könyvtár:
+    - TG_CACHE_DIR környezeti változó, ha be van állítva
+    - különben ~/.cache/travelling_guidance
+    """
+    path = os.getenv("TG_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "travelling_guidance"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def normalize_key_part(text: str) -> str:
+    """Kis/nagybetű és fölösleges szóközök nélküli alak (cache kulcsokhoz)."""
+    return " ".join((text or "").casefold().split())
+
+
+class DiskCache:
+    """
+    SQLite alapú kulcs–érték cache (JSON értékekkel).
+    - minden bejegyzésnek saját lejárata (TTL) van
+    - max_entries felett a legrégebben használt (LRU) bejegyzések törlődnek
+    - hits / misses számlálók
+    Több szálból is használható (egy kapcsolat + lock).
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)"
+        )
+        self._conn.commit()
+
+    def peek(self, key: str):
+        """(talált?, érték, lejárat) számlálók nélkül, a ráépülő cache-eknek; a lejárt bejegyzést törli."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None, None
+
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return False, None, None
+
+            self._conn.execute(
+                "UPDATE cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return True, json.loads(value), expires_at
+
+    def get(self, key: str, default: Any = None) -> Any:
+        found, value, _ = self.peek(key)
+        if not found:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Lejárt bejegyzések törlése, majd LRU szerint a méretkorlát betartása."""
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        return count
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_disk_cache(filename: str, max_entries: int = 5000) -> Optional[DiskCache]:
+    """
+    Cache megnyitása a default_cache_dir() alatt.
+    Ha nem sikerül (pl. csak olvasható home), None → a hívó cache nélkül megy tovább.
+    """
+    try:
+        return DiskCache(os.path.join(default_cache_dir(), filename), max_entries)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+class MemoryLRUCache:
+    """Egyszerű memóriabeli LRU cache lejárattal (TTL), méretkorláttal."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (expires_at, value)
+
+    def peek(self, key: str):
+        """(talált?, érték, lejárat) – számlálók nélkül."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None, None
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return False, None, None
+            self._data.move_to_end(key)
+            return True, value, expires_at
+
+    def get(self, key: str, default: Any = None) -> Any:
+        found, value, _ = self.peek(key)
+        if not found:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    Kétszintű cache: gyors memóriabeli LRU + (opcionális) DiskCache mögötte.
+    Lemezes találatnál az értéket a memóriaszintre is felhozzuk.
+    """
+
+    def __init__(self, memory: MemoryLRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        found, value, _ = self.memory.peek(key)
+        if not found and self.disk is not None:
+            found, value, expires_at = self.disk.peek(key)
+            if found:
+                # a memóriában rövidebb ideig tartjuk, de a lemezes lejáraton túl nem
+                ttl = min(300.0, expires_at - time.time())
+                if ttl > 0:
+                    self.memory.set(key, value, ttl)
+
+        if not found:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
@@ -0,0 +1,286 @@
+"""
+Parancssoros (GUI nélküli) kötegelt útvonal + költségbecslés.
+
+    python main.py batch trips.csv -o results.jsonl
+
+Bemenet: CSV (origin,destination,mode oszlopokkal) vagy JSONL.
+A sorokat folyamatosan olvassuk, korlátozott párhuzamossággal kérdezzük le,
+és az eredményeket azonnal, a bemenet sorrendjében írjuk ki – a teljes
+adathalmaz sosem kerül a memóriába. Ez a modul nem importál Qt-t.
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, NamedTuple, Optional, Union
+
+from app.airports import get_flight_info
+from app.alternatives import RANK_BY, get_ranked_alternatives
+from app.cost_model import car_cost, flight_cost, transit_cost
+from app.gazetteer import canonical_place
+from app.google_routes import RouteError, get_route_info
+from app.scheduler import BACKGROUND, priority
+
+# Bemeneti mód → (Google travelmode, GUI felirat)
+MODES = {
+    "driving": ("driving", "Autó"),
+    "car": ("driving", "Autó"),
+    "autó": ("driving", "Autó"),
+    "transit": ("transit", "Tömegközlekedés"),
+    "tömegközlekedés": ("transit", "Tömegközlekedés"),
+    # repülő: offline repülőtér index, driving csak tartalék (mint a GUI)
+    "flight": ("driving", "Repülő"),
+    "repülő": ("driving", "Repülő"),
+}
+
+OUTPUT_FIELDS = [
+    "row",
+    "origin",
+    "destination",
+    "mode",
+    "distance_km",
+    "duration_min",
+    "traffic_duration_min",
+    "cost_low_one_way",
+    "cost_high_one_way",
+    "cost_low_round_trip",
+    "cost_high_round_trip",
+    "error",
+]
+
+
+def _detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+class InvalidTrip(NamedTuple):
+    """Feldolgozhatatlan bemeneti sor – hibás sorként kerül a kimenetbe."""
+    reason: str
+
+
+def read_trips(stream, fmt: str) -> Iterator[Union[dict, InvalidTrip]]:
+    """
+    Soronként olvasó generátor (CSV fejléccel vagy JSONL).
+    Egy hibás JSONL sor nem állítja le a köteget: InvalidTrip jön helyette.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                trip = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield InvalidTrip(f"Hibás JSON sor: {e.msg} ({e.colno}. oszlop)")
+                continue
+            if not isinstance(trip, dict):
+                yield InvalidTrip(f"A sor nem JSON objektum, hanem {type(trip).__name__}.")
+                continue
+            yield trip
+
+
+def _error_row(row_no: int, message: str, trip: Optional[dict] = None) -> dict:
+    result = dict.fromkeys(OUTPUT_FIELDS)
+    result.update(row=row_no, error=message)
+    if isinstance(trip, dict):
+        result.update(origin=trip.get("origin"), destination=trip.get("destination"), mode=trip.get("mode"))
+    return result
+
+
+def estimate_trip(
+    row_no: int,
+    trip: Union[dict, InvalidTrip],
+    consumption: Optional[float],
+    fuel_price: Optional[float],
+    use_cache: bool,
+    rank_by: Optional[str] = None,
+) -> dict:
+    """
+    Egy sor feldolgozása; a hibát az eredménybe írjuk, nem dobjuk tovább.
+    rank_by: ha meg van adva, az alternatív útvonalak közül a legjobbat vesszük.
+    """
+    if isinstance(trip, InvalidTrip):
+        return _error_row(row_no, trip.reason)
+
+    origin = (trip.get("origin") or "").strip()
+    destination = (trip.get("destination") or "").strip()
+    mode_key = (trip.get("mode") or "driving").strip().casefold()
+
+    result = dict.fromkeys(OUTPUT_FIELDS)
+    result.update(row=row_no, origin=origin, destination=destination, mode=mode_key)
+
+    if not origin or not destination:
+        result["error"] = "Hiányzó origin / destination."
+        return result
+    if mode_key not in MODES:
+        result["error"] = f"Ismeretlen mód: {mode_key}"
+        return result
+
+    travelmode, mode_text = MODES[mode_key]
+    # ismert helyeknél kanonikus név → ugyanarra a helyre ugyanaz a cache kulcs
+    origin = canonical_place(origin)
+    destination = canonical_place(destination)
+    try:
+        if mode_text == "Repülő":
+            info = get_flight_info(origin, destination, use_cache=use_cache)
+        elif rank_by is not None:
+            info = get_ranked_alternatives(
+                origin, destination, travelmode, rank_by, consumption, fuel_price, use_cache
+            )[0].info
+        else:
+            info = get_route_info(origin, destination, travelmode, use_cache=use_cache)
+    except RouteError as e:
+        result["error"] = str(e)
+        return result
+
+    distance_km = info.distance_km
+    result.update(
+        distance_km=round(distance_km, 3),
+        duration_min=round(info.duration_min, 1),
+        traffic_duration_min=(
+            round(info.traffic_duration_min, 1)
+            if info.traffic_duration_min is not None else None
+        ),
+    )
+
+    if mode_text == "Autó":
+        if consumption is not None and fuel_price is not None:
+            car = car_cost(distance_km, consumption, fuel_price)
+            result.update(
+                cost_low_one_way=round(float(car.one_way)),
+                cost_high_one_way=round(float(car.one_way)),
+                cost_low_round_trip=round(float(car.round_trip)),
+                cost_high_round_trip=round(float(car.round_trip)),
+            )
+    else:
+        costs = flight_cost(distance_km) if mode_text == "Repülő" else transit_cost(distance_km)
+        result.update(
+            cost_low_one_way=round(float(costs.low_one_way)),
+            cost_high_one_way=round(float(costs.high_one_way)),
+            cost_low_round_trip=round(float(costs.low_round_trip)),
+            cost_high_round_trip=round(float(costs.high_round_trip)),
+        )
+    return result
+
+
+class _Writer:
+    """JSONL / CSV kimenet, soronként flush-olva."""
+
+    def __init__(self, stream, fmt: str):
+        self.stream = stream
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, result: dict) -> None:
+        if self.csv is not None:
+            self.csv.writerow(result)
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def _estimate_background(row_no: int, trip, *args) -> dict:
+    # kötegelt sor: háttér prioritás, az interaktív hívások megelőzik
+    with priority(BACKGROUND):
+        try:
+            return estimate_trip(row_no, trip, *args)
+        except Exception as e:
+            # egy sor váratlan hibája se vigye el a köteg többi (már kész) eredményét
+            return _error_row(row_no, f"Váratlan hiba: {type(e).__name__}: {e}", trip)
+
+
+def run_batch(
+    in_stream,
+    out_stream,
+    in_format: str,
+    out_format: str,
+    concurrency: int = 4,
+    consumption: Optional[float] = None,
+    fuel_price: Optional[float] = None,
+    use_cache: bool = True,
+    rank_by: Optional[str] = None,
+):
+    """
+    Kötegelt feldolgozás korlátos "ablakkal": egyszerre legfeljebb
+    concurrency * 4 sor van a memóriában / folyamatban.
+    Visszatér: (feldolgozott sorok, hibás sorok).
+    """
+    writer = _Writer(out_stream, out_format)
+    window = max(1, concurrency) * 4
+    pending = deque()
+    total = errors = 0
+
+    def flush_head():
+        nonlocal total, errors
+        result = pending.popleft().result()
+        writer.write(result)
+        total += 1
+        if result["error"]:
+            errors += 1
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for row_no, trip in enumerate(read_trips(in_stream, in_format), start=1):
+            pending.append(
+                pool.submit(_estimate_background, row_no, trip, consumption, fuel_price, use_cache, rank_by)
+            )
+            if len(pending) >= window:
+                flush_head()
+        while pending:
+            flush_head()
+
+    return total, errors
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Kötegelt útvonal- és költségbecslés CSV / JSONL fájlból.",
+    )
+    parser.add_argument("input", help="bemeneti fájl (CSV vagy JSONL), '-' = stdin")
+    parser.add_argument("-o", "--output", default="-", help="kimeneti fájl, '-' = stdout")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"))
+    parser.add_argument("--output-format", choices=("csv", "jsonl"))
+    parser.add_argument("-j", "--concurrency", type=int, default=4,
+                        help="párhuzamos lekérdezések száma (alapértelmezés: 4)")
+    parser.add_argument("--consumption", type=float,
+                        help="autó fogyasztása (l/100 km) az autós költséghez")
+    parser.add_argument("--fuel-price", type=float,
+                        help="üzemanyag ár (Ft / liter) az autós költséghez")
+    parser.add_argument("--no-cache", action="store_true", help="útvonal cache kihagyása")
+    parser.add_argument("--alternatives", choices=RANK_BY,
+                        help="alternatív útvonalak közül a legjobb: idő, költség vagy súlyozott pontszám szerint")
+    args = parser.parse_args(argv)
+
+    in_format = _detect_format(args.input, args.input_format)
+    out_format = _detect_format(args.output, args.output_format)
+
+    in_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        total, errors = run_batch(
+            in_stream,
+            out_stream,
+            in_format,
+            out_format,
+            concurrency=args.concurrency,
+            consumption=args.consumption,
+            fuel_price=args.fuel_price,
+            use_cache=not args.no_cache,
+            rank_by=args.alternatives,
+        )
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+    print(f"[OK] {total} sor feldolgozva, {errors} hibás.", file=sys.stderr)
+    return 0
@@ -0,0 +1,69 @@
+"""
+Költségmodellek (autó, repülő, tömegközlekedés) GUI nélkül, NumPy-val vektorizálva.
+Minden függvény skalárt vagy tömböt is elfogad (broadcasting), így egyetlen
+hívással akár több százezer útvonal is beárazható.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+class CostRange(NamedTuple):
+    """Becsült ársáv (Ft) – odaút és oda-vissza, alsó / felső határ."""
+    low_one_way: np.ndarray
+    high_one_way: np.ndarray
+    low_round_trip: np.ndarray
+    high_round_trip: np.ndarray
+
+
+class CarCost(NamedTuple):
+    """Saját autós becslés: üzemanyag igény (liter) és költség (Ft)."""
+    liters: np.ndarray
+    one_way: np.ndarray
+    round_trip: np.ndarray
+
+
+# Sávos modellek: sávhatárok (km), alapdíj (Ft), Ft/km.
+# Az i. sáv: limits[i-1] <= d < limits[i]; az utolsó sáv felülről nyitott.
+FLIGHT_LIMITS_KM = np.array([800.0, 2500.0])
+FLIGHT_BASE = np.array([20000.0, 30000.0, 40000.0])
+FLIGHT_PER_KM = np.array([50.0, 40.0, 35.0])
+FLIGHT_SPREAD = 0.3  # ±30%
+
+# hosszabb az út, olcsóbb / km
+TRANSIT_LIMITS_KM = np.array([300.0, 1500.0])
+TRANSIT_BASE = np.array([1000.0, 2000.0, 4000.0])
+TRANSIT_PER_KM = np.array([25.0, 18.0, 15.0])
+TRANSIT_SPREAD = 0.2  # ±20%
+
+
+def _banded_cost(distance_km, limits, base, per_km, spread) -> CostRange:
+    d = np.asarray(distance_km, dtype=float)
+    # sáv index egy lépésben: searchsorted + take (nincs Python szintű if/elif)
+    band = np.searchsorted(limits, d, side="right")
+    one_way = np.take(base, band) + d * np.take(per_km, band)
+    round_trip = one_way * 2.0
+    return CostRange(
+        low_one_way=one_way * (1.0 - spread),
+        high_one_way=one_way * (1.0 + spread),
+        low_round_trip=round_trip * (1.0 - spread),
+        high_round_trip=round_trip * (1.0 + spread),
+    )
+
+
+def flight_cost(distance_km) -> CostRange:
+    """Repülőjegy ársáv – távolság alapú modell (nem valós árlista)."""
+    return _banded_cost(distance_km, FLIGHT_LIMITS_KM, FLIGHT_BASE, FLIGHT_PER_KM, FLIGHT_SPREAD)
+
+
+def transit_cost(distance_km) -> CostRange:
+    """Tömegközlekedés ársáv – km alapú, egyszerű modell (busz + vonat)."""
+    return _banded_cost(distance_km, TRANSIT_LIMITS_KM, TRANSIT_BASE, TRANSIT_PER_KM, TRANSIT_SPREAD)
+
+
+def car_cost(distance_km, consumption_l_per_100km, fuel_price_per_liter) -> CarCost:
+    """Üzemanyagköltség; a fogyasztás és az ár is lehet tömb (pl. járművenként)."""
+    d = np.asarray(distance_km, dtype=float)
+    liters = d / 100.0 * np.asarray(consumption_l_per_100km, dtype=float)
+    one_way = liters * np.asarray(fuel_price_per_liter, dtype=float)
+    return CarCost(liters=liters, one_way=one_way, round_trip=one_way * 2.0)
@@ -0,0 +1,210 @@
+"""
+AI ajánlás → útvonal és költség: az ask_travel_ai válaszából kinyerjük az
+úti célokat, majd az aktuális kiindulópontból mindegyikhez párhuzamosan
+lekérjük az útvonalat és beárazzuk – kézi másolgatás és célonkénti
+„Költség tervezés” helyett.
+
+Az AI válasza felsorolás (SYSTEM_PROMPT), soronként egy úti cél:
+
+    1. **Tromsø, Norvégia** – Fjordok, hegyek és sarki fény.
+    - Bergen: színes kikötő, közeli fjordtúrák.
+
+A név a félkövér rész, ennek hiányában az első elválasztóig (–, -, :) tartó szöveg.
+Csak a legfelső szintű elemek számítanak: a beljebb kezdett al-felsorolás
+(„* Időjárás: …”, „- Látnivalók: …”) nem úti cél. A legfelső szintű elemeket
+összefüggő listákra bontjuk (közbeékelt szöveg, pl. „Tippek:”, vagy a jelölő
+váltása új listát kezd), és azt a listát vesszük, amelyben félkövér nevek
+vannak – ennek hiányában az elsőt.
+"""
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from app.metrics import inc, span
+from app.route_info import RouteInfo
+
+# egy válaszból legfeljebb ennyi úti célt kérdezünk le
+MAX_DESTINATIONS = 8
+
+# egyszerre futó útvonal lekérések (a "google" ütemező korlátja ezen felül is érvényes)
+MAX_PARALLEL = 4
+
+_LIST_ITEM = re.compile(r"^(\s*)(?:(\d+)[.)]|[-*•])\s+(.+?)\s*$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_SEPARATOR = re.compile(r"\s+[–—-]\s+|:\s+")
+
+
+class Destination(NamedTuple):
+    name: str
+    description: str
+
+
+class DestinationRoute(NamedTuple):
+    destination: Destination
+    info: Optional[RouteInfo]         # None, ha nem sikerült lekérni
+    duration_min: Optional[float]     # forgalommal, ha van
+    cost_low_ft: Optional[float]      # egy út
+    cost_high_ft: Optional[float]
+    error: Optional[str] = None
+
+
+def extract_destinations(answer: str, limit: int = MAX_DESTINATIONS) -> List[Destination]:
+    r"""
+    Úti célok a legfelső szintű felsorolásból, az első előfordulás sorrendjében, ismétlés nélkül.
+
+    >>> answer = (
+    ...     "* **Dubrovnik, Horvátország** – Óváros és tengerpart.\n"
+    ...     "* **Split** – Diocletianus palotája.\n"
+    ...     "\n"
+    ...     "Tippek:\n"
+    ...     "1. Foglalj korán\n"
+    ...     "2. Vigyél naptejet\n"
+    ... )
+    >>> [d.name for d in extract_destinations(answer)]
+    ['Dubrovnik, Horvátország', 'Split']
+    >>> answer = (
+    ...     "1. **Tromsø, Norvégia** – Sarki fény.\n"
+    ...     "2. **Bergen, Norvégia** – Színes kikötő.\n"
+    ...     "3. Reykjavík, Izland – Gejzírek.\n"
+    ... )
+    >>> [d.name for d in extract_destinations(answer)]
+    ['Tromsø, Norvégia', 'Bergen, Norvégia', 'Reykjavík, Izland']
+    """
+    from app.gazetteer import normalize_place
+
+    # (behúzás, (számozott?, név, leírás, félkövér?)) – a nem felsorolás szövegsor eleme None
+    lines = []
+    for line in (answer or "").expandtabs(4).splitlines():
+        match = _LIST_ITEM.match(line)
+        if match is None:
+            if line.strip():
+                lines.append((len(line) - len(line.lstrip()), None))
+            continue
+        indent, number, item = match.groups()
+
+        bold = _BOLD.search(item)
+        if bold is not None:
+            name = bold.group(1) or bold.group(2)
+            description = item[bold.end():]
+        else:
+            parts = _SEPARATOR.split(item, maxsplit=1)
+            name, description = parts[0], parts[1] if len(parts) > 1 else ""
+        lines.append((len(indent), (number is not None, name, description, bold is not None)))
+
+    indents = [indent for indent, item in lines if item is not None]
+    if not indents:
+        return []
+    top = min(indents)
+
+    # összefüggő legfelső szintű listák: szöveg (pl. „Tippek:”) vagy jelölőváltás új listát kezd,
+    # a beljebb kezdett sorok (al-pontok, folytatás) nem szakítják meg
+    lists, current = [], None
+    for indent, item in lines:
+        if indent > top:
+            continue
+        if item is None:
+            current = None
+        elif current is not None and current[-1][0] == item[0]:
+            current.append(item)
+        else:
+            current = [item]
+            lists.append(current)
+
+    # az a lista, amelyben félkövér nevek vannak; ha nincs ilyen, az első
+    items = next((items for items in lists if any(item[3] for item in items)), lists[0])
+
+    destinations: List[Destination] = []
+    seen = set()
+    for _, name, description, _ in items:
+        name = name.strip(" *_.:;–—-")
+        description = description.strip(" *_–—-:")
+        # túl hosszú "név" inkább mondat, nem helynév
+        if not name or len(name) > 60:
+            continue
+
+        key = normalize_place(name)
+        if key in seen:
+            continue
+        seen.add(key)
+        destinations.append(Destination(name, description))
+        if len(destinations) >= limit:
+            break
+    return destinations
+
+
+def route_to_destination(
+    origin: str,
+    destination: Destination,
+    travelmode: str = "driving",
+    consumption: Optional[float] = None,
+    fuel_price: Optional[float] = None,
+) -> DestinationRoute:
+    """
+    Egy úti cél útvonala + egyirányú költsége; travelmode: driving / transit / flight.
+    A RouteError nem megy tovább, hanem az eredmény error mezőjébe kerül.
+    """
+    from app.airports import get_flight_info
+    from app.alternatives import DEFAULT_CONSUMPTION, DEFAULT_FUEL_PRICE
+    from app.cost_model import car_cost, flight_cost, transit_cost
+    from app.gazetteer import canonical_place
+    from app.google_routes import RouteError, get_route_info
+
+    target = canonical_place(destination.name)
+    try:
+        with span("destinations.lookup"):
+            if travelmode == "flight":
+                info = get_flight_info(origin, target)
+            else:
+                info = get_route_info(origin, target, travelmode)
+    except RouteError as e:
+        inc("destinations.errors")
+        return DestinationRoute(destination, None, None, None, None, str(e))
+
+    if travelmode == "flight":
+        band = flight_cost(info.distance_km)
+        low, high = float(band.low_one_way), float(band.high_one_way)
+    elif travelmode == "transit":
+        band = transit_cost(info.distance_km)
+        low, high = float(band.low_one_way), float(band.high_one_way)
+    else:
+        car = car_cost(
+            info.distance_km,
+            DEFAULT_CONSUMPTION if consumption is None else consumption,
+            DEFAULT_FUEL_PRICE if fuel_price is None else fuel_price,
+        )
+        low = high = float(car.one_way)
+
+    duration = info.traffic_duration_min if info.traffic_duration_min is not None else info.duration_min
+    return DestinationRoute(destination, info, duration, low, high)
+
+
+def iter_destination_routes(
+    origin: str,
+    destinations: Iterable[Destination],
+    travelmode: str = "driving",
+    consumption: Optional[float] = None,
+    fuel_price: Optional[float] = None,
+    max_parallel: int = MAX_PARALLEL,
+) -> Iterator[DestinationRoute]:
+    """
+    Az úti célok lekérése párhuzamosan; az eredmények elkészülési sorrendben
+    jönnek (a GUI táblázata érkezés közben rendez). A generátor lezárásakor
+    a még el nem indult lekérések elmaradnak.
+    """
+    destinations = list(destinations)
+    if not destinations:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(destinations))))
+    try:
+        pending = {
+            pool.submit(route_to_destination, origin, destination, travelmode, consumption, fuel_price)
+            for destination in destinations
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
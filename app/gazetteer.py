@@ -0,0 +1,174 @@
+"""
+Helynév index (gazetteer) az automatikus kiegészítéshez és a nevek egységesítéséhez.
+
+A forrás a data/places.csv (név, alternatív nevek, ország, koordináta), ebből
+készül a rendezett data/places.idx, soronként:
+
+    kulcs \\t megjelenített név \\t kanonikus név \\t ország \\t lat \\t lon
+
+A kulcs a normalize_place() alak (ékezet- és kisbetű-független), UTF-8 bájtok
+szerint rendezve. Az indexet mmap-pel nyitjuk meg, csak a sorkezdő offseteket
+tartjuk memóriában, a prefix keresés pedig bináris keresés (bisect).
+
+    python -m app.gazetteer        # places.idx újragenerálása places.csv-ből
+"""
+import bisect
+import csv
+import mmap
+import os
+import sys
+import threading
+import unicodedata
+from array import array
+from typing import List, NamedTuple, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+SOURCE_PATH = os.path.join(DATA_DIR, "places.csv")
+INDEX_PATH = os.path.join(DATA_DIR, "places.idx")
+
+
+def normalize_place(text: str) -> str:
+    """Ékezet- és kisbetű-független kulcs (Róma == roma, Zürich == zurich)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.replace("-", " ").split())
+
+
+class Place(NamedTuple):
+    key: str
+    label: str      # a keresett alak (pl. "Roma")
+    name: str       # kanonikus név (pl. "Róma") – ezt adjuk tovább az API-nak
+    country: str
+    lat: float
+    lon: float
+
+
+def build_index(source: str = SOURCE_PATH, target: str = INDEX_PATH) -> int:
+    """A forrás CSV-ből rendezett index fájl; visszatér a sorok számával."""
+    rows = set()
+    with open(source, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = row["name"].strip()
+            for label in [name] + (row.get("aliases") or "").split("|"):
+                label = label.strip()
+                if label:
+                    rows.add((normalize_place(label), label, name, row["country"], row["lat"], row["lon"]))
+
+    lines = sorted(("\t".join(r) + "\n").encode("utf-8") for r in rows)
+    with open(target, "wb") as f:
+        f.writelines(lines)
+    return len(lines)
+
+
+class PlaceIndex:
+    """Memóriába leképezett (mmap), rendezett helynév index prefix kereséssel."""
+
+    __slots__ = ("_file", "_mm", "_offsets")
+
+    def __init__(self, path: str = INDEX_PATH):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = array("I")
+        pos, size = 0, len(self._mm)
+        while pos < size:
+            self._offsets.append(pos)
+            nl = self._mm.find(b"\n", pos)
+            pos = size if nl < 0 else nl + 1
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _key_at(self, offset: int) -> bytes:
+        return self._mm[offset:self._mm.find(b"\t", offset)]
+
+    def _row(self, i: int) -> Place:
+        start = self._offsets[i]
+        end = self._offsets[i + 1] - 1 if i + 1 < len(self._offsets) else len(self._mm)
+        key, label, name, country, lat, lon = self._mm[start:end].decode("utf-8").rstrip("\n").split("\t")
+        return Place(key, label, name, country, float(lat), float(lon))
+
+    def _range(self, prefix: bytes):
+        lo = bisect.bisect_left(self._offsets, prefix, key=self._key_at)
+        hi = bisect.bisect_left(self._offsets, prefix + b"\xff", lo=lo, key=self._key_at)
+        return lo, hi
+
+    def complete(self, text: str, limit: int = 10) -> List[Place]:
+        """Az ezzel kezdődő helyek (kanonikus név szerint egyszer), kulcs sorrendben."""
+        prefix = normalize_place(text).encode("utf-8")
+        if not prefix:
+            return []
+        lo, hi = self._range(prefix)
+        result, seen = [], set()
+        for i in range(lo, hi):
+            place = self._row(i)
+            if place.name not in seen:
+                seen.add(place.name)
+                result.append(place)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def find(self, text: str) -> Optional[Place]:
+        """Pontos (normalizált) egyezés; "Róma, Olaszország" esetén a vessző előtti rész is."""
+        candidates = [text]
+        if "," in text:
+            candidates.append(text.split(",", 1)[0])
+        for candidate in candidates:
+            key = normalize_place(candidate).encode("utf-8")
+            if not key:
+                continue
+            lo, hi = self._range(key)
+            if lo < hi and self._key_at(self._offsets[lo]) == key:
+                return self._row(lo)
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+_gazetteer: Optional[PlaceIndex] = None
+_gazetteer_opened = False
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Optional[PlaceIndex]:
+    """Közös index (lustán nyitjuk meg; None, ha az index fájl nem elérhető)."""
+    global _gazetteer, _gazetteer_opened
+    with _gazetteer_lock:
+        if not _gazetteer_opened:
+            _gazetteer_opened = True
+            try:
+                _gazetteer = PlaceIndex()
+            except (OSError, ValueError):
+                _gazetteer = None
+        return _gazetteer
+
+
+def complete_place(text: str, limit: int = 10) -> List[str]:
+    index = get_gazetteer()
+    if index is None:
+        return []
+    return [place.name for place in index.complete(text, limit)]
+
+
+def canonical_place(text: str) -> str:
+    """
+    Ismert hely esetén a kanonikus név ("roma", "Rome" → "Róma"), így az
+    útvonal cache ugyanarra a helyre ugyanazt a kulcsot kapja.
+    Ismeretlen szöveget változatlanul (csak a széleit vágva) adunk vissza.
+    """
+    text = text.strip()
+    index = get_gazetteer()
+    if index is None or not text:
+        return text
+    place = index.find(text)
+    if place is None or normalize_place(text) != place.key:
+        # "Róma, Olaszország" pontosabb lehet, mint "Róma" – nem rövidítjük
+        return text
+    return place.name
+
+
+if __name__ == "__main__":
+    count = build_index()
+    print(f"[OK] {count} sor: {INDEX_PATH}", file=sys.stderr)
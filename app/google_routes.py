@@ -1,84 +1,694 @@
+import json
 import os
+import random
+import threading
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from app.cache import DiskCache, normalize_key_part, open_disk_cache
+from app.metrics import inc, observe, span
+from app.route_info import RouteInfo, TransitSegment
+from app.scheduler import INTERACTIVE, QuotaWaitTimeout, current_priority, get_scheduler, priority, request_tag
+from app.singleflight import SingleFlight
 
 class RouteError(Exception):
     pass
 
 
-def get_route_info(origin: str, destination: str, travelmode: str = "driving") -> dict:
-    api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-    if not api_key:
-        raise RouteError("Nincs beállítva GOOGLE_MAPS_API_KEY környezeti változó.")
+# Statikus adatok (távolság, idő, transit szerkezet) sokáig érvényesek,
+# a forgalmi idő (duration_in_traffic) csak néhány percig.
+ROUTE_STATIC_TTL = 7 * 24 * 3600.0
+ROUTE_TRAFFIC_TTL = 5 * 60.0
+
+# megadott (jövőbeli) indulási idejű lekérésnél a forgalmi előrejelzés érvényessége
+ROUTE_SLOT_TRAFFIC_TTL = 30 * 60.0
+# ...és a teljes bejegyzés is csak kicsivel az indulás után marad meg
+ROUTE_SLOT_MARGIN = 15 * 60.0
+
+# mátrixban a "nincs útvonal" pár is cache-be kerül, de csak rövid időre
+MATRIX_NO_ROUTE_TTL = 30 * 60.0
+
+# az alternatívák külön cache kulcson (travelmode + utótag)
+ALTERNATIVES_SUFFIX = "+alternatives"
+
+
+class RouteCache:
+    """
+    Útvonal cache a Directions API elé (DiskCache-re építve).
+    Kulcs: normalizált honnan / hová / travelmode.
+    Ha a bejegyzésben van forgalmi idő, az csak ROUTE_TRAFFIC_TTL-ig számít
+    frissnek – utána a lekérés hiánynak (miss) minősül és újrakérdezünk.
+    A statikus rész (távolság, menetidő, geometria) ROUTE_STATIC_TTL-ig
+    megmarad: allow_stale_traffic=True esetén forgalmi idő nélkül visszakapjuk
+    (pl. ha a friss lekérés nem sikerül, vagy csak a geometria kell).
+    """
+
+    def __init__(
+        self,
+        store: DiskCache,
+        static_ttl: float = ROUTE_STATIC_TTL,
+        traffic_ttl: float = ROUTE_TRAFFIC_TTL,
+    ):
+        self.store = store
+        self.static_ttl = static_ttl
+        self.traffic_ttl = traffic_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(origin: str, destination: str, travelmode: str) -> str:
+        return "|".join(
+            normalize_key_part(part) for part in (origin, destination, travelmode)
+        )
+
+    def _lookup_fresh(self, key: str, allow_stale_traffic: bool = False) -> Optional[dict]:
+        found, entry, _ = self.store.peek(key)
+        if not found:
+            self.misses += 1
+            return None
+
+        infos = entry["routes"] if "routes" in entry else (entry["info"],)
+        if entry["traffic_until"] <= time.time() and any(
+            info.get("traffic_duration_min") is not None for info in infos
+        ):
+            # a statikus rész még jó, de a forgalmi idő elavult
+            if not allow_stale_traffic:
+                self.misses += 1
+                return None
+            for info in infos:
+                info["traffic_duration_min"] = None
+
+        self.hits += 1
+        return entry
+
+    def get(
+        self, origin: str, destination: str, travelmode: str, allow_stale_traffic: bool = False
+    ) -> Optional[RouteInfo]:
+        entry = self._lookup_fresh(self.make_key(origin, destination, travelmode), allow_stale_traffic)
+        return RouteInfo.from_dict(entry["info"]) if entry is not None else None
+
+    def put(
+        self,
+        origin: str,
+        destination: str,
+        travelmode: str,
+        info: RouteInfo,
+        traffic_ttl: Optional[float] = None,
+        static_ttl: Optional[float] = None,
+    ) -> None:
+        traffic_ttl = self.traffic_ttl if traffic_ttl is None else traffic_ttl
+        static_ttl = self.static_ttl if static_ttl is None else static_ttl
+        entry = {"info": info.to_dict(), "traffic_until": time.time() + traffic_ttl}
+        self.store.set(
+            self.make_key(origin, destination, travelmode), entry, static_ttl
+        )
+
+    def get_alternatives(self, origin: str, destination: str, travelmode: str) -> Optional[Tuple[RouteInfo, ...]]:
+        entry = self._lookup_fresh(self.make_key(origin, destination, travelmode + ALTERNATIVES_SUFFIX))
+        if entry is None:
+            return None
+        return tuple(RouteInfo.from_dict(info) for info in entry["routes"])
+
+    def put_alternatives(self, origin: str, destination: str, travelmode: str, routes: Sequence[RouteInfo]) -> None:
+        entry = {"routes": [info.to_dict() for info in routes], "traffic_until": time.time() + self.traffic_ttl}
+        self.store.set(
+            self.make_key(origin, destination, travelmode + ALTERNATIVES_SUFFIX), entry, self.static_ttl
+        )
+
+    def clear(self) -> None:
+        self.store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        stats = self.store.stats()
+        stats.update(
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=(self.hits / total) if total else 0.0,
+        )
+        return stats
+
+
+_route_cache: Optional[RouteCache] = None
+_route_cache_opened = False
+_route_cache_lock = threading.Lock()
+
+
+def get_route_cache() -> Optional[RouteCache]:
+    """Közös útvonal cache (lustán nyitjuk meg; None, ha nem elérhető)."""
+    global _route_cache, _route_cache_opened
+    if _route_cache_opened:
+        return _route_cache
+    # párhuzamos első hívásoknál (pl. indulási idő keresés) se kapjon senki None-t
+    with _route_cache_lock:
+        if not _route_cache_opened:
+            store = open_disk_cache("routes.sqlite3", max_entries=5000)
+            if store is not None:
+                _route_cache = RouteCache(store)
+            _route_cache_opened = True
+    return _route_cache
+
+
+# Distance Matrix API korlátok egy kérésre
+MATRIX_MAX_ORIGINS = 25
+MATRIX_MAX_DESTINATIONS = 25
+MATRIX_MAX_ELEMENTS = 100
+
+
+class RouteMatrix:
+    """
+    Távolság / idő mátrix tömör, tömb alapú tárolással (sorfolytonosan, origin × destination).
+    Ahol nincs útvonal (element status != OK), ott NaN az érték.
+    """
+
+    __slots__ = ("origins", "destinations", "distance_km", "duration_min")
+
+    def __init__(self, origins: Sequence[str], destinations: Sequence[str]):
+        self.origins = list(origins)
+        self.destinations = list(destinations)
+        size = len(self.origins) * len(self.destinations)
+        self.distance_km = array("d", [float("nan")]) * size
+        self.duration_min = array("d", [float("nan")]) * size
+
+    @property
+    def shape(self):
+        return len(self.origins), len(self.destinations)
+
+    def _index(self, i: int, j: int) -> int:
+        return i * len(self.destinations) + j
+
+    def distance(self, i: int, j: int) -> float:
+        return self.distance_km[self._index(i, j)]
+
+    def duration(self, i: int, j: int) -> float:
+        return self.duration_min[self._index(i, j)]
+
+
+def _matrix_chunks(n_origins: int, n_destinations: int):
+    """(origin_start, origin_end, dest_start, dest_end) blokkok, amelyek beleférnek egy kérésbe."""
+    dest_block = min(MATRIX_MAX_DESTINATIONS, MATRIX_MAX_ELEMENTS, n_destinations)
+    origin_block = min(MATRIX_MAX_ORIGINS, max(1, MATRIX_MAX_ELEMENTS // dest_block), n_origins)
+    for o in range(0, n_origins, origin_block):
+        for d in range(0, n_destinations, dest_block):
+            yield o, min(o + origin_block, n_origins), d, min(d + dest_block, n_destinations)
+
+
+# Ezekre érdemes újrapróbálni (átmeneti hibák / kvóta)
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+
+class RoutesClient:
+    """
+    Google Maps (Directions) kliens:
+    - saját, keep-alive requests.Session connection poollal (pool_size)
+    - átmeneti hibáknál újrapróbálás jitteres exponenciális backoff-fal
+    - minden próbálkozás a "google" ütemezőn át (kvóta, prioritás, 429 → visszafogás)
+    - kérésenkénti időmérés (timings / last_timing)
+    """
+
+    BASE_URL = "https://maps.googleapis.com/maps/api"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        timeout: float = 10.0,
+        base_url: Optional[str] = None,
+    ):
+        self.api_key = api_key
+        # GOOGLE_MAPS_BASE_URL: pl. helyi stub szerver a benchmarkokhoz
+        self.base_url = (base_url or os.getenv("GOOGLE_MAPS_BASE_URL") or self.BASE_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # utolsó kérések időadatai (endpoint, próbálkozások, teljes / szerver idő)
+        self.timings = deque(maxlen=200)
+
+    @property
+    def last_timing(self) -> Optional[dict]:
+        return self.timings[-1] if self.timings else None
+
+    def _get_api_key(self) -> str:
+        api_key = self.api_key or os.getenv("GOOGLE_MAPS_API_KEY")
+        if not api_key:
+            raise RouteError("Nincs beállítva GOOGLE_MAPS_API_KEY környezeti változó.")
+        return api_key
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: 0 és base * 2^attempt (max backoff_max) közötti véletlen várakozás."""
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request_json(self, endpoint: str, params: dict) -> dict:
+        """
+        GET {base_url}/{endpoint}/json, újrapróbálással.
+        Csak 'OK' státuszú választ ad vissza, minden más RouteError.
+        """
+        url = f"{self.base_url}/{endpoint}/json"
+        params = dict(params, key=self._get_api_key())
+
+        scheduler = get_scheduler("google")
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            can_retry = attempt <= self.max_retries
+            if attempt > 1:
+                inc(f"google.{endpoint}.retries")
+
+            try:
+                # kvóta / prioritás: interaktív hívás megelőzi az előtöltést, kötegelt munkát
+                with scheduler.slot() as slot:
+                    resp, data = self._attempt(endpoint, url, params)
+                    if resp is not None and (
+                        resp.status_code == 429 or (data or {}).get("status") == "OVER_QUERY_LIMIT"
+                    ):
+                        slot.throttled()
+            except QuotaWaitTimeout as e:
+                inc(f"google.{endpoint}.quota_timeouts")
+                raise RouteError(f"A Google API kvóta most foglalt, próbáld újra később ({e}).") from e
+
+            if resp is None:  # hálózati hiba
+                if can_retry:
+                    time.sleep(self._backoff(attempt - 1))
+                    continue
+                raise RouteError(f"Hálózati hiba: {data}") from data
+
+            if resp.status_code != 200:
+                if resp.status_code in RETRYABLE_HTTP_STATUSES and can_retry:
+                    time.sleep(self._backoff(attempt - 1))
+                    continue
+                raise RouteError(f"HTTP hiba: {resp.status_code}")
+
+            status = data.get("status")
+            if status in RETRYABLE_API_STATUSES and can_retry:
+                time.sleep(self._backoff(attempt - 1))
+                continue
+            break
+
+        self.timings.append({
+            "endpoint": endpoint,
+            "attempts": attempt,
+            "total_s": time.perf_counter() - started,
+            "server_s": resp.elapsed.total_seconds(),  # kérés elküldése → fejlécek megérkezése
+        })
 
-    url = "https://maps.googleapis.com/maps/api/directions/json"
+        if status != "OK":
+            msg = data.get("error_message", status)
+            raise RouteError(f"Directions API hiba: {msg}")
+        return data
 
-    params = {
-        "origin": origin,
-        "destination": destination,
-        "mode": travelmode,
-        "key": api_key,
-    }
+    def _attempt(self, endpoint: str, url: str, params: dict):
+        """
+        Egy GET próbálkozás (az ütemezőtől kapott helyen).
+        Visszatér: (resp, JSON dict) – hálózati hibánál (None, kivétel),
+        nem 200-as válasznál (resp, None).
+        """
+        http_started = time.perf_counter()
+        try:
+            resp = self.session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            inc(f"google.{endpoint}.network_errors")
+            return None, e
 
-    # Forgalmi időhöz / aktuális menetrendhez jól jön a departure_time=now (driving + transit)
-    if travelmode in ("driving", "transit"):
-        params["departure_time"] = "now"
+        # http: teljes GET; server: kérés elküldése → fejlécek (Google szerveridő + RTT);
+        # a különbség a kapcsolatfelvétel (DNS/TCP/TLS, ha új kapcsolat) + törzs letöltése
+        http_ms = (time.perf_counter() - http_started) * 1000.0
+        server_ms = resp.elapsed.total_seconds() * 1000.0
+        observe(f"google.{endpoint}.http", http_ms)
+        observe(f"google.{endpoint}.server", server_ms)
+        observe(f"google.{endpoint}.connect_body", max(0.0, http_ms - server_ms))
 
-    resp = requests.get(url, params=params, timeout=10)
-    if resp.status_code != 200:
-        raise RouteError(f"HTTP hiba: {resp.status_code}")
+        if resp.status_code != 200:
+            return resp, None
+        with span(f"google.{endpoint}.json_parse"):
+            # közvetlenül a bájtokból (resp.json() előbb szöveggé alakítaná)
+            return resp, json.loads(resp.content)
 
-    data = resp.json()
-    status = data.get("status")
-    if status != "OK":
-        msg = data.get("error_message", status)
-        raise RouteError(f"Directions API hiba: {msg}")
+    @staticmethod
+    def _directions_params(
+        origin: str, destination: str, travelmode: str, departure_time: Optional[int] = None
+    ) -> dict:
+        params = {
+            "origin": origin,
+            "destination": destination,
+            "mode": travelmode,
+        }
 
-    routes = data.get("routes", [])
+        # Forgalmi időhöz / aktuális menetrendhez jól jön a departure_time=now (driving + transit);
+        # jövőbeli indulásnál Unix időbélyeg (a forgalmi idő ekkor előrejelzés)
+        if travelmode in ("driving", "transit"):
+            params["departure_time"] = "now" if departure_time is None else str(int(departure_time))
+        return params
+
+    def get_route_info(
+        self,
+        origin: str,
+        destination: str,
+        travelmode: str = "driving",
+        departure_time: Optional[int] = None,
+    ) -> RouteInfo:
+        params = self._directions_params(origin, destination, travelmode, departure_time)
+        data = self.request_json("directions", params)
+        with span("google.directions.extract"):
+            return _parse_route(data, travelmode)
+
+    def get_route_alternatives(
+        self, origin: str, destination: str, travelmode: str = "driving"
+    ) -> Tuple[RouteInfo, ...]:
+        """Minden útvonal, amit a Directions ad (alternatives=true; az első a javasolt)."""
+        params = self._directions_params(origin, destination, travelmode)
+        params["alternatives"] = "true"
+        data = self.request_json("directions", params)
+        with span("google.directions.extract_alternatives"):
+            return _parse_routes(data, travelmode)
+
+    def get_route_matrix(
+        self,
+        origins: Sequence[str],
+        destinations: Sequence[str],
+        travelmode: str = "driving",
+        max_parallel: int = 4,
+    ) -> RouteMatrix:
+        """
+        Sok honnan–hová pár egyszerre a Distance Matrix API-val.
+        A mátrixot a kérésenkénti elem-korlátba férő blokkokra bontjuk,
+        és a blokkokat legfeljebb max_parallel szálon párhuzamosan kérjük le.
+        """
+        matrix = RouteMatrix(origins, destinations)
+        if not matrix.origins or not matrix.destinations:
+            return matrix
+
+        # a pool szálai nem öröklik a hívó prioritását
+        level = current_priority()
+
+        def fetch_chunk(chunk):
+            o0, o1, d0, d1 = chunk
+            with priority(level):
+                data = self.request_json("distancematrix", {
+                    "origins": "|".join(matrix.origins[o0:o1]),
+                    "destinations": "|".join(matrix.destinations[d0:d1]),
+                    "mode": travelmode,
+                })
+            for i, row in enumerate(data.get("rows", []), start=o0):
+                for j, element in enumerate(row.get("elements", []), start=d0):
+                    if element.get("status") != "OK":
+                        continue
+                    idx = matrix._index(i, j)
+                    matrix.distance_km[idx] = element["distance"]["value"] / 1000.0
+                    matrix.duration_min[idx] = element["duration"]["value"] / 60.0
+
+        chunks = list(_matrix_chunks(len(matrix.origins), len(matrix.destinations)))
+        if len(chunks) == 1:
+            fetch_chunk(chunks[0])
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+                # list(): az első hibás blokk kivétele itt jön fel
+                list(pool.map(fetch_chunk, chunks))
+        return matrix
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_client: Optional[RoutesClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> RoutesClient:
+    """Közös, megosztott kliens (egy connection pool az egész alkalmazásnak)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = RoutesClient()
+        return _default_client
+
+
+_route_flight = SingleFlight("route")
+
+
+def _slot_mode(travelmode: str, departure_time: Optional[int]) -> str:
+    # az indulási idő a cache / single-flight kulcs része ("driving@1700000000")
+    return travelmode if departure_time is None else f"{travelmode}@{int(departure_time)}"
+
+
+def get_cached_route_info(
+    origin: str,
+    destination: str,
+    travelmode: str = "driving",
+    departure_time: Optional[int] = None,
+) -> Optional[RouteInfo]:
+    """Csak a cache, hálózat nélkül (None = nincs friss bejegyzés)."""
+    cache = get_route_cache()
+    if cache is None:
+        return None
+    cached = cache.get(origin, destination, _slot_mode(travelmode, departure_time))
+    inc("route_cache.hit" if cached is not None else "route_cache.miss")
+    return cached
+
+
+def get_route_info(
+    origin: str,
+    destination: str,
+    travelmode: str = "driving",
+    use_cache: bool = True,
+    departure_time: Optional[int] = None,
+    refresh: bool = False,
+) -> RouteInfo:
+    """
+    departure_time: Unix időbélyeg (None = most); külön cache bejegyzés indulásonként.
+    refresh=True: a cache-t nem olvassuk (a hívó már megnézte, vagy elavult),
+    de a friss eredmény bekerül; use_cache=False: a cache-t egyáltalán nem használjuk.
+    """
+    slot_mode = _slot_mode(travelmode, departure_time)
+    with span("route.get_route_info"):
+        cache = get_route_cache() if use_cache else None
+        if cache is not None and not refresh:
+            cached = get_cached_route_info(origin, destination, travelmode, departure_time)
+            if cached is not None:
+                return cached
+
+        key = RouteCache.make_key(origin, destination, slot_mode)
+        if current_priority() == INTERACTIVE:
+            # ha épp egy előtöltés vár ugyanerre a sorban, az előre léphet
+            get_scheduler("google").promote(key)
+        # ugyanarra a párra már futó lekérés eredményét használjuk (dupla kattintás, köteg)
+        return _route_flight.do(
+            key, _fetch_route_info, origin, destination, travelmode, cache, departure_time
+        )
+
+
+def _fetch_route_info(
+    origin: str,
+    destination: str,
+    travelmode: str,
+    cache: Optional[RouteCache],
+    departure_time: Optional[int] = None,
+) -> RouteInfo:
+    slot_mode = _slot_mode(travelmode, departure_time)
+    try:
+        with request_tag(RouteCache.make_key(origin, destination, slot_mode)):
+            info = get_default_client().get_route_info(origin, destination, travelmode, departure_time)
+    except RouteError:
+        # a friss lekérés nem ment (hálózat, kvóta): a statikus rész még használható
+        stale = cache.get(origin, destination, slot_mode, allow_stale_traffic=True) if cache is not None else None
+        if stale is None:
+            raise
+        inc("route_cache.stale_fallback")
+        return stale.with_warning("A forgalmi adat most nem érhető el – forgalom nélküli menetidő.")
+    if cache is not None:
+        # jövőbeli indulásnál a forgalmi idő előrejelzés, lassabban avul; az
+        # elmúlt indulási idő bejegyzése viszont már nem kell, ne foglalja az LRU-t
+        if departure_time is None:
+            cache.put(origin, destination, slot_mode, info)
+        else:
+            static_ttl = max(ROUTE_SLOT_TRAFFIC_TTL, departure_time - time.time() + ROUTE_SLOT_MARGIN)
+            cache.put(origin, destination, slot_mode, info, ROUTE_SLOT_TRAFFIC_TTL, static_ttl)
+    return info
+
+
+_alternatives_flight = SingleFlight("route_alternatives")
+
+
+def get_route_alternatives(
+    origin: str,
+    destination: str,
+    travelmode: str = "driving",
+    use_cache: bool = True,
+) -> Tuple[RouteInfo, ...]:
+    """Az összes alternatív útvonal (cache-elve, mint a get_route_info)."""
+    with span("route.get_route_alternatives"):
+        cache = get_route_cache() if use_cache else None
+        if cache is not None:
+            cached = cache.get_alternatives(origin, destination, travelmode)
+            if cached is not None:
+                inc("route_cache.hit")
+                return cached
+            inc("route_cache.miss")
+
+        key = RouteCache.make_key(origin, destination, travelmode + ALTERNATIVES_SUFFIX)
+        if current_priority() == INTERACTIVE:
+            get_scheduler("google").promote(key)
+        return _alternatives_flight.do(key, _fetch_route_alternatives, origin, destination, travelmode, cache)
+
+
+def _fetch_route_alternatives(
+    origin: str, destination: str, travelmode: str, cache: Optional[RouteCache]
+) -> Tuple[RouteInfo, ...]:
+    with request_tag(RouteCache.make_key(origin, destination, travelmode + ALTERNATIVES_SUFFIX)):
+        routes = get_default_client().get_route_alternatives(origin, destination, travelmode)
+    if cache is not None:
+        cache.put_alternatives(origin, destination, travelmode, routes)
+        # az első (javasolt) útvonal ugyanaz, mint az alternatívák nélküli lekérésé
+        cache.put(origin, destination, travelmode, routes[0])
+    return routes
+
+
+_matrix_cache: Optional[DiskCache] = None
+_matrix_cache_opened = False
+_matrix_cache_lock = threading.Lock()
+
+
+def get_matrix_cache() -> Optional[DiskCache]:
+    """Pár-szintű távolság / idő cache a mátrix lekérésekhez (None, ha nem elérhető)."""
+    global _matrix_cache, _matrix_cache_opened
+    if _matrix_cache_opened:
+        return _matrix_cache
+    with _matrix_cache_lock:
+        if not _matrix_cache_opened:
+            _matrix_cache = open_disk_cache("matrix.sqlite3", max_entries=50000)
+            _matrix_cache_opened = True
+    return _matrix_cache
+
+
+def get_route_matrix(
+    origins: List[str],
+    destinations: List[str],
+    travelmode: str = "driving",
+    max_parallel: int = 4,
+    use_cache: bool = True,
+) -> RouteMatrix:
+    """
+    Mátrix lekérés páronkénti cache-sel: csak a hiányzó párokat tartalmazó
+    sorokat / oszlopokat kérdezzük le újra a Distance Matrix API-tól.
+    A "nincs útvonal" (NaN) pár negatív bejegyzésként MATRIX_NO_ROUTE_TTL-ig
+    a cache-ben marad, így nem kényszerít újra lekérést.
+    """
+    cache = get_matrix_cache() if use_cache else None
+    if cache is None:
+        return get_default_client().get_route_matrix(origins, destinations, travelmode, max_parallel)
+
+    matrix = RouteMatrix(origins, destinations)
+    missing = set()
+    for i, origin in enumerate(matrix.origins):
+        for j, destination in enumerate(matrix.destinations):
+            cached = cache.get(RouteCache.make_key(origin, destination, travelmode))
+            if cached is None:
+                missing.add((i, j))
+                continue
+            distance, duration = cached
+            if distance is None:  # negatív bejegyzés: ismerten nincs útvonal, NaN marad
+                continue
+            idx = matrix._index(i, j)
+            matrix.distance_km[idx], matrix.duration_min[idx] = distance, duration
+
+    if missing:
+        rows = sorted({i for i, _ in missing})
+        cols = sorted({j for _, j in missing})
+        fetched = get_default_client().get_route_matrix(
+            [matrix.origins[i] for i in rows],
+            [matrix.destinations[j] for j in cols],
+            travelmode,
+            max_parallel,
+        )
+        for fi, i in enumerate(rows):
+            for fj, j in enumerate(cols):
+                distance, duration = fetched.distance(fi, fj), fetched.duration(fi, fj)
+                idx = matrix._index(i, j)
+                matrix.distance_km[idx], matrix.duration_min[idx] = distance, duration
+                if (i, j) not in missing:  # a cache-ben már ott volt
+                    continue
+                key = RouteCache.make_key(matrix.origins[i], matrix.destinations[j], travelmode)
+                if distance == distance:  # nem NaN → van útvonal
+                    cache.set(key, [distance, duration], ROUTE_STATIC_TTL)
+                else:
+                    cache.set(key, [None, None], MATRIX_NO_ROUTE_TTL)
+    return matrix
+
+
+def _parse_route(data: dict, travelmode: str) -> RouteInfo:
+    """
+    Csak a szükséges mezők kinyerése: az első útvonal első szakasza és kódolt
+    áttekintő polyline-ja, a lépések közül pedig (transit módban) csak a
+    transit_details. A lépésenkénti polyline-ok, HTML instrukciók stb. nem
+    kerülnek az eredménybe, így annak mérete nem függ a válasz bőbeszédűségétől.
+    """
+    return _route_info(_routes_of(data)[0], travelmode)
+
+
+def _parse_routes(data: dict, travelmode: str) -> Tuple[RouteInfo, ...]:
+    """Mint a _parse_route, de minden útvonalra (alternatives=true válaszhoz)."""
+    return tuple(_route_info(route, travelmode) for route in _routes_of(data))
+
+
+def _routes_of(data: dict) -> list:
+    routes = data.get("routes")
     if not routes:
         raise RouteError("Nem található útvonal a megadott pontok között.")
+    return routes
 
-    route = routes[0]
-    leg = route["legs"][0]
 
-    distance_m = leg["distance"]["value"]
-    duration_s = leg["duration"]["value"]
-
-    distance_km = distance_m / 1000.0
-    duration_min = duration_s / 60.0
+def _route_info(route: dict, travelmode: str) -> RouteInfo:
+    leg = route["legs"][0]
 
     # Forgalommal számolt idő, ha van
-    traffic_duration_min = None
-    if "duration_in_traffic" in leg:
-        traffic_duration_min = leg["duration_in_traffic"]["value"] / 60.0
-
-    # Figyelmeztetések
-    warnings = route.get("warnings", [])
+    traffic = leg.get("duration_in_traffic")
 
     # ==== TRANSIT RÉSZLETEK KINYERÉSE (ha 'transit' mód) ====
-    transit_segments = []
+    segments = ()
     if travelmode == "transit":
-        for step in leg.get("steps", []):
-            td = step.get("transit_details")
-            if not td:
-                continue
+        segments = tuple(
+            _transit_segment(step["transit_details"])
+            for step in leg.get("steps", ())
+            if step.get("transit_details")
+        )
+
+    return RouteInfo(
+        distance_km=leg["distance"]["value"] / 1000.0,
+        duration_min=leg["duration"]["value"] / 60.0,
+        traffic_duration_min=traffic["value"] / 60.0 if traffic else None,
+        warnings=tuple(route.get("warnings") or ()),
+        transit_segments=segments,
+        overview_polyline=(route.get("overview_polyline") or {}).get("points"),
+        summary=route.get("summary") or None,
+    )
+
 
-            line = td.get("line", {}) or {}
-            vehicle = line.get("vehicle", {}) or {}
-
-            seg = {
-                "departure_stop": (td.get("departure_stop") or {}).get("name"),
-                "arrival_stop": (td.get("arrival_stop") or {}).get("name"),
-                "departure_time": (td.get("departure_time") or {}).get("text"),
-                "arrival_time": (td.get("arrival_time") or {}).get("text"),
-                "line_name": line.get("name"),
-                "vehicle_type": vehicle.get("type"),
-            }
-            transit_segments.append(seg)
-
-    return {
-        "distance_km": distance_km,
-        "duration_min": duration_min,
-        "traffic_duration_min": traffic_duration_min,
-        "warnings": warnings,
-        "transit_segments": transit_segments,  # LISTA, lehet üres is
-    }
+def _transit_segment(td: dict) -> TransitSegment:
+    line = td.get("line") or {}
+    return TransitSegment(
+        departure_stop=(td.get("departure_stop") or {}).get("name"),
+        arrival_stop=(td.get("arrival_stop") or {}).get("name"),
+        departure_time=(td.get("departure_time") or {}).get("text"),
+        arrival_time=(td.get("arrival_time") or {}).get("text"),
+        line_name=line.get("name"),
+        vehicle_type=(line.get("vehicle") or {}).get("type"),
+    )
@@ -0,0 +1,217 @@
+"""
+Többmegállós útvonal: a megállók bejárási sorrendjének optimalizálása.
+
+A páronkénti távolság / idő mátrixot egyszer (cache-elve) kérjük le, utána:
+- kevés megállónál pontos megoldás (Held–Karp dinamikus programozás)
+- sok megállónál gyors heurisztika (legközelebbi szomszéd + 2-opt + Or-opt)
+Az első megálló mindig a kiindulópont.
+"""
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.cost_model import CarCost, CostRange, car_cost, flight_cost, transit_cost
+from app.google_routes import get_route_matrix
+
+# eddig a megállószámig (kiindulóponttal együtt) pontos megoldás
+EXACT_MAX_STOPS = 13
+
+
+class ItineraryError(Exception):
+    """Többmegállós tervezés hiba (pl. nem elérhető megálló)."""
+    pass
+
+
+class ItineraryLeg(NamedTuple):
+    origin: str
+    destination: str
+    distance_km: float
+    duration_min: float
+
+
+class ItineraryResult(NamedTuple):
+    order: List[str]
+    legs: List[ItineraryLeg]
+    total_distance_km: float
+    total_duration_min: float
+    exact: bool                 # Held–Karp (True) vagy heurisztika (False)
+    flight_cost: CostRange      # szakaszonkénti repülős becslés összege
+    transit_cost: CostRange     # szakaszonkénti tömegközlekedés becslés összege
+    car_cost: Optional[CarCost]  # csak ha van autó konfiguráció
+
+
+def path_cost(cost: np.ndarray, order: Sequence[int], return_to_start: bool) -> float:
+    idx = np.asarray(order)
+    total = float(cost[idx[:-1], idx[1:]].sum())
+    if return_to_start and len(order) > 1:
+        total += float(cost[order[-1], order[0]])
+    return total
+
+
+def held_karp(cost: np.ndarray, return_to_start: bool = False) -> List[int]:
+    """
+    Pontos megoldás 0-s kiindulóponttal, O(2^n · n^2) idő, O(2^n · n) memória.
+    Maszkonként egyetlen NumPy lépés (az utolsó és az előző csúcs szerint vektorizálva).
+    """
+    n = cost.shape[0]
+    if n <= 2:
+        return list(range(n))
+
+    m = n - 1                      # a 0. csúcson kívüli csúcsok (1..n-1) bitmaszkja
+    full = (1 << m) - 1
+    inf = np.inf
+    dp = np.full((1 << m, m), inf)
+    parent = np.full((1 << m, m), -1, dtype=np.int64)
+    for j in range(m):
+        dp[1 << j, j] = cost[0, j + 1]
+
+    sub = cost[1:, 1:]
+    bits = 1 << np.arange(m)
+    for mask in range(1, full + 1):
+        js = np.nonzero(bits & mask)[0]
+        if len(js) < 2:
+            continue
+        # cand[a, k] = dp[mask \ {js[a]}, k] + sub[k, js[a]]; a nem érvényes k-kra dp már inf
+        cand = dp[mask ^ bits[js]] + sub[:, js].T
+        best = np.argmin(cand, axis=1)
+        dp[mask, js] = cand[np.arange(len(js)), best]
+        parent[mask, js] = best
+
+    final = dp[full] + (cost[1:, 0] if return_to_start else 0.0)
+    last = int(np.argmin(final))
+    if not np.isfinite(final[last]):
+        raise ItineraryError("Nem minden megálló érhető el a megadott közlekedési móddal.")
+
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        prev_last = int(parent[mask, last])
+        mask ^= 1 << last
+        last = prev_last
+    order.append(0)
+    return order[::-1]
+
+
+def nearest_neighbour(cost: np.ndarray) -> List[int]:
+    n = cost.shape[0]
+    order = [0]
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, cost[order[-1]])
+        nxt = int(np.argmin(row))
+        order.append(nxt)
+        visited[nxt] = True
+    return order
+
+
+def improve(cost: np.ndarray, order: List[int], return_to_start: bool, max_rounds: int = 50) -> List[int]:
+    """
+    2-opt (szakasz megfordítása) és Or-opt (1–3 hosszú szakasz áthelyezése),
+    amíg javul. A mátrix aszimmetrikus is lehet, ezért teljes költséget számolunk.
+    """
+    best = list(order)
+    best_cost = path_cost(cost, best, return_to_start)
+    n = len(best)
+
+    for _ in range(max_rounds):
+        improved = False
+
+        # 2-opt: best[i:j] megfordítása (a 0. elem, a kiindulópont, fix)
+        for i in range(1, n - 1):
+            for j in range(i + 2, n + 1):
+                candidate = best[:i] + best[i:j][::-1] + best[j:]
+                c = path_cost(cost, candidate, return_to_start)
+                if c < best_cost - 1e-9:
+                    best, best_cost, improved = candidate, c, True
+
+        # Or-opt: 1–3 hosszú szakasz áthelyezése máshová
+        for length in (1, 2, 3):
+            for i in range(1, n - length + 1):
+                segment = best[i:i + length]
+                rest = best[:i] + best[i + length:]
+                for pos in range(1, len(rest) + 1):
+                    if pos == i:
+                        continue
+                    candidate = rest[:pos] + segment + rest[pos:]
+                    c = path_cost(cost, candidate, return_to_start)
+                    if c < best_cost - 1e-9:
+                        best, best_cost, improved = candidate, c, True
+                        break
+                else:
+                    continue
+                break
+
+        if not improved:
+            break
+    return best
+
+
+def solve_order(cost: np.ndarray, return_to_start: bool = False):
+    """(sorrend, pontos-e) – a mérettől függően Held–Karp vagy heurisztika."""
+    cost = np.where(np.isnan(cost), np.inf, cost)
+    if cost.shape[0] <= EXACT_MAX_STOPS:
+        return held_karp(cost, return_to_start), True
+
+    order = improve(cost, nearest_neighbour(cost), return_to_start)
+    if not np.isfinite(path_cost(cost, order, return_to_start)):
+        raise ItineraryError("Nem minden megálló érhető el a megadott közlekedési móddal.")
+    return order, False
+
+
+def plan_itinerary(
+    stops: Sequence[str],
+    travelmode: str = "driving",
+    optimize: str = "duration",
+    return_to_start: bool = False,
+    car_config: Optional[dict] = None,
+    use_cache: bool = True,
+) -> ItineraryResult:
+    """
+    stops[0] a kiindulópont. optimize: "duration" (idő) vagy "distance" (távolság).
+    A távolság / idő mátrix egyetlen (cache-elt) Distance Matrix lekérésből jön.
+    """
+    stops = [s.strip() for s in stops if s and s.strip()]
+    if len(stops) < 2:
+        raise ItineraryError("Legalább két megálló kell (kiindulópont + cél).")
+    if optimize not in ("duration", "distance"):
+        raise ItineraryError(f"Ismeretlen optimalizálási szempont: {optimize}")
+
+    matrix = get_route_matrix(stops, stops, travelmode, use_cache=use_cache)
+    n = len(stops)
+    distance = np.frombuffer(matrix.distance_km, dtype=float).reshape(n, n).copy()
+    duration = np.frombuffer(matrix.duration_min, dtype=float).reshape(n, n).copy()
+    np.fill_diagonal(distance, 0.0)
+    np.fill_diagonal(duration, 0.0)
+
+    order, exact = solve_order(duration if optimize == "duration" else distance, return_to_start)
+
+    path = list(order) + ([order[0]] if return_to_start else [])
+    src, dst = np.asarray(path[:-1]), np.asarray(path[1:])
+    leg_km = distance[src, dst]
+    leg_min = duration[src, dst]
+
+    legs = [
+        ItineraryLeg(stops[a], stops[b], float(km), float(mins))
+        for a, b, km, mins in zip(src, dst, leg_km, leg_min)
+    ]
+
+    # költségek a meglévő modellekkel, egy lépésben az összes szakaszra
+    flights = flight_cost(leg_km)
+    transits = transit_cost(leg_km)
+    total_km = float(leg_km.sum())
+    car = None
+    if car_config is not None:
+        car = car_cost(total_km, car_config["consumption_l_per_100km"], car_config["fuel_price_per_liter"])
+
+    return ItineraryResult(
+        order=[stops[i] for i in order],
+        legs=legs,
+        total_distance_km=total_km,
+        total_duration_min=float(leg_min.sum()),
+        exact=exact,
+        flight_cost=CostRange(*(float(part.sum()) for part in flights)),
+        transit_cost=CostRange(*(float(part.sum()) for part in transits)),
+        car_cost=car,
+    )
@@ -12,17 +12,42 @@ from PySide6.QtWidgets import (
     QDialog,
     QDialogButtonBox,
     QDoubleSpinBox,
-    QTabWidget
+    QTabWidget,
+    QCheckBox,
+    QInputDialog,
+    QPlainTextEdit,
+    QFileDialog,
+    QCompleter,
+    QTableView,
+    QListView,
+    QHeaderView,
+    QAbstractItemView,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QStringListModel
+from PySide6.QtGui import QTextCursor, QFontDatabase
+import time
 import webbrowser
 from urllib.parse import quote_plus
-from app.google_routes import get_route_info, RouteError
-from app.ai_recommend import (
-    ask_travel_ai,
-    AIRecommendError,
-    set_hf_token,
-)
+from app.workers import TaskRunner
+from app.metrics import REGISTRY, inc, observe, span
+from app.report_model import DestinationRouteModel, RouteReportModel, SessionLogModel, TransitSegmentModel
+from app.route_info import RouteInfo
+
+# A nehéz backendeket (requests, huggingface_hub, numpy) csak első használatkor
+# importáljuk a kezelő metódusokban – így gyorsabb a hidegindítás.
+
+# ennyi ms gépelési szünet után indul az előtöltés
+PREFETCH_DEBOUNCE_MS = 800
+
+# az AI fül szövege legfeljebb ennyi bekezdés (a legrégebbiek kiesnek)
+AI_MAX_BLOCKS = 2000
+
+# alternatív útvonalak rangsora: felirat → app.alternatives.RANK_BY
+RANK_OPTIONS = {"Idő szerint": "time", "Költség szerint": "cost", "Súlyozott (idő + költség)": "score"}
+
+# indulási idő keresés: időablak (felirat → óra) és lépésköz (perc)
+SWEEP_HORIZONS = {"3 óra": 3, "6 óra": 6, "12 óra": 12, "24 óra": 24}
+SWEEP_STEPS = (15, 30, 60)
 
 class HuggingFaceTokenDialog(QDialog):
     def __init__(self, parent=None):
@@ -116,6 +141,10 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.car_config = None  # ide mentjük a felhasználó autójának beállítását (dict)
 
+        # Directions / HuggingFace hívások háttérszálon, hogy ne fagyjon a felület
+        self.tasks = TaskRunner(self)
+        self._ai_clicked_at = None
+
         self.setWindowTitle("Travelling Guidance")
         self.setMinimumSize(900, 600)
 
@@ -146,6 +175,10 @@ class MainWindow(QMainWindow):
         self.destination_input.setPlaceholderText("Pl. Róma")
         form_layout.addRow("Hová:", self.destination_input)
 
+        # helynév kiegészítés a helyi indexből (app.gazetteer)
+        for line_edit in (self.origin_input, self.destination_input):
+            self._attach_place_completer(line_edit)
+
         # Mivel
         self.mode_combo = QComboBox()
         self.mode_combo.addItems([
@@ -155,6 +188,25 @@ class MainWindow(QMainWindow):
         ])
         form_layout.addRow("Mivel:", self.mode_combo)
 
+        # alternatív útvonalak (autó / tömegközlekedés): beárazva, rangsorolva
+        self.alternatives_check = QCheckBox("Alternatív útvonalak")
+        self.rank_combo = QComboBox()
+        self.rank_combo.addItems(list(RANK_OPTIONS))
+        self.rank_combo.setEnabled(False)
+        self.alternatives_check.toggled.connect(self.rank_combo.setEnabled)
+        form_layout.addRow(self.alternatives_check, self.rank_combo)
+
+        # spekulatív előtöltés: a bevitel "megnyugvása" után minden módra (app.prefetch)
+        self.prefetcher = None
+        self._shown_pair = None
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DEBOUNCE_MS)
+        self.prefetch_timer.timeout.connect(self._run_prefetch)
+        self.origin_input.textChanged.connect(self.prefetch_timer.start)
+        self.destination_input.textChanged.connect(self.prefetch_timer.start)
+        self.mode_combo.currentTextChanged.connect(self._on_mode_changed)
+
         left_layout.addLayout(form_layout)
 
         # Saját jármű konfigurálása gomb
@@ -184,26 +236,224 @@ class MainWindow(QMainWindow):
         token_action = settings_menu.addAction("HuggingFace token beállítása…")
         token_action.triggered.connect(self.on_set_hf_token)
 
+        model_action = settings_menu.addAction("AI modell kiválasztása…")
+        model_action.triggered.connect(self.on_select_model)
+
+        prefetch_action = settings_menu.addAction("Előtöltési keret beállítása…")
+        prefetch_action.triggered.connect(self.on_set_prefetch_budget)
+
         # --- 1. fül: Napló / infók (a régi panel) ---
         log_panel = QWidget(self)
         log_layout = QVBoxLayout(log_panel)
 
-        result_label = QLabel("Információk / napló")
-        result_label.setStyleSheet("font-size: 18px; font-weight: bold;")
-        log_layout.addWidget(result_label)
+        self.report_title = QLabel("Információk / napló")
+        self.report_title.setStyleSheet("font-size: 18px; font-weight: bold;")
+        log_layout.addWidget(self.report_title)
+
+        # útvonal jelentés és szakaszok: model/view, csak a látható sorok rajzolódnak
+        self.report_model = RouteReportModel(self)
+        self.report_view = self._make_table_view(self.report_model)
+        log_layout.addWidget(self.report_view, 3)
+
+        self.segment_model = TransitSegmentModel(self)
+        self.segment_view = self._make_table_view(self.segment_model)
+        self.segment_view.hide()
+        log_layout.addWidget(self.segment_view, 2)
+
+        # munkamenet napló: korlátos gyűrűpuffer (LOG_MAX_ENTRIES sor)
+        log_label = QLabel("Napló")
+        log_label.setStyleSheet("font-weight: bold;")
+        log_layout.addWidget(log_label)
+        self.log_model = SessionLogModel(parent=self)
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        log_layout.addWidget(self.log_view, 1)
+        self.log("Add meg a honnan–hová adatokat, az útvonal adatai itt jelennek meg.")
+
+        right_tabs.addTab(log_panel, "Napló")
 
-        self.result_text = QTextEdit()
-        self.result_text.setReadOnly(True)
-        self.result_text.setPlaceholderText(
-            "Itt látod majd az útvonaladatokat, költségbecslést, stb."
+        # --- Térkép fül (a térkép widget első megnyitáskor épül fel) ---
+        self.map_panel = QWidget(self)
+        right_tabs.addTab(self.map_panel, "Térkép")
+        self._map_url = None
+
+        # --- Indulási idő fül (első megnyitáskor épül fel) ---
+        self.sweep_panel = QWidget(self)
+        right_tabs.addTab(self.sweep_panel, "Indulási idő")
+
+        # --- 2. fül: AI úti cél ajánló (a tartalma első megnyitáskor épül fel) ---
+        self.ai_panel = QWidget(self)
+        right_tabs.addTab(self.ai_panel, "AI ajánló")
+        right_tabs.currentChanged.connect(self._on_tab_changed)
+        self.right_tabs = right_tabs
+
+        # --- 3. fül: Többmegállós út (sorrend optimalizálás) ---
+        trip_panel = QWidget(self)
+        trip_layout = QVBoxLayout(trip_panel)
+
+        trip_title = QLabel("Többmegállós út")
+        trip_title.setStyleSheet("font-size: 18px; font-weight: bold;")
+        trip_layout.addWidget(trip_title)
+
+        self.trip_stops = QPlainTextEdit()
+        self.trip_stops.setPlaceholderText(
+            "Soronként egy megálló, az első a kiindulópont.\n"
+            "Pl.:\nBudapest\nBécs\nPrága\nMünchen\nZágráb"
         )
-        log_layout.addWidget(self.result_text)
+        self.trip_stops.setFixedHeight(140)
+        trip_layout.addWidget(self.trip_stops)
+
+        trip_form = QFormLayout()
+        self.trip_optimize_combo = QComboBox()
+        self.trip_optimize_combo.addItems(["Idő", "Távolság"])
+        trip_form.addRow("Optimalizálás:", self.trip_optimize_combo)
+        self.trip_return_check = QCheckBox("Visszatérés a kiindulópontra")
+        trip_form.addRow("", self.trip_return_check)
+        trip_layout.addLayout(trip_form)
+
+        self.trip_button = QPushButton("Sorrend optimalizálása")
+        self.trip_button.clicked.connect(self.on_itinerary_clicked)
+        trip_layout.addWidget(self.trip_button)
+
+        self.trip_result = QTextEdit()
+        self.trip_result.setReadOnly(True)
+        trip_layout.addWidget(self.trip_result, 1)
+
+        right_tabs.addTab(trip_panel, "Többmegállós út")
+
+        # --- 4. fül: Metrikák (élő időmérések) ---
+        self.metrics_panel = QWidget(self)
+        metrics_layout = QVBoxLayout(self.metrics_panel)
+
+        metrics_title = QLabel("Metrikák (időmérések, számlálók)")
+        metrics_title.setStyleSheet("font-size: 18px; font-weight: bold;")
+        metrics_layout.addWidget(metrics_title)
+
+        self.metrics_text = QPlainTextEdit()
+        self.metrics_text.setReadOnly(True)
+        self.metrics_text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        metrics_layout.addWidget(self.metrics_text, 1)
+
+        metrics_buttons = QHBoxLayout()
+        export_json_button = QPushButton("Export JSON…")
+        export_json_button.clicked.connect(lambda: self.on_export_metrics("json"))
+        metrics_buttons.addWidget(export_json_button)
+        export_prom_button = QPushButton("Export Prometheus…")
+        export_prom_button.clicked.connect(lambda: self.on_export_metrics("prometheus"))
+        metrics_buttons.addWidget(export_prom_button)
+        reset_button = QPushButton("Nullázás")
+        reset_button.clicked.connect(self.on_reset_metrics)
+        metrics_buttons.addWidget(reset_button)
+        metrics_layout.addLayout(metrics_buttons)
+
+        right_tabs.addTab(self.metrics_panel, "Metrikák")
+
+        # csak akkor frissítünk, ha a Metrikák fül látszik
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(1000)
+        self.metrics_timer.timeout.connect(self._refresh_metrics)
 
-        right_tabs.addTab(log_panel, "Napló")
+        # --- jobb oldal hozzáadása a fő layouthoz ---
+        main_layout.addWidget(left_panel, 1)
+        main_layout.addWidget(right_tabs, 2)
+
+        self.statusBar().showMessage(
+            "Add meg a honnan–hová adatokat, vagy próbáld ki az AI úti cél ajánlót."
+        )
+
+    def _make_table_view(self, model) -> QTableView:
+        view = QTableView()
+        view.setModel(model)
+        view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        view.setWordWrap(False)
+        view.verticalHeader().hide()
+        # rögzített sormagasság: a nézetnek nem kell minden sort megmérnie
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 6)
+        view.horizontalHeader().setStretchLastSection(True)
+        return view
+
+    def log(self, text: str):
+        self.log_model.append(text)
+        self.log_view.scrollToBottom()
+
+    # --- Helynév kiegészítés ---
+    def _attach_place_completer(self, line_edit: QLineEdit):
+        model = QStringListModel(line_edit)
+        completer = QCompleter(model, line_edit)
+        # a szűrést az index végzi (ékezet-független prefix), a Qt ne szűrjön újra
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        completer.setMaxVisibleItems(10)
+        line_edit.setCompleter(completer)
+        line_edit.textEdited.connect(
+            lambda text: self._update_place_completions(completer, model, text)
+        )
+
+    def _update_place_completions(self, completer: QCompleter, model: QStringListModel, text: str):
+        from app.gazetteer import complete_place
+
+        with span("gui.place_complete"):
+            names = complete_place(text) if len(text.strip()) >= 2 else []
+        model.setStringList(names)
+        if names:
+            completer.complete()
+
+    def _on_tab_changed(self, index: int):
+        widget = self.right_tabs.widget(index)
+        if widget is self.ai_panel:
+            self._ensure_ai_tab()
+        elif widget is self.map_panel:
+            self._ensure_map_tab()
+        elif widget is self.sweep_panel:
+            self._ensure_sweep_tab()
+
+        if widget is self.metrics_panel:
+            self._refresh_metrics()
+            self.metrics_timer.start()
+        else:
+            self.metrics_timer.stop()
+
+    def _refresh_metrics(self):
+        from app.scheduler import format_stats
+
+        # API ütemezők: sorhossz (interaktív / háttér), futó hívások, adaptív korlát
+        scheduler_stats = format_stats()
+        text = REGISTRY.format_table()
+        if scheduler_stats:
+            text += "\n\n" + scheduler_stats
+        self.metrics_text.setPlainText(text)
+
+    def on_export_metrics(self, fmt: str):
+        if fmt == "json":
+            path, _ = QFileDialog.getSaveFileName(self, "Metrikák mentése", "metrics.json", "JSON (*.json)")
+            content = REGISTRY.export_json()
+        else:
+            path, _ = QFileDialog.getSaveFileName(self, "Metrikák mentése", "metrics.prom", "Prometheus (*.prom *.txt)")
+            content = REGISTRY.export_prometheus()
+        if not path:
+            return
 
-        # --- 2. fül: AI úti cél ajánló ---
-        ai_panel = QWidget(self)
-        ai_layout = QVBoxLayout(ai_panel)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        except OSError as e:
+            self.statusBar().showMessage(f"Nem sikerült menteni a metrikákat: {e}")
+            return
+        self.statusBar().showMessage(f"Metrikák mentve: {path}")
+
+    def on_reset_metrics(self):
+        REGISTRY.reset()
+        self._refresh_metrics()
+
+    def _ensure_ai_tab(self):
+        """Az AI fül widgetjei csak első használatkor jönnek létre."""
+        if hasattr(self, "ai_details"):
+            return
+
+        ai_layout = QVBoxLayout(self.ai_panel)
 
         ai_title = QLabel("AI úti cél ajánló")
         ai_title.setStyleSheet("font-size: 18px; font-weight: bold;")
@@ -219,10 +469,21 @@ class MainWindow(QMainWindow):
         self.ai_prompt.setFixedHeight(120)
         ai_layout.addWidget(self.ai_prompt)
 
-        # Gomb az AI hívására
+        # Gomb az AI hívására + generálás leállítása
+        ai_buttons = QHBoxLayout()
         self.ai_button = QPushButton("Ajánlások lekérése")
         self.ai_button.clicked.connect(self.on_ai_request_clicked)
-        ai_layout.addWidget(self.ai_button)
+        ai_buttons.addWidget(self.ai_button, 1)
+
+        self.ai_stop_button = QPushButton("Leállítás")
+        self.ai_stop_button.setEnabled(False)
+        self.ai_stop_button.clicked.connect(self.on_ai_stop_clicked)
+        ai_buttons.addWidget(self.ai_stop_button)
+        ai_layout.addLayout(ai_buttons)
+
+        # Cache megkerülése: mindig friss generálás (fizetős hívás!)
+        self.ai_bypass_cache = QCheckBox("Cache kihagyása (friss válasz kérése)")
+        ai_layout.addWidget(self.ai_bypass_cache)
 
         # AI válasz – egy nagy textbox
         self.ai_details = QTextEdit()
@@ -230,18 +491,161 @@ class MainWindow(QMainWindow):
         self.ai_details.setPlaceholderText(
             "Itt jelenik meg az AI által javasolt úti célok listája és leírása."
         )
+        # hosszú munkamenetben se nőjön korlátlanul a dokumentum
+        self.ai_details.document().setMaximumBlockCount(AI_MAX_BLOCKS)
         # 1-es stretch, hogy szépen kitöltse a maradék helyet
         ai_layout.addWidget(self.ai_details, 1)
 
-        right_tabs.addTab(ai_panel, "AI ajánló")
+        # Ajánlott úti célok → útvonal + költség a Honnan mezőből (app.destinations)
+        ai_routes_row = QHBoxLayout()
+        self.ai_routes_button = QPushButton("Útvonal és költség az ajánlott helyekhez")
+        self.ai_routes_button.setEnabled(False)
+        self.ai_routes_button.clicked.connect(self.on_ai_routes_clicked)
+        ai_routes_row.addWidget(self.ai_routes_button)
+        self.ai_routes_info = QLabel("")
+        ai_routes_row.addWidget(self.ai_routes_info, 1)
+        ai_layout.addLayout(ai_routes_row)
+
+        self.destination_model = DestinationRouteModel(self)
+        self.destination_view = self._make_table_view(self.destination_model)
+        self.destination_view.setSortingEnabled(True)
+        self.destination_view.sortByColumn(3, Qt.AscendingOrder)
+        self.destination_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        self.destination_view.setToolTip("Dupla kattintás: úti cél átvétele a Hová mezőbe.")
+        self.destination_view.doubleClicked.connect(self._on_destination_activated)
+        self.destination_view.hide()
+        ai_layout.addWidget(self.destination_view, 1)
+
+    def _ensure_map_tab(self):
+        """A térkép (és a numpy-s rajzolás) csak első használatkor töltődik be."""
+        if hasattr(self, "map_view"):
+            return
 
-        # --- jobb oldal hozzáadása a fő layouthoz ---
-        main_layout.addWidget(left_panel, 1)
-        main_layout.addWidget(right_tabs, 2)
+        from app.map_view import RouteMapView
+
+        map_layout = QVBoxLayout(self.map_panel)
+        self.map_view = RouteMapView(self.map_panel)
+        map_layout.addWidget(self.map_view, 1)
+
+        map_buttons = QHBoxLayout()
+        self.map_info = QLabel("Görgő: nagyítás, húzás: mozgatás.")
+        map_buttons.addWidget(self.map_info, 1)
+        fit_button = QPushButton("Illesztés")
+        fit_button.clicked.connect(self.map_view.fit_route)
+        map_buttons.addWidget(fit_button)
+        browser_button = QPushButton("Megnyitás böngészőben")
+        browser_button.clicked.connect(self.on_open_in_browser)
+        map_buttons.addWidget(browser_button)
+        map_layout.addLayout(map_buttons)
+
+    def _ensure_sweep_tab(self):
+        """Indulási idő keresés: beállítások + idősor (app.sweep_view)."""
+        if hasattr(self, "sweep_chart"):
+            return
 
-        self.statusBar().showMessage(
-            "Add meg a honnan–hová adatokat, vagy próbáld ki az AI úti cél ajánlót."
+        from app.sweep_view import DepartureSweepChart
+
+        sweep_layout = QVBoxLayout(self.sweep_panel)
+
+        sweep_title = QLabel("Mikor induljak?")
+        sweep_title.setStyleSheet("font-size: 18px; font-weight: bold;")
+        sweep_layout.addWidget(sweep_title)
+
+        sweep_form = QHBoxLayout()
+        sweep_form.addWidget(QLabel("Időablak:"))
+        self.sweep_horizon_combo = QComboBox()
+        for label, hours in SWEEP_HORIZONS.items():
+            self.sweep_horizon_combo.addItem(label, hours)
+        self.sweep_horizon_combo.setCurrentIndex(len(SWEEP_HORIZONS) - 1)
+        sweep_form.addWidget(self.sweep_horizon_combo)
+        sweep_form.addWidget(QLabel("Lépésköz:"))
+        self.sweep_step_combo = QComboBox()
+        for minutes in SWEEP_STEPS:
+            self.sweep_step_combo.addItem(f"{minutes} perc", minutes)
+        sweep_form.addWidget(self.sweep_step_combo)
+        sweep_form.addStretch(1)
+        sweep_layout.addLayout(sweep_form)
+
+        sweep_buttons = QHBoxLayout()
+        self.sweep_button = QPushButton("Legjobb indulás keresése")
+        self.sweep_button.clicked.connect(self.on_sweep_clicked)
+        sweep_buttons.addWidget(self.sweep_button, 1)
+        self.sweep_stop_button = QPushButton("Leállítás")
+        self.sweep_stop_button.setEnabled(False)
+        self.sweep_stop_button.clicked.connect(self.on_sweep_stop_clicked)
+        sweep_buttons.addWidget(self.sweep_stop_button)
+        sweep_layout.addLayout(sweep_buttons)
+
+        self.sweep_info = QLabel("Autónál a forgalommal számolt, tömegközlekedésnél a menetrend szerinti idő.")
+        self.sweep_info.setWordWrap(True)
+        sweep_layout.addWidget(self.sweep_info)
+
+        self.sweep_chart = DepartureSweepChart(self.sweep_panel)
+        sweep_layout.addWidget(self.sweep_chart, 1)
+
+    # ==== Indulási idő keresés ====
+    def on_sweep_clicked(self):
+        pair = self._current_pair()
+        if pair is None:
+            self.statusBar().showMessage("Hiba: töltsd ki a Honnan és Hová mezőket!")
+            return
+        origin, destination = pair
+
+        travelmode, mode_text = self._get_travelmode()
+        self._ensure_sweep_tab()
+        if mode_text == "Repülő":
+            self.sweep_info.setText("Repülőnél nincs menetidő-előrejelzés – válassz autót vagy tömegközlekedést.")
+            return
+
+        from app.sweep import departure_slots, iter_departure_sweep
+
+        horizon_h = self.sweep_horizon_combo.currentData()
+        step_min = self.sweep_step_combo.currentData()
+        start = time.time()
+        slots = departure_slots(start, horizon_h, step_min)
+
+        self.sweep_chart.clear()
+        self.sweep_chart.set_span(slots[0], slots[-1])
+        self.sweep_info.setText(f"{origin} → {destination} ({mode_text}): {len(slots)} indulási idő, keresés…")
+        self.tasks.submit_stream(
+            "sweep",
+            iter_departure_sweep,
+            origin,
+            destination,
+            travelmode,
+            start=start,
+            horizon_h=horizon_h,
+            step_min=step_min,
+            on_chunk=self.sweep_chart.add_point,
+            on_result=lambda _: self._on_sweep_finished(origin, destination, mode_text, len(slots)),
+            on_error=self._on_sweep_error,
+        )
+        self.sweep_stop_button.setEnabled(True)
+        self.statusBar().showMessage("Indulási idők kiértékelése folyamatban…")
+
+    def _on_sweep_finished(self, origin: str, destination: str, mode_text: str, n_slots: int):
+        self.sweep_stop_button.setEnabled(False)
+        best = self.sweep_chart.best
+        if best is None:
+            self.sweep_info.setText("Nincs kiértékelt indulási idő.")
+            return
+        when = time.strftime("%m.%d. %H:%M", time.localtime(best.departure))
+        self.sweep_info.setText(
+            f"{origin} → {destination} ({mode_text}): legjobb indulás {when}, "
+            f"{best.duration_min:.0f} perc ({self.sweep_chart.point_count} / {n_slots} időpont lekérdezve)"
         )
+        self.log(f"Legjobb indulás: {origin} → {destination} ({mode_text}) {when}, {best.duration_min:.0f} perc")
+        self.statusBar().showMessage("Indulási idő keresés kész.")
+
+    def on_sweep_stop_clicked(self):
+        self.tasks.cancel("sweep")
+        self.sweep_stop_button.setEnabled(False)
+        self.statusBar().showMessage("Indulási idő keresés leállítva.")
+
+    def _on_sweep_error(self, error: Exception):
+        self.sweep_stop_button.setEnabled(False)
+        self.sweep_info.setText(f"Hiba az indulási idők lekérésekor: {error}")
+        self.statusBar().showMessage("Hiba az indulási idő keresésben.")
 
     # --- Segéd: a comboboxból Google travelmode + felirat ---
     def _get_travelmode(self):
@@ -251,206 +655,409 @@ class MainWindow(QMainWindow):
         elif mode_text == "Tömegközlekedés":
             return "transit", mode_text
         elif mode_text == "Repülő":
-            # Directions API nem tud airplane módot,
-            # driving-et használunk a távolság/idő becsléshez.
+            # Repülőhöz offline repülőtér indexet használunk (app.airports);
+            # driving csak tartalék, ha a hely nincs az adatbázisban.
             return "driving", mode_text
         else:
             return "driving", mode_text
 
     # ==== Útvonal megjelenítése térképen ====
     def on_route_clicked(self):
-        origin = self.origin_input.text().strip()
-        destination = self.destination_input.text().strip()
-
-        if not origin or not destination:
+        pair = self._current_pair()
+        if pair is None:
             self.statusBar().showMessage("Hiba: töltsd ki a Honnan és Hová mezőket!")
             return
+        origin, destination = pair
 
         travelmode, mode_text = self._get_travelmode()
-
-        origin_enc = quote_plus(origin)
-        destination_enc = quote_plus(destination)
-
-        url = (
+        self._map_url = (
             "https://www.google.com/maps/dir/?api=1"
-            f"&origin={origin_enc}"
-            f"&destination={destination_enc}"
+            f"&origin={quote_plus(origin)}"
+            f"&destination={quote_plus(destination)}"
             f"&travelmode={travelmode}"
         )
 
-        webbrowser.open(url)
+        self._ensure_map_tab()
+        self.right_tabs.setCurrentWidget(self.map_panel)
+
+        if mode_text == "Repülő":
+            from app.airports import FlightEstimateError
+            from app.map_view import flight_points
+
+            # offline: gömbi ív a két repülőtér között, hálózati hívás nélkül
+            try:
+                points, estimate = flight_points(origin, destination)
+            except FlightEstimateError:
+                pass
+            else:
+                self.tasks.cancel("map")
+                self.map_view.set_route(points, estimate.origin.iata, estimate.destination.iata)
+                self.map_info.setText(
+                    f"{estimate.origin.iata} → {estimate.destination.iata}: "
+                    f"{estimate.distance_km:.0f} km (gömbi ív)"
+                )
+                self.statusBar().showMessage("Repülős útvonal megjelenítve (offline).")
+                return
 
-        self.result_text.setPlainText(
-            "Útvonal megjelenítése térképen:\n\n"
-            f"Honnan: {origin}\n"
-            f"Hová: {destination}\n"
-            f"Mivel: {mode_text}\n\n"
-            f"Megnyitott Google Maps URL:\n{url}"
+        from app.map_view import load_route_points
+
+        self.map_info.setText(f"{origin} → {destination} ({mode_text}): betöltés…")
+        self.tasks.submit(
+            "map",
+            load_route_points,
+            origin,
+            destination,
+            travelmode,
+            on_result=lambda points: self._show_route_map(origin, destination, mode_text, points),
+            on_error=self._on_map_error,
         )
+        self.statusBar().showMessage("Útvonal geometria lekérése folyamatban…")
+
+    def _show_route_map(self, origin: str, destination: str, mode_text: str, points):
+        self.map_view.set_route(points, origin, destination)
+        self.map_info.setText(f"{origin} → {destination} ({mode_text}): {len(points)} pont")
+        self.statusBar().showMessage("Útvonal megjelenítve a térképen.")
+
+    def _on_map_error(self, error: Exception):
+        self.map_view.clear_route()
+        self.map_info.setText(f"Nem sikerült betölteni az útvonalat: {error}")
+        self.statusBar().showMessage("Hiba a térkép betöltésekor – a böngészős nézet még elérhető.")
+
+    def on_open_in_browser(self):
+        """A korábbi viselkedés: az útvonal megnyitása a Google Maps-ben."""
+        if self._map_url is None:
+            self.statusBar().showMessage("Előbb jeleníts meg egy útvonalat.")
+            return
+        webbrowser.open(self._map_url)
         self.statusBar().showMessage("Útvonal megnyitva a Google Maps-ben.")
 
     # ==== Költség tervezés (Directions API + számolás) ====
-    def on_cost_clicked(self):
+    def _current_pair(self):
+        """(honnan, hová) kanonikus névvel, vagy None, ha valamelyik üres."""
         origin = self.origin_input.text().strip()
         destination = self.destination_input.text().strip()
-
         if not origin or not destination:
+            return None
+
+        from app.gazetteer import canonical_place
+
+        # egységes név ("roma", "Rome" → "Róma"): kevesebb hibás hívás, több cache találat
+        return canonical_place(origin), canonical_place(destination)
+
+    def on_cost_clicked(self):
+        pair = self._current_pair()
+        if pair is None:
             self.statusBar().showMessage("Hiba: töltsd ki a Honnan és Hová mezőket!")
             return
+        origin, destination = pair
 
         travelmode, mode_text = self._get_travelmode()
+        clicked_at = time.perf_counter()
 
-        # Directions API hívása
-        try:
-            info = get_route_info(origin, destination, travelmode)
-        except RouteError as e:
-            self.result_text.setPlainText(
-                f"Nem sikerült lekérdezni az útvonal adatait:\n{e}"
+        if self.alternatives_check.isChecked() and mode_text != "Repülő":
+            self._request_alternatives(origin, destination, travelmode, mode_text, clicked_at)
+            return
+
+        if self._render_instant(origin, destination, travelmode, mode_text, clicked_at):
+            return
+
+        from app.google_routes import get_route_info
+
+        # Directions API hívása háttérszálon (az előző, még futó kérést felülírja);
+        # ha épp előtöltés fut ugyanerre, a single-flight réteg arra ül rá
+        self.tasks.submit(
+            "route",
+            get_route_info,
+            origin,
+            destination,
+            travelmode,
+            on_result=lambda info: self._show_cost_result(origin, destination, mode_text, info, clicked_at),
+            on_error=self._on_route_error,
+        )
+        self.statusBar().showMessage("Útvonal adatok lekérése folyamatban…")
+
+    def _request_alternatives(self, origin: str, destination: str, travelmode: str, mode_text: str, clicked_at):
+        from app.alternatives import get_ranked_alternatives
+
+        by = RANK_OPTIONS[self.rank_combo.currentText()]
+        car = self.car_config or {}
+        self.tasks.submit(
+            "route",
+            get_ranked_alternatives,
+            origin,
+            destination,
+            travelmode,
+            by,
+            car.get("consumption_l_per_100km"),
+            car.get("fuel_price_per_liter"),
+            on_result=lambda ranked: self._show_cost_result(
+                origin, destination, mode_text, ranked[0].info, clicked_at, ranked
+            ),
+            on_error=self._on_route_error,
+        )
+        self.statusBar().showMessage("Alternatív útvonalak lekérése folyamatban…")
+
+    def _render_instant(self, origin: str, destination: str, travelmode: str, mode_text: str, clicked_at) -> bool:
+        """Hálózat nélkül megjeleníthető eredmény (offline repülő vagy előtöltött útvonal)."""
+        info = None
+        if mode_text == "Repülő":
+            from app.airports import FlightEstimateError, estimate_flight
+
+            # hálózat nélkül, mikroszekundumok alatt; ismeretlen helynél Directions
+            try:
+                with span("gui.flight_estimate"):
+                    info = estimate_flight(origin, destination).to_route_info()
+            except FlightEstimateError:
+                pass
+
+        if info is None and self.prefetcher is not None:
+            info = self.prefetcher.get(origin, destination, travelmode)
+            if info is not None:
+                inc("prefetch.used")
+
+        if info is None:
+            return False
+        self.tasks.cancel("route")
+        self._show_cost_result(origin, destination, mode_text, info, clicked_at)
+        return True
+
+    # --- Spekulatív előtöltés ---
+    def _run_prefetch(self):
+        pair = self._current_pair()
+        if pair is None:
+            return
+        origin, destination = pair
+        if min(len(origin), len(destination)) < 2:
+            return
+
+        from app.prefetch import PREFETCH_MODES, Prefetcher
+
+        if self.prefetcher is None:
+            self.prefetcher = Prefetcher()
+        for travelmode in PREFETCH_MODES:
+            if self.prefetcher.get(origin, destination, travelmode) is not None:
+                continue
+            # csatornánként az újabb bevitel felülírja a még várakozó előtöltést;
+            # a hibát csendben elnyeljük (kattintáskor úgyis kiderül)
+            self.tasks.submit(
+                f"prefetch.{travelmode}",
+                self.prefetcher.fetch,
+                origin,
+                destination,
+                travelmode,
+                on_error=lambda error: None,
             )
-            self.statusBar().showMessage("Hiba a Directions API hívásakor.")
+
+    def _on_mode_changed(self, _mode_text: str):
+        # ha az aktuális pár eredménye látszik, a másik mód azonnal jöhet melegből
+        pair = self._current_pair()
+        if pair is None or pair != self._shown_pair:
             return
+        travelmode, mode_text = self._get_travelmode()
+        self._render_instant(pair[0], pair[1], travelmode, mode_text, time.perf_counter())
+
+    def on_set_prefetch_budget(self):
+        """Menüből: óránként hány hálózati előtöltés mehet (0 = kikapcsolva)."""
+        from app.prefetch import PrefetchBudget, Prefetcher
+
+        if self.prefetcher is None:
+            self.prefetcher = Prefetcher()
+        budget: PrefetchBudget = self.prefetcher.budget
+
+        limit, ok = QInputDialog.getInt(
+            self,
+            "Előtöltési keret",
+            "Spekulatív Directions lekérések óránként (0 = kikapcsolva):",
+            budget.limit,
+            0,
+            1000,
+        )
+        if not ok:
+            return
+        budget.set_limit(limit)
+        self.statusBar().showMessage(
+            f"Előtöltési keret: {limit} / óra (most még {budget.remaining()} szabad)."
+        )
 
-        distance_km = info["distance_km"]
-        duration_min = info["duration_min"]
-        traffic_duration_min = info["traffic_duration_min"]
-        warnings = info["warnings"]
-        transit_segments = info.get("transit_segments") or []
+    def _on_route_error(self, error: Exception):
+        from app.google_routes import RouteError
 
-        hours = int(duration_min // 60)
-        mins = int(duration_min % 60)
+        if isinstance(error, RouteError):
+            self.log(f"Nem sikerült lekérdezni az útvonal adatait: {error}")
+        else:
+            self.log(f"Váratlan hiba az útvonal lekérésekor: {error}")
+        self.statusBar().showMessage("Hiba a Directions API hívásakor.")
+
+    def _show_cost_result(
+        self, origin: str, destination: str, mode_text: str, info: RouteInfo, clicked_at=None, ranked=()
+    ):
+        self._shown_pair = (origin, destination)
+        with span("gui.render_cost"):
+            self._render_cost_result(origin, destination, mode_text, info, ranked)
+        if clicked_at is not None:
+            # kattintástól a megjelenítésig (hálózat + feldolgozás + kirajzolás)
+            observe("gui.cost_click_to_render", (time.perf_counter() - clicked_at) * 1000.0)
+        self.statusBar().showMessage("Költségbecslés elkészült.")
 
-        lines = []
-        lines.append("Útvonal adatai (Directions API alapján):\n")
-        lines.append(f"- Honnan: {origin}")
-        lines.append(f"- Hová: {destination}")
-        lines.append(f"- Mivel: {mode_text}")
-        lines.append(f"- Távolság: {distance_km:.1f} km")
+    def _render_cost_result(self, origin: str, destination: str, mode_text: str, info: RouteInfo, ranked=()):
+        from app.cost_model import car_cost, flight_cost, transit_cost
 
-        if mode_text == "Autó":
-            if hours > 0:
-                lines.append(f"- Becsült idő: {hours} óra {mins} perc")
-            else:
-                lines.append(f"- Becsült idő: {mins} perc")
+        def money(value: float) -> str:
+            return f"{value:,.0f}".replace(",", " ")
+
+        def duration(minutes: float) -> str:
+            hours, mins = int(minutes // 60), int(minutes % 60)
+            return f"{hours} óra {mins} perc" if hours > 0 else f"{mins} perc"
+
+        distance_km = info.distance_km
+
+        if info.origin_airport:
+            title = "Útvonal adatai (offline repülőtér adatbázis alapján)"
+        else:
+            title = "Útvonal adatai (Directions API alapján)"
+        rows = [
+            ("Honnan", origin),
+            ("Hová", destination),
+            ("Mivel", mode_text),
+        ]
+        if info.origin_airport:
+            rows.append(("Indulási repülőtér", info.origin_airport))
+            rows.append(("Érkezési repülőtér", info.destination_airport))
+            rows.append(("Légvonalbeli távolság", f"{distance_km:.1f} km"))
+            rows.append(("Becsült repülési idő", f"{int(info.duration_min // 60)} óra {int(info.duration_min % 60)} perc"))
+        else:
+            rows.append(("Távolság", f"{distance_km:.1f} km"))
 
-            if traffic_duration_min is not None:
-                t_hours = int(traffic_duration_min // 60)
-                t_mins = int(traffic_duration_min % 60)
-                if t_hours > 0:
-                    lines.append(f"- Forgalommal: {t_hours} óra {t_mins} perc")
-                else:
-                    lines.append(f"- Forgalommal: {t_mins} perc")
+        if mode_text == "Autó":
+            rows.append(("Becsült idő", duration(info.duration_min)))
+            if info.traffic_duration_min is not None:
+                rows.append(("Forgalommal", duration(info.traffic_duration_min)))
 
         # Autós költség csak akkor, ha autó + van saját jármű
         if mode_text == "Autó" and self.car_config is not None:
             cons = self.car_config["consumption_l_per_100km"]
             price = self.car_config["fuel_price_per_liter"]
-            liters = distance_km / 100.0 * cons
-            cost = liters * price
-
-            lines.append("\nSaját jármű költségbecslés:")
-            lines.append(f"- Autó: {self.car_config['name']}")
-            lines.append(f"- Fogyasztás: {cons:.1f} l/100 km")
-            lines.append(f"- Üzemanyag ár: {price:.0f} Ft/l")
-            lines.append(f"- Becsült üzemanyag igény: {liters:.1f} liter")
-            lines.append(f"- Becsült üzemanyagköltség: {cost:,.0f} Ft".replace(",", " "))
-        elif self.mode_combo.currentText() == "Autó" and self.car_config is None:
-            lines.append("\n[Saját jármű nincs konfigurálva – az autós költségbecsléshez állítsd be a járművet.]")
-
-        # Repülő költségmodell (nagyon egyszerű becslés)
-        if mode_text == "Repülő":
-            d = distance_km
-
-            if d < 800:
-                base = 20000.0
-                per_km = 50.0
-            elif d < 2500:
-                base = 30000.0
-                per_km = 40.0
+            car = car_cost(distance_km, cons, price)
+
+            rows.append(("Saját jármű költségbecslés", None))
+            rows.append(("Autó", self.car_config["name"]))
+            rows.append(("Fogyasztás", f"{cons:.1f} l/100 km"))
+            rows.append(("Üzemanyag ár", f"{price:.0f} Ft/l"))
+            rows.append(("Becsült üzemanyag igény", f"{float(car.liters):.1f} liter"))
+            rows.append(("Becsült üzemanyagköltség", f"{money(float(car.one_way))} Ft"))
+        elif mode_text == "Autó" and self.car_config is None:
+            rows.append(("Saját jármű", "nincs konfigurálva – az autós költségbecsléshez állítsd be a járművet"))
+
+        # Repülő / tömegközlekedés: egyszerű, távolság alapú sávok
+        if mode_text in ("Repülő", "Tömegközlekedés"):
+            if mode_text == "Repülő":
+                rows.append(("Repülőjegy költségbecslés (becsült sáv)", None))
+                rows.append(("Modell", "távolság alapú (nem valós árlista)"))
+                band = flight_cost(distance_km)
             else:
-                base = 40000.0
-                per_km = 35.0
-
-            one_way = base + d * per_km
-            round_trip = one_way * 2.0
+                rows.append(("Tömegközlekedés költségbecslés (becsült sáv)", None))
+                rows.append(("Modell", "km alapú, egyszerű (busz + vonat)"))
+                band = transit_cost(distance_km)
+            low_one_way, high_one_way, low_round, high_round = map(float, band)
+            rows.append(("Odaút", f"~ {money(low_one_way)} – {money(high_one_way)} Ft"))
+            rows.append(("Oda-vissza", f"~ {money(low_round)} – {money(high_round)} Ft"))
+
+        if info.warnings:
+            rows.append(("Figyelmeztetések / akadályok", None))
+            rows.extend(("•", w) for w in info.warnings)
+
+        # alternatívák: a fenti adatok a rangsor elsőjére vonatkoznak
+        if ranked:
+            by_text = self.rank_combo.currentText().lower()
+            rows.append((f"Alternatív útvonalak ({len(ranked)} db, {by_text})", None))
+            for r in ranked:
+                rows.append((
+                    f"{r.rank}. {r.info.summary or 'útvonal'}",
+                    f"{r.info.distance_km:.1f} km, {duration(r.duration_min)}, "
+                    f"~ {money(r.cost_ft)} Ft (pontszám: {r.score:.2f})",
+                ))
+
+        # a szakaszok külön táblában (csak tömegközlekedésnél)
+        segments = info.transit_segments if mode_text == "Tömegközlekedés" else ()
+
+        with span("gui.set_report"):
+            self.report_title.setText(title)
+            self.report_model.set_rows(rows)
+            self.report_view.resizeColumnToContents(0)
+            self.segment_model.set_segments(segments)
+            self.segment_view.setVisible(bool(segments))
+
+        self.log(
+            f"{origin} → {destination} ({mode_text}): {distance_km:.1f} km, {duration(info.duration_min)}"
+        )
 
-            low_one_way = one_way * 0.7
-            high_one_way = one_way * 1.3
-            low_round = round_trip * 0.7
-            high_round = round_trip * 1.3
+    # ==== Többmegállós út: sorrend optimalizálás ====
+    def on_itinerary_clicked(self):
+        stops = [line.strip() for line in self.trip_stops.toPlainText().splitlines() if line.strip()]
+        if len(stops) < 2:
+            self.statusBar().showMessage("Adj meg legalább két megállót (soronként egyet)!")
+            return
 
-            lines.append("\nRepülőjegy költségbecslés (becsült sáv):")
-            lines.append(f"Távolság alapú modell (nem valós árlista)")
-            lines.append(
-                f"- Odaút: ~ {low_one_way:,.0f} – {high_one_way:,.0f} Ft".replace(",", " ")
-            )
-            lines.append(
-                f"- Oda-vissza: ~ {low_round:,.0f} – {high_round:,.0f} Ft".replace(",", " ")
-            )
+        from app.itinerary import plan_itinerary
 
-        if mode_text == "Tömegközlekedés":
-            d = distance_km
+        travelmode, mode_text = self._get_travelmode()
+        optimize = "duration" if self.trip_optimize_combo.currentText() == "Idő" else "distance"
+
+        self.tasks.submit(
+            "itinerary",
+            plan_itinerary,
+            stops,
+            travelmode,
+            optimize,
+            self.trip_return_check.isChecked(),
+            self.car_config,
+            on_result=lambda result: self._show_itinerary(result, mode_text),
+            on_error=self._on_itinerary_error,
+        )
+        self.statusBar().showMessage(f"Többmegállós út tervezése ({len(stops)} megálló)…")
 
-            # hosszabb az út,  olcsóbb / km
-            if d < 300:
-                base = 1000.0
-                per_km = 25.0
-            elif d < 1500:
-                base = 2000.0
-                per_km = 18.0
-            else:
-                base = 4000.0
-                per_km = 15.0
+    def _show_itinerary(self, result, mode_text: str):
+        def money(value: float) -> str:
+            return f"{value:,.0f}".replace(",", " ")
 
-            one_way = base + d * per_km
-            round_trip = one_way * 2.0
+        hours = int(result.total_duration_min // 60)
+        mins = int(result.total_duration_min % 60)
+        method = "pontos (Held–Karp)" if result.exact else "heurisztika (legközelebbi szomszéd + 2-opt / Or-opt)"
 
-            low_one_way = one_way * 0.8
-            high_one_way = one_way * 1.2
-            low_round = round_trip * 0.8
-            high_round = round_trip * 1.2
+        lines = [f"Optimalizált sorrend – {mode_text}, {method}:\n"]
+        for idx, stop in enumerate(result.order, start=1):
+            lines.append(f"  {idx}. {stop}")
 
-            lines.append("\nTömegközlekedés költségbecslés (becsült sáv):")
-            lines.append(f"- Km alapú, egyszerű modell (busz + vonat)")
+        lines.append("\nSzakaszok:")
+        for leg in result.legs:
             lines.append(
-                f"- Odaút: ~ {low_one_way:,.0f} – {high_one_way:,.0f} Ft".replace(",", " ")
+                f"  {leg.origin} → {leg.destination}: {leg.distance_km:.1f} km, "
+                f"{int(leg.duration_min // 60)} óra {int(leg.duration_min % 60)} perc"
             )
+
+        lines.append(f"\nÖsszes távolság: {result.total_distance_km:.1f} km")
+        lines.append(f"Összes idő: {hours} óra {mins} perc")
+
+        if result.car_cost is not None:
             lines.append(
-                f"- Oda-vissza: ~ {low_round:,.0f} – {high_round:,.0f} Ft".replace(",", " ")
+                f"\nSaját jármű ({self.car_config['name'] if self.car_config else 'autó'}): "
+                f"~ {money(float(result.car_cost.one_way))} Ft üzemanyag"
             )
+        lines.append(
+            f"Tömegközlekedés: ~ {money(result.transit_cost.low_one_way)} – "
+            f"{money(result.transit_cost.high_one_way)} Ft"
+        )
+        lines.append(
+            f"Repülő (szakaszonként): ~ {money(result.flight_cost.low_one_way)} – "
+            f"{money(result.flight_cost.high_one_way)} Ft"
+        )
 
-            # ==== Transit szakaszok kiírása ====
-            if transit_segments:
-                lines.append("\nTömegközlekedés részletei:")
-                for idx, seg in enumerate(transit_segments, start=1):
-                    dep_time = seg.get("departure_time")
-                    dep_stop = seg.get("departure_stop")
-                    arr_time = seg.get("arrival_time")
-                    arr_stop = seg.get("arrival_stop")
-                    line_name = seg.get("line_name")
-                    vehicle_type = seg.get("vehicle_type")
-
-                    lines.append(f"\n  Szakasz {idx}:")
-                    if dep_time or dep_stop:
-                        lines.append(
-                            f"    - Indulás:  {dep_time or 'ismeretlen idő'} – {dep_stop or 'ismeretlen megálló'}"
-                        )
-                    if arr_time or arr_stop:
-                        lines.append(
-                            f"    - Érkezés:  {arr_time or 'ismeretlen idő'} – {arr_stop or 'ismeretlen megálló'}"
-                        )
-                    if line_name or vehicle_type:
-                        vt = vehicle_type or "ISMERETLEN"
-                        lines.append(
-                            f"    - Jármű: {vt} – {line_name or 'ismeretlen járat'}"
-                        )
-
-        if warnings:
-            lines.append("\nFigyelmeztetések / akadályok:")
-            for w in warnings:
-                lines.append(f"  • {w}")
-
-        self.result_text.setPlainText("\n".join(lines))
-        self.statusBar().showMessage("Költségbecslés elkészült.")
+        self.trip_result.setPlainText("\n".join(lines))
+        self.statusBar().showMessage("Többmegállós út elkészült.")
+
+    def _on_itinerary_error(self, error: Exception):
+        self.trip_result.setPlainText(f"Nem sikerült megtervezni az utat:\n{error}")
+        self.statusBar().showMessage("Hiba a többmegállós tervezéskor.")
 
     def on_configure_car_clicked(self):
         dialog = CarConfigDialog(self, existing_config=self.car_config)
@@ -458,7 +1065,7 @@ class MainWindow(QMainWindow):
             self.car_config = dialog.get_config()
             name = self.car_config["name"]
             self.statusBar().showMessage(f"Saját jármű beállítva: {name}")
-            self.result_text.append(f"\n[Saját jármű frissítve] {name}")
+            self.log(f"Saját jármű frissítve: {name}")
 
 
     def on_set_hf_token(self):
@@ -471,6 +1078,8 @@ class MainWindow(QMainWindow):
                 return
 
             # Beállítjuk az AI modulban (memóriában, fájl nélkül)
+            from app.ai_recommend import set_hf_token
+
             try:
                 set_hf_token(token)
             except Exception as e:
@@ -482,6 +1091,38 @@ class MainWindow(QMainWindow):
             if hasattr(self, "ai_details"):
                 self.ai_details.append("\n[HF token frissítve – AI ajánló engedélyezve]")
 
+    def on_select_model(self):
+        """Menüből hívható: AI modell cseréje futás közben."""
+        from app.ai_recommend import AIRecommendError, get_model, set_model
+
+        models = [
+            "meta-llama/Meta-Llama-3-8B-Instruct",
+            "mistralai/Mistral-7B-Instruct-v0.3",
+            "HuggingFaceH4/zephyr-7b-beta",
+        ]
+        current = get_model()
+        if current not in models:
+            models.insert(0, current)
+
+        model_id, ok = QInputDialog.getItem(
+            self,
+            "AI modell kiválasztása",
+            "Chat modell (HuggingFace azonosító):",
+            models,
+            models.index(current),
+            True,  # szerkeszthető: saját modell is megadható
+        )
+        if not ok:
+            return
+
+        try:
+            set_model(model_id)
+        except AIRecommendError as e:
+            self.statusBar().showMessage(str(e))
+            return
+
+        self.statusBar().showMessage(f"AI modell beállítva: {get_model()}")
+
     # ==== AI úti cél ajánló – ajánlások lekérése ====
     def on_ai_request_clicked(self):
         text = self.ai_prompt.toPlainText().strip()
@@ -489,20 +1130,125 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("Írd le, milyen utazást szeretnél az AI-nak.")
             return
 
+        from app.ai_recommend import ask_travel_ai_stream
+
         # előző válasz törlése
         self.ai_details.clear()
+        self.ai_routes_button.setEnabled(False)
+
+        # LLM hívás háttérszálon, streamelve: a tokenek érkezés közben jelennek meg
+        # (az előző, még futó generálást felülírja)
+        self._ai_clicked_at = time.perf_counter()
+        self.tasks.submit_stream(
+            "ai",
+            ask_travel_ai_stream,
+            text,
+            use_cache=not self.ai_bypass_cache.isChecked(),
+            on_chunk=self._append_ai_chunk,
+            on_result=lambda _: self._on_ai_finished(text),
+            on_error=self._on_ai_error,
+        )
+        self.ai_stop_button.setEnabled(True)
+        self.statusBar().showMessage("AI válasz generálása folyamatban…")
 
-        try:
-            answer = ask_travel_ai(text)
-        except AIRecommendError as e:
-            self.ai_details.setPlainText(f"Hiba az AI hívásakor:\n{e}")
-            self.statusBar().showMessage("Hiba az AI hívásakor.")
-            return
+    def _append_ai_chunk(self, chunk: str):
+        if self._ai_clicked_at is not None:
+            observe("gui.ai_click_to_first_token", (time.perf_counter() - self._ai_clicked_at) * 1000.0)
+            self._ai_clicked_at = None
+        self.ai_details.moveCursor(QTextCursor.End)
+        self.ai_details.insertPlainText(chunk)
+        self.ai_details.ensureCursorVisible()
 
-        # teljes válasz be a textboxba
-        self.ai_details.setPlainText(answer)
+    def _on_ai_finished(self, prompt: str):
+        self.ai_stop_button.setEnabled(False)
+        self.ai_routes_button.setEnabled(bool(self.ai_details.toPlainText().strip()))
 
-        # prompt ürítése
-        self.ai_prompt.clear()
+        # prompt ürítése (ha közben nem írt újat a felhasználó)
+        if self.ai_prompt.toPlainText().strip() == prompt:
+            self.ai_prompt.clear()
 
         self.statusBar().showMessage("AI válasz megérkezett.")
+
+    def on_ai_stop_clicked(self):
+        """Generálás idő előtti leállítása – az eddig érkezett szöveg megmarad."""
+        self.tasks.cancel("ai")
+        self.ai_stop_button.setEnabled(False)
+        self.ai_routes_button.setEnabled(bool(self.ai_details.toPlainText().strip()))
+        self.statusBar().showMessage("AI generálás leállítva.")
+
+    # ==== AI ajánlás → útvonal + költség minden ajánlott helyre ====
+    def on_ai_routes_clicked(self):
+        origin = self.origin_input.text().strip()
+        if not origin:
+            self.statusBar().showMessage("Hiba: töltsd ki a Honnan mezőt!")
+            return
+
+        from app.destinations import extract_destinations, iter_destination_routes
+        from app.gazetteer import canonical_place
+
+        destinations = extract_destinations(self.ai_details.toPlainText())
+        if not destinations:
+            self.ai_routes_info.setText("Az AI válaszában nem található úti cél felsorolás.")
+            return
+
+        origin = canonical_place(origin)
+        travelmode, mode_text = self._get_travelmode()
+        if mode_text == "Repülő":
+            travelmode = "flight"
+        car = self.car_config or {}
+
+        self.destination_model.clear()
+        self.destination_view.show()
+        self.ai_routes_info.setText(f"{origin} → {len(destinations)} úti cél ({mode_text}): lekérés…")
+        # célonként egy lekérés párhuzamosan; a táblázat érkezés közben rendeződik
+        self.tasks.submit_stream(
+            "destinations",
+            iter_destination_routes,
+            origin,
+            destinations,
+            travelmode,
+            car.get("consumption_l_per_100km"),
+            car.get("fuel_price_per_liter"),
+            on_chunk=self.destination_model.add_route,
+            on_result=lambda _: self._on_ai_routes_finished(origin, mode_text),
+            on_error=self._on_ai_routes_error,
+        )
+        self.statusBar().showMessage("Útvonalak lekérése az ajánlott helyekhez…")
+
+    def _on_ai_routes_finished(self, origin: str, mode_text: str):
+        routes = self.destination_model.routes
+        ok = [r for r in routes if r.info is not None]
+        self.ai_routes_info.setText(f"{origin} ({mode_text}): {len(ok)} / {len(routes)} úti cél lekérdezve.")
+        if ok:
+            best = min(ok, key=lambda r: r.duration_min)
+            self.log(
+                f"AI ajánlás útvonalai {origin} ({mode_text}): {len(ok)} / {len(routes)} hely, "
+                f"leggyorsabb: {best.destination.name} ({best.duration_min:.0f} perc)"
+            )
+        self.statusBar().showMessage("Ajánlott helyek útvonalai elkészültek.")
+
+    def _on_ai_routes_error(self, error: Exception):
+        self.ai_routes_info.setText(f"Hiba az útvonalak lekérésekor: {error}")
+        self.statusBar().showMessage("Hiba az ajánlott helyek útvonalainak lekérésekor.")
+
+    def _on_destination_activated(self, index):
+        route = self.destination_model.route_at(index.row())
+        if route is None:
+            return
+        # a korábbi kézi másolás helyett: a kiválasztott hely a Hová mezőbe
+        self.destination_input.setText(route.destination.name)
+        self.statusBar().showMessage(f"Hová: {route.destination.name} – a „Költség tervezés” részletes jelentést ad.")
+
+    def _on_ai_error(self, error: Exception):
+        from app.ai_recommend import AIRecommendError
+
+        self.ai_stop_button.setEnabled(False)
+        if isinstance(error, AIRecommendError):
+            self.ai_details.setPlainText(f"Hiba az AI hívásakor:\n{error}")
+        else:
+            self.ai_details.setPlainText(f"Váratlan hiba az AI hívásakor:\n{error}")
+        self.statusBar().showMessage("Hiba az AI hívásakor.")
+
+    def closeEvent(self, event):
+        self.tasks.shutdown()
+        super().closeEvent(event)
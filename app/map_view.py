@@ -0,0 +1,240 @@
+"""
+Beágyazott, csempék nélküli térkép nézet az útvonalhoz (böngésző helyett).
+
+Web Mercator vetítésben rajzol: fokhálózat, a beépített repülőterek mint
+tájékozódási pontok, és maga az útvonal. Az útvonalból minden kirajzoláskor
+csak a látható rész kerül egyszerűsítésre (Douglas–Peucker, fél pixeles
+tűréssel), így a sok tízezer pontos útvonalak is folyamatosan mozgathatók.
+Görgő: nagyítás a kurzor körül, húzás: mozgatás, dupla kattintás: illesztés.
+"""
+from typing import Optional
+
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen, QPixmap
+from PySide6.QtWidgets import QWidget
+
+from app.metrics import observe, span
+from app.polyline import clip_to_view, decode_polyline, great_circle_points, project, simplify
+
+MIN_ZOOM = 1.0
+MAX_ZOOM = 18.0
+TILE_PX = 256.0  # a nagyítási szint jelentése, mint a csempés térképeknél
+
+
+def load_route_points(origin: str, destination: str, travelmode: str) -> np.ndarray:
+    """
+    Háttérszálon fut: az útvonal [lat, lon] pontjai a Directions áttekintő
+    polyline-jából. A régebbi cache bejegyzésekben nincs geometria – ilyenkor
+    egyszer a cache olvasása nélkül újrakérdezünk, és a friss (geometriás)
+    eredmény felülírja a bejegyzést, így a következő kattintás már a cache-ből megy.
+    """
+    from app.google_routes import RouteError, get_route_info
+
+    info = get_route_info(origin, destination, travelmode)
+    if info.overview_polyline is None:
+        info = get_route_info(origin, destination, travelmode, refresh=True)
+    if not info.overview_polyline:
+        raise RouteError("A válasz nem tartalmaz útvonal geometriát.")
+    with span("map.decode"):
+        return decode_polyline(info.overview_polyline)
+
+
+def flight_points(origin: str, destination: str):
+    """Repülő: gömbi ív a két (offline) repülőtér között, hálózat nélkül."""
+    from app.airports import estimate_flight
+
+    estimate = estimate_flight(origin, destination)
+    a, b = estimate.origin, estimate.destination
+    return great_circle_points(a.lat, a.lon, b.lat, b.lon), estimate
+
+
+class RouteMapView(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(300, 240)
+
+        self._points: Optional[np.ndarray] = None   # vetített útvonal (n, 2)
+        self._labels = ("", "")
+        self._center = project(np.array([[47.5, 19.0]]))[0]  # Budapest
+        self._zoom = 4.0
+        self._drag_from: Optional[QPointF] = None
+        self._background: Optional[QPixmap] = None
+        self._background_key = None
+        self._landmarks: Optional[np.ndarray] = None
+        self._landmark_names = []
+        self.last_point_count = 0
+
+    # --- adatok ---
+    def set_route(self, latlon: np.ndarray, origin: str = "", destination: str = "") -> None:
+        """Útvonal beállítása [lat, lon] pontokból; a nézet az útvonalra illeszkedik."""
+        self._points = project(np.asarray(latlon, dtype=float)) if len(latlon) else None
+        self._labels = (origin, destination)
+        self.fit_route()
+
+    def clear_route(self) -> None:
+        self._points = None
+        self.update()
+
+    @property
+    def point_count(self) -> int:
+        return 0 if self._points is None else len(self._points)
+
+    # --- nézet ---
+    def _scale(self) -> float:
+        """Pixel / (vetített) fok az aktuális nagyításon."""
+        return TILE_PX * (2.0 ** self._zoom) / 360.0
+
+    def _to_screen(self, xy: np.ndarray) -> np.ndarray:
+        scale = self._scale()
+        return (xy - self._center) * scale + np.array([self.width() / 2.0, self.height() / 2.0])
+
+    def _to_world(self, px: float, py: float) -> np.ndarray:
+        scale = self._scale()
+        return self._center + (np.array([px, py]) - np.array([self.width() / 2.0, self.height() / 2.0])) / scale
+
+    def _view_rect(self):
+        (x0, y0), (x1, y1) = self._to_world(0, 0), self._to_world(self.width(), self.height())
+        return x0, y0, x1, y1
+
+    def fit_route(self) -> None:
+        if self._points is None:
+            self.update()
+            return
+        lo, hi = self._points.min(axis=0), self._points.max(axis=0)
+        self._center = (lo + hi) / 2.0
+        span_deg = np.maximum(hi - lo, 1e-4)
+        fit = min(self.width() * 0.85 / span_deg[0], self.height() * 0.85 / span_deg[1])
+        self._zoom = float(np.clip(np.log2(fit * 360.0 / TILE_PX), MIN_ZOOM, MAX_ZOOM))
+        self.update()
+
+    # --- egér ---
+    def wheelEvent(self, event):
+        pos = event.position()
+        before = self._to_world(pos.x(), pos.y())
+        steps = event.angleDelta().y() / 120.0
+        self._zoom = float(np.clip(self._zoom + 0.5 * steps, MIN_ZOOM, MAX_ZOOM))
+        # a kurzor alatti pont maradjon a helyén
+        self._center += before - self._to_world(pos.x(), pos.y())
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_from = event.position()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_from is None:
+            return
+        pos = event.position()
+        delta = np.array([pos.x() - self._drag_from.x(), pos.y() - self._drag_from.y()])
+        self._center -= delta / self._scale()
+        self._drag_from = pos
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_from = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.fit_route()
+
+    # --- rajzolás ---
+    def _landmark_points(self):
+        if self._landmarks is None:
+            from app.airports import get_airport_index
+
+            index = get_airport_index()
+            self._landmarks = project(np.column_stack([index.lat, index.lon]))
+            self._landmark_names = [a.city for a in index.airports]
+        return self._landmarks
+
+    def _render_background(self) -> QPixmap:
+        """Fokhálózat + repülőterek; a nézet változásáig gyorsítótárazva."""
+        key = (self.width(), self.height(), round(self._zoom, 3), tuple(np.round(self._center, 6)))
+        if self._background is not None and key == self._background_key:
+            return self._background
+
+        pixmap = QPixmap(self.size())
+        pixmap.fill(QColor("#eef3f7"))
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        x0, y0, x1, y1 = self._view_rect()
+        # rácsköz: kb. 80–160 pixelenként egy vonal, "kerek" fokértékkel
+        step = next((s for s in (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 15, 30)
+                     if s * self._scale() >= 80), 30)
+        painter.setPen(QPen(QColor("#cfd9e2"), 1))
+        for x in np.arange(np.floor(x0 / step) * step, x1 + step, step):
+            sx = self._to_screen(np.array([x, 0.0]))[0]
+            painter.drawLine(QPointF(sx, 0), QPointF(sx, self.height()))
+        for y in np.arange(np.floor(y0 / step) * step, y1 + step, step):
+            sy = self._to_screen(np.array([0.0, y]))[1]
+            painter.drawLine(QPointF(0, sy), QPointF(self.width(), sy))
+
+        landmarks = self._landmark_points()
+        visible = np.flatnonzero(
+            (landmarks[:, 0] >= x0) & (landmarks[:, 0] <= x1)
+            & (landmarks[:, 1] >= y0) & (landmarks[:, 1] <= y1)
+        )
+        screen = self._to_screen(landmarks[visible])
+        painter.setPen(QPen(QColor("#8899aa"), 1))
+        painter.setBrush(QColor("#8899aa"))
+        show_names = len(visible) <= 40
+        for i, (sx, sy) in zip(visible, screen):
+            painter.drawEllipse(QPointF(sx, sy), 2.5, 2.5)
+            if show_names:
+                painter.drawText(QPointF(sx + 4, sy - 4), self._landmark_names[i])
+        painter.end()
+
+        self._background, self._background_key = pixmap, key
+        return pixmap
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._render_background())
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        if self._points is None:
+            painter.setPen(QColor("#667788"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Nincs megjeleníthető útvonal.")
+            painter.end()
+            return
+
+        with span("map.simplify"):
+            tolerance = 0.5 / self._scale()  # fél pixel
+            runs = [
+                run[simplify(self._points[run], tolerance)]
+                for run in clip_to_view(self._points, *self._view_rect())
+            ]
+
+        path = QPainterPath()
+        drawn = 0
+        for run in runs:
+            screen = self._to_screen(self._points[run])
+            drawn += len(screen)
+            path.moveTo(*screen[0])
+            for sx, sy in screen[1:]:
+                path.lineTo(sx, sy)
+        self.last_point_count = drawn
+        observe("map.points_drawn", float(drawn))
+
+        painter.setPen(QPen(QColor("#1565c0"), 3, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(path)
+
+        # indulás / érkezés jelölők
+        ends = self._to_screen(self._points[[0, -1]])
+        for (sx, sy), color, label in zip(ends, ("#2e7d32", "#c62828"), self._labels):
+            painter.setPen(QPen(QColor("white"), 2))
+            painter.setBrush(QColor(color))
+            painter.drawEllipse(QPointF(sx, sy), 6, 6)
+            if label:
+                painter.setPen(QColor("#222222"))
+                painter.drawText(QPointF(sx + 8, sy + 4), label)
+
+        painter.setPen(QColor("#556677"))
+        painter.drawText(
+            QRectF(6, self.height() - 22, self.width() - 12, 18),
+            Qt.AlignRight | Qt.AlignVCenter,
+            f"{drawn} / {len(self._points)} pont · nagyítás {self._zoom:.1f}",
+        )
+        painter.end()
@@ -0,0 +1,153 @@
+"""
+Folyamaton belüli, kis költségű metrika gyűjtés.
+- span(név): időmérés context managerként → hisztogram (ms)
+- inc(név): számláló
+- export JSON-ba vagy Prometheus szöveges formátumba
+
+    from app.metrics import span
+    with span("google.http"):
+        resp = session.get(...)
+"""
+import bisect
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Hisztogram vödrök felső határai (ms); az utolsó után +Inf
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def quantile(self, q: float) -> float:
+        """Becsült kvantilis a vödrökből (a vödör felső határa, max-szal vágva)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                upper = BUCKETS_MS[idx] if idx < len(BUCKETS_MS) else self.max_ms
+                return min(upper, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "mean_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.observe(value_ms)
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "histograms": {name: h.to_dict() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def export_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def export_prometheus(self, prefix: str = "travelling_guidance") -> str:
+        """Prometheus szöveges formátum (a ms értékeket másodpercben adjuk meg)."""
+        snap = self.snapshot()
+        lines = []
+        for name, value in snap["counters"].items():
+            metric = f"{prefix}_{_prom_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, hist in snap["histograms"].items():
+            metric = f"{prefix}_{_prom_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for le, n in hist["buckets"].items():
+                cumulative += n
+                le_s = le if le == "+Inf" else repr(int(le) / 1000.0)
+                lines.append(f'{metric}_bucket{{le="{le_s}"}} {cumulative}')
+            lines.append(f"{metric}_sum {hist['sum_ms'] / 1000.0}")
+            lines.append(f"{metric}_count {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+    def format_table(self) -> str:
+        """Ember által olvasható összesítő (a Metrikák fülhöz)."""
+        snap = self.snapshot()
+        lines = [f"{'span':<32}{'db':>7}{'átlag':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>10}  (ms)"]
+        for name, h in snap["histograms"].items():
+            lines.append(
+                f"{name:<32}{h['count']:>7}{h['mean_ms']:>10.1f}{h['p50_ms']:>9.0f}"
+                f"{h['p95_ms']:>9.0f}{h['p99_ms']:>9.0f}{h['max_ms']:>10.1f}"
+            )
+        if snap["counters"]:
+            lines.append("")
+            lines.append(f"{'számláló':<32}{'érték':>7}")
+            for name, value in snap["counters"].items():
+                lines.append(f"{name:<32}{value:>7}")
+        return "\n".join(lines)
+
+
+def _prom_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+# Közös, alkalmazásszintű registry
+REGISTRY = MetricsRegistry()
+span = REGISTRY.span
+observe = REGISTRY.observe
+inc = REGISTRY.inc
@@ -0,0 +1,151 @@
+"""
+Google "encoded polyline" dekódolás és egyszerűsítés NumPy-val.
+
+- decode_polyline: a teljes karakterláncot egyszerre, ciklus nélkül bontja ki
+- project: Web Mercator vetítés (a térkép nézethez)
+- simplify: Douglas–Peucker a nézet felbontásához mért tűréssel, így egy
+  több tízezer pontos, kontinenseken átívelő útvonalból is csak annyi pont
+  marad, amennyi az adott nagyításon látszik
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> np.ndarray:
+    """
+    Encoded polyline → (n, 2) tömb [lat, lon] fokban.
+    Minden érték 5 bites csoportokból áll (0x20 jelzi a folytatást); a
+    csoportokat reduceat-tel vonjuk össze, a különbségeket cumsum-mal.
+    A csonka (hibás) végződést eldobjuk.
+    """
+    raw = np.frombuffer(encoded.encode("ascii", "ignore"), dtype=np.uint8).astype(np.int64) - 63
+    if raw.size == 0:
+        return np.empty((0, 2))
+
+    ends = np.flatnonzero(raw < 0x20)
+    if ends.size < 2:
+        return np.empty((0, 2))
+    raw = raw[:ends[-1] + 1]
+
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # csoporton belüli pozíció → bit eltolás (5 bit / karakter)
+    group = np.repeat(np.arange(ends.size), ends - starts + 1)
+    shift = 5 * (np.arange(raw.size) - starts[group])
+    values = np.add.reduceat((raw & 0x1F) << shift, starts)
+
+    # zigzag előjel dekódolás
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    deltas = deltas[:deltas.size - deltas.size % 2].reshape(-1, 2)
+    return np.cumsum(deltas, axis=0) / float(10 ** precision)
+
+
+def encode_polyline(points, precision: int = 5) -> str:
+    """A decode_polyline inverze (benchmarkhoz / teszt adatokhoz)."""
+    scaled = np.round(np.asarray(points, dtype=float) * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    out = []
+    for value in deltas.tolist():
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            out.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        out.append(chr(value + 63))
+    return "".join(out)
+
+
+def great_circle_points(lat1: float, lon1: float, lat2: float, lon2: float, n: int = 128) -> np.ndarray:
+    """Gömbi (legrövidebb) ív pontjai – a repülős útvonal rajzolásához."""
+    p1, p2 = np.radians([lat1, lon1]), np.radians([lat2, lon2])
+    v1 = np.array([np.cos(p1[0]) * np.cos(p1[1]), np.cos(p1[0]) * np.sin(p1[1]), np.sin(p1[0])])
+    v2 = np.array([np.cos(p2[0]) * np.cos(p2[1]), np.cos(p2[0]) * np.sin(p2[1]), np.sin(p2[0])])
+    omega = np.arccos(np.clip(v1 @ v2, -1.0, 1.0))
+    t = np.linspace(0.0, 1.0, n)[:, None]
+    if omega < 1e-12:
+        v = np.repeat(v1[None, :], n, axis=0)
+    else:
+        v = (np.sin((1 - t) * omega) * v1 + np.sin(t * omega) * v2) / np.sin(omega)
+    lat = np.degrees(np.arctan2(v[:, 2], np.hypot(v[:, 0], v[:, 1])))
+    lon = np.degrees(np.arctan2(v[:, 1], v[:, 0]))
+    # a dátumválasztón átlépő ívnél folytonos hosszúság (ne ugorjon a vonal)
+    lon = np.degrees(np.unwrap(np.radians(lon)))
+    return np.column_stack([lat, lon])
+
+
+def project(points: np.ndarray) -> np.ndarray:
+    """[lat, lon] → Web Mercator [x, y] (x = hosszúság fokban, y lefelé nő)."""
+    lat = np.clip(points[:, 0], -85.0, 85.0)
+    y = np.degrees(np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)))
+    return np.column_stack([points[:, 1], -y])
+
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas–Peucker egyszerűsítés (a pontok saját, síkbeli egységében).
+    Iteratív (veremmel), szakaszonként egyetlen vektorizált távolságszámítás.
+    Visszatér a megtartott pontok indexeivel.
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+
+    # előszűrés (vektorizált): a tűrésnyi rácson egy cellába eső egymás utáni
+    # pontokból csak az első marad – a DP így jóval kevesebb ponton fut
+    cells = np.floor(points / tolerance).astype(np.int64)
+    changed = np.empty(n, dtype=bool)
+    changed[0] = True
+    changed[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+    changed[-1] = True
+    candidates = np.flatnonzero(changed)
+    return candidates[_douglas_peucker(points[candidates], tolerance)]
+
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    n = len(points)
+    if n <= 2:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a, b = points[first], points[last]
+        seg = points[first + 1:last]
+        ab = b - a
+        norm = np.hypot(ab[0], ab[1])
+        if norm == 0.0:
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(ab[0] * (seg[:, 1] - a[1]) - ab[1] * (seg[:, 0] - a[0])) / norm
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            mid = first + 1 + k
+            keep[mid] = True
+            stack.append((first, mid))
+            stack.append((mid, last))
+    return np.flatnonzero(keep)
+
+
+def clip_to_view(points: np.ndarray, x0: float, y0: float, x1: float, y1: float):
+    """
+    A nézetet (befoglaló téglalapjával) metsző szakaszok pontjai, összefüggő
+    futamokra bontva (index tömbök listája). Nagy nagyításnál így csak a
+    látható rész kerül egyszerűsítésre és kirajzolásra.
+    """
+    if len(points) < 2:
+        return [np.arange(len(points))]
+    a, b = points[:-1], points[1:]
+    hit = (
+        (np.minimum(a[:, 0], b[:, 0]) <= x1) & (np.maximum(a[:, 0], b[:, 0]) >= x0)
+        & (np.minimum(a[:, 1], b[:, 1]) <= y1) & (np.maximum(a[:, 1], b[:, 1]) >= y0)
+    )
+    mask = np.zeros(len(points), dtype=bool)
+    mask[:-1] |= hit
+    mask[1:] |= hit
+    idx = np.flatnonzero(mask)
+    if idx.size == 0:
+        return []
+    return np.split(idx, np.flatnonzero(np.diff(idx) > 1) + 1)
@@ -0,0 +1,110 @@
+"""
+Spekulatív előtöltés: amíg a felhasználó a Honnan / Hová mezőket szerkeszti,
+a háttérben minden közlekedési módra lekérjük az útvonalat, így a mód
+váltása és a "Költség tervezés" gomb azonnal, meleg eredményből rajzol.
+
+A Directions kvóta védelmében a hálózati előtöltéseket csúszó ablakos
+keret korlátozza (TG_PREFETCH_PER_HOUR, alapértelmezés: 30 / óra, 0 = ki).
+A cache-ből kiszolgált előtöltés nem fogyaszt keretet.
+Ez a modul nem importál Qt-t; az ütemezés (debounce) a GUI dolga.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from app.cache import MemoryLRUCache, normalize_key_part
+from app.metrics import inc
+from app.route_info import RouteInfo
+from app.scheduler import BACKGROUND, priority
+
+# a repülő offline becslés (app.airports), azt nem kell előtölteni
+PREFETCH_MODES = ("driving", "transit")
+
+DEFAULT_PREFETCH_PER_HOUR = 30
+
+# meleg eredmény érvényessége: mint a forgalmi idő a route cache-ben
+WARM_TTL = 5 * 60.0
+
+
+def _default_limit() -> int:
+    try:
+        return max(0, int(os.getenv("TG_PREFETCH_PER_HOUR", DEFAULT_PREFETCH_PER_HOUR)))
+    except ValueError:
+        return DEFAULT_PREFETCH_PER_HOUR
+
+
+class PrefetchBudget:
+    """Legfeljebb limit darab hálózati előtöltés window másodpercenként."""
+
+    def __init__(self, limit: Optional[int] = None, window: float = 3600.0):
+        self.limit = _default_limit() if limit is None else max(0, limit)
+        self.window = window
+        self._lock = threading.Lock()
+        self._spent = deque()  # időbélyegek
+
+    def _expire(self, now: float) -> None:
+        while self._spent and self._spent[0] <= now - self.window:
+            self._spent.popleft()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._spent) >= self.limit:
+                return False
+            self._spent.append(now)
+            return True
+
+    def remaining(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return max(0, self.limit - len(self._spent))
+
+    def set_limit(self, limit: int) -> None:
+        with self._lock:
+            self.limit = max(0, limit)
+
+
+class Prefetcher:
+    def __init__(self, budget: Optional[PrefetchBudget] = None):
+        self.budget = budget or PrefetchBudget()
+        self.warm = MemoryLRUCache(max_entries=64)
+
+    @staticmethod
+    def make_key(origin: str, destination: str, travelmode: str) -> str:
+        return "|".join(normalize_key_part(p) for p in (origin, destination, travelmode))
+
+    def get(self, origin: str, destination: str, travelmode: str) -> Optional[RouteInfo]:
+        return self.warm.get(self.make_key(origin, destination, travelmode))
+
+    def put(self, origin: str, destination: str, travelmode: str, info: RouteInfo) -> None:
+        self.warm.set(self.make_key(origin, destination, travelmode), info, WARM_TTL)
+
+    def fetch(self, origin: str, destination: str, travelmode: str) -> Optional[RouteInfo]:
+        """
+        Háttérszálon fut. Cache találatnál keret nélkül, különben csak akkor
+        kérdezünk, ha van még keret; None = kihagyva.
+        A get_route_info single-flight rétege miatt egy közben érkező
+        kattintás ugyanerre a lekérésre ül rá, nem indít újat.
+        """
+        from app.google_routes import RouteError, get_cached_route_info, get_route_info
+
+        info = get_cached_route_info(origin, destination, travelmode)
+        if info is None:
+            if not self.budget.try_acquire():
+                inc("prefetch.skipped_budget")
+                return None
+            inc("prefetch.fetched")
+            try:
+                # háttér prioritás: egy közben érkező kattintás megelőzi (és ha
+                # ugyanerre vár, előlépteti ezt a hívást)
+                with priority(BACKGROUND):
+                    # a cache-t fent már megnéztük: csak a friss eredményt írjuk bele
+                    info = get_route_info(origin, destination, travelmode, refresh=True)
+            except RouteError:
+                inc("prefetch.errors")
+                raise
+        self.put(origin, destination, travelmode, info)
+        return info
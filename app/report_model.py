@@ -0,0 +1,254 @@
+"""
+Qt modellek a Napló fülhöz (model/view, a nagy QTextEdit szövegek helyett).
+
+- RouteReportModel: az útvonal / költség jelentés (szakaszcím + adat / érték sorok)
+- TransitSegmentModel: tömegközlekedési szakaszok, közvetlenül a TransitSegment-ekből
+- SessionLogModel: munkamenet napló korlátos gyűrűpufferben (a legrégebbi sor kiesik)
+- DestinationRouteModel: az AI által ajánlott úti célok útvonala / költsége,
+  érkezés közben a helyére beszúrva (rendezett táblázat)
+
+A nézet (QTableView / QListView) csak a látható sorokat kérdezi le és rajzolja,
+így a kirajzolás ideje nem nő a szakaszok / lekérdezések számával.
+"""
+import bisect
+import time
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QColor, QFont
+
+from app.destinations import DestinationRoute
+from app.route_info import TransitSegment
+
+# a munkamenet naplóban megtartott sorok száma
+LOG_MAX_ENTRIES = 500
+
+# (adat, érték); érték None = szakaszcím
+ReportRow = Tuple[str, Optional[str]]
+
+
+class RouteReportModel(QAbstractTableModel):
+    HEADERS = ("Adat", "Érték")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: Sequence[ReportRow] = ()
+        # a QFont / QColor csak a QApplication után jöhet létre
+        self._section_font = QFont()
+        self._section_font.setBold(True)
+        self._section_background = QColor("#eef3f7")
+
+    def set_rows(self, rows: Sequence[ReportRow]) -> None:
+        self.beginResetModel()
+        self._rows = tuple(rows)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        label, value = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return label if index.column() == 0 else value
+        if value is None:
+            if role == Qt.FontRole:
+                return self._section_font
+            if role == Qt.BackgroundRole:
+                return self._section_background
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class TransitSegmentModel(QAbstractTableModel):
+    HEADERS = ("#", "Indulás", "Honnan", "Érkezés", "Hová", "Jármű", "Járat")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._segments: Tuple[TransitSegment, ...] = ()
+
+    def set_segments(self, segments: Sequence[TransitSegment]) -> None:
+        self.beginResetModel()
+        self._segments = tuple(segments)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._segments)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        seg = self._segments[index.row()]
+        column = index.column()
+        if column == 0:
+            return str(index.row() + 1)
+        if column == 1:
+            return seg.departure_time or "?"
+        if column == 2:
+            return seg.departure_stop or "ismeretlen megálló"
+        if column == 3:
+            return seg.arrival_time or "?"
+        if column == 4:
+            return seg.arrival_stop or "ismeretlen megálló"
+        if column == 5:
+            return seg.vehicle_type or "ISMERETLEN"
+        return seg.line_name or "ismeretlen járat"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class SessionLogModel(QAbstractListModel):
+    """Időbélyeges napló sorok; legfeljebb max_entries darab marad meg."""
+
+    def __init__(self, max_entries: int = LOG_MAX_ENTRIES, parent=None):
+        super().__init__(parent)
+        self._entries = deque(maxlen=max(1, max_entries))
+
+    def append(self, text: str) -> None:
+        if len(self._entries) == self._entries.maxlen:
+            # a deque maga dobná ki a legrégebbit – a nézetnek jelezni kell
+            self.beginRemoveRows(QModelIndex(), 0, 0)
+            self._entries.popleft()
+            self.endRemoveRows()
+        row = len(self._entries)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._entries.append(f"{time.strftime('%H:%M:%S')}  {text}")
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._entries.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._entries[index.row()]
+        return None
+
+
+class DestinationRouteModel(QAbstractTableModel):
+    """
+    Úti célok rangsora; az új eredmény a rendezés szerinti helyére kerül
+    (nem kell újrarendezni a teljes táblát). A fejlécre kattintva más
+    oszlop szerint rendezhető (QTableView.setSortingEnabled).
+    """
+    HEADERS = ("#", "Úti cél", "Távolság", "Idő", "Költség (egy út)", "Megjegyzés")
+    SORTABLE = {1: "name", 2: "distance", 3: "time", 4: "cost"}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._routes: List[DestinationRoute] = []
+        self._keys: List[tuple] = []
+        self._sort_by = "time"
+        self._descending = False
+
+    def _key(self, route: DestinationRoute) -> tuple:
+        # a sikertelen lekérések mindig a végére kerülnek
+        if route.info is None:
+            return (1, 0.0, route.destination.name.casefold())
+        if self._sort_by == "name":
+            # név szerint mindig ábécérendben
+            return (0, 0.0, route.destination.name.casefold())
+        if self._sort_by == "distance":
+            value = route.info.distance_km
+        elif self._sort_by == "cost":
+            value = (route.cost_low_ft + route.cost_high_ft) / 2.0
+        else:
+            value = route.duration_min
+        return (0, -value if self._descending else value, route.destination.name.casefold())
+
+    def add_route(self, route: DestinationRoute) -> None:
+        key = self._key(route)
+        row = bisect.bisect_right(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self._routes.insert(row, route)
+        self.endInsertRows()
+        if row + 1 < len(self._routes):
+            # a mögötte lévők helyezése (#) eggyel nőtt
+            self.dataChanged.emit(self.index(row + 1, 0), self.index(len(self._routes) - 1, 0))
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._routes, self._keys = [], []
+        self.endResetModel()
+
+    def route_at(self, row: int) -> Optional[DestinationRoute]:
+        return self._routes[row] if 0 <= row < len(self._routes) else None
+
+    @property
+    def routes(self) -> Tuple[DestinationRoute, ...]:
+        return tuple(self._routes)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column not in self.SORTABLE:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._sort_by = self.SORTABLE[column]
+        self._descending = order == Qt.DescendingOrder
+        pairs = sorted(((self._key(r), r) for r in self._routes), key=lambda pair: pair[0])
+        self._keys = [k for k, _ in pairs]
+        self._routes = [r for _, r in pairs]
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._routes)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        route = self._routes[index.row()]
+        column = index.column()
+        if role == Qt.ToolTipRole and column in (1, 5):
+            return route.error or route.destination.description or None
+        if role == Qt.TextAlignmentRole and 2 <= column <= 4:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+
+        info = route.info
+        if column == 0:
+            return str(index.row() + 1) if info is not None else "–"
+        if column == 1:
+            return route.destination.name
+        if column == 5:
+            if route.error:
+                return f"Hiba: {route.error}"
+            if info is not None and info.warnings:
+                return "; ".join(info.warnings)
+            return route.destination.description
+        if info is None:
+            return ""
+        if column == 2:
+            return f"{info.distance_km:.0f} km"
+        if column == 3:
+            hours, minutes = divmod(int(round(route.duration_min)), 60)
+            return f"{hours} ó {minutes:02d} p" if hours else f"{minutes} p"
+        low, high = round(route.cost_low_ft), round(route.cost_high_ft)
+        return f"{low:,} Ft".replace(",", " ") if low == high else f"{low:,} – {high:,} Ft".replace(",", " ")
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
@@ -0,0 +1,83 @@
+"""
+Útvonal eredmények tömör, típusos formában (a Directions válasz helyett).
+
+A nyers Directions payload lépésenként polyline-t, HTML instrukciókat és
+koordinátákat tartalmaz; ebből csak a kijelzéshez / költséghez kellő néhány
+mezőt (és a térképhez az egyetlen, kódolt áttekintő polyline-t) tartjuk meg,
+__slots__-os, megváltoztathatatlan objektumokban.
+Ez a modul nem importál requests-et, így a GUI / offline becslés is használhatja.
+"""
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class TransitSegment:
+    departure_stop: Optional[str] = None
+    arrival_stop: Optional[str] = None
+    departure_time: Optional[str] = None
+    arrival_time: Optional[str] = None
+    line_name: Optional[str] = None
+    vehicle_type: Optional[str] = None
+
+    def to_list(self) -> list:
+        return [
+            self.departure_stop, self.arrival_stop, self.departure_time,
+            self.arrival_time, self.line_name, self.vehicle_type,
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class RouteInfo:
+    distance_km: float
+    duration_min: float
+    traffic_duration_min: Optional[float] = None
+    warnings: Tuple[str, ...] = ()
+    transit_segments: Tuple[TransitSegment, ...] = ()
+    # csak az offline repülős becslésnél (app.airports)
+    origin_airport: Optional[str] = None
+    destination_airport: Optional[str] = None
+    # az útvonal geometriája kódolt formában (a térképhez, app.polyline dekódolja)
+    overview_polyline: Optional[str] = None
+    # a Directions rövid leírása (pl. "M1 és M7") – az alternatívák megkülönböztetésére
+    summary: Optional[str] = None
+
+    def with_warning(self, warning: str) -> "RouteInfo":
+        return replace(self, warnings=self.warnings + (warning,))
+
+    def to_dict(self) -> dict:
+        """JSON-barát alak a cache-ekhez (a szakaszok listaként, kulcsok nélkül)."""
+        data = {
+            "distance_km": self.distance_km,
+            "duration_min": self.duration_min,
+            "traffic_duration_min": self.traffic_duration_min,
+            "warnings": list(self.warnings),
+            "transit_segments": [seg.to_list() for seg in self.transit_segments],
+        }
+        if self.origin_airport is not None:
+            data["origin_airport"] = self.origin_airport
+            data["destination_airport"] = self.destination_airport
+        if self.overview_polyline is not None:
+            data["overview_polyline"] = self.overview_polyline
+        if self.summary:
+            data["summary"] = self.summary
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RouteInfo":
+        # a régebbi cache bejegyzésekben a szakaszok még dict-ek
+        segments = tuple(
+            TransitSegment(**seg) if isinstance(seg, dict) else TransitSegment(*seg)
+            for seg in data.get("transit_segments") or ()
+        )
+        return cls(
+            distance_km=data["distance_km"],
+            duration_min=data["duration_min"],
+            traffic_duration_min=data.get("traffic_duration_min"),
+            warnings=tuple(data.get("warnings") or ()),
+            transit_segments=segments,
+            origin_airport=data.get("origin_airport"),
+            destination_airport=data.get("destination_airport"),
+            overview_polyline=data.get("overview_polyline"),
+            summary=data.get("summary"),
+        )
@@ -0,0 +1,339 @@
+"""
+Kvóta-tudatos ütemező a kimenő API hívásokhoz (Google, HuggingFace).
+
+API-nként egy ApiScheduler:
+- token bucket: legfeljebb rate hívás / mp, burst méretű löketekkel
+- prioritásos várakozási sor: az interaktív (kattintásból jövő) kérések
+  megelőzik a háttérmunkát (előtöltés, kötegelt feldolgozás); a háttér
+  egy párhuzamos helyet mindig szabadon hagy az interaktívnak
+- adaptív párhuzamosság (AIMD): 429 / OVER_QUERY_LIMIT esetén a korlát
+  feleződik és rövid szünet jön, sikeres hívásonként lassan visszanő
+
+A prioritást a hívó szál környezete hordozza, nem kell paraméterként
+végigvinni a hívási láncon:
+
+    with priority(BACKGROUND):
+        get_route_info(origin, destination, "driving")
+
+    with get_scheduler("google").slot() as slot:
+        resp = session.get(...)
+        if resp.status_code == 429:
+            slot.throttled()
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Hashable, Optional
+
+from app.metrics import inc, observe
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# api → (hívás / mp, burst, max. párhuzamosság); felülírható:
+# TG_<API>_RATE, TG_<API>_BURST, TG_<API>_CONCURRENCY (pl. TG_GOOGLE_RATE=5)
+API_LIMITS = {
+    "google": (10.0, 20, 8),
+    "hf": (0.5, 3, 2),
+}
+
+# ennyi ideig várhat egy hívás a sorban, utána QuotaWaitTimeout
+DEFAULT_MAX_WAIT = 60.0
+
+# throttling után szünet: 1 s, ismételt throttlingnál duplázva, max. 30 s
+COOLDOWN_BASE = 1.0
+COOLDOWN_MAX = 30.0
+
+_priority: ContextVar[int] = ContextVar("tg_priority", default=INTERACTIVE)
+_tag: ContextVar[Optional[Hashable]] = ContextVar("tg_request_tag", default=None)
+
+
+class QuotaWaitTimeout(Exception):
+    """A hívás nem kapott helyet max_wait másodpercen belül."""
+    pass
+
+
+class AcquireAborted(Exception):
+    """A várakozást a hívó megszakította (ApiScheduler.abort); hely nem jár."""
+    pass
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: int):
+    """Az ezen belül indított API hívások prioritása (az aktuális szálon)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def request_tag(tag: Hashable):
+    """A sorban álló hívás azonosítója, hogy egy interaktív kérés előléptethesse."""
+    token = _tag.set(tag)
+    try:
+        yield
+    finally:
+        _tag.reset(token)
+
+
+class TokenBucket:
+    """Nem szálbiztos önmagában; az ApiScheduler zárja alatt használjuk."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Ennyi másodperc múlva lesz elvehető token (0 = most)."""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self) -> None:
+        self.tokens -= 1.0
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "tag", "granted")
+
+    def __init__(self, priority: int, seq: int, tag: Optional[Hashable]):
+        self.priority = priority
+        self.seq = seq
+        self.tag = tag
+        self.granted = False
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Slot:
+    """Egy kiosztott hely; a hívó jelzi, ha a szolgáltató visszadobta (429)."""
+    __slots__ = ("was_throttled",)
+
+    def __init__(self):
+        self.was_throttled = False
+
+    def throttled(self) -> None:
+        self.was_throttled = True
+
+
+class ApiScheduler:
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._queue = []  # _Ticket heap
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._cooldown = COOLDOWN_BASE
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.throttle_count = 0
+        self.timeouts = 0
+
+    # --- kiosztás ---
+    def _capacity(self, ticket: _Ticket) -> int:
+        limit = max(1, int(self.limit))
+        # a háttér egy helyet mindig meghagy az interaktív kéréseknek
+        if ticket.priority != INTERACTIVE and limit > 1:
+            limit -= 1
+        return limit
+
+    def _wait_time(self, ticket: _Ticket, now: float) -> Optional[float]:
+        """None = most kiosztható; különben ennyi ideig (vagy jelzésig) várunk."""
+        if self._queue[0] is not ticket or self._in_flight >= self._capacity(ticket):
+            return float("inf")  # a felszabaduló hely / sor eleje jelez
+        delay = self.bucket.delay(now)
+        return None if delay <= 0.0 else delay
+
+    def acquire(
+        self,
+        level: Optional[int] = None,
+        tag: Optional[Hashable] = None,
+        abort: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Blokkol, amíg helyet kapunk. abort: ha az abort(event) hívás beállítja,
+        a várakozás AcquireAborted-del ér véget és a jegy kikerül a sorból
+        (pl. egy visszavont async kérés ne foglaljon később tokent).
+        """
+        level = current_priority() if level is None else level
+        tag = _tag.get() if tag is None else tag
+        started = time.monotonic()
+        deadline = started + self.max_wait
+
+        with self._cond:
+            ticket = _Ticket(level, next(self._seq), tag)
+            heapq.heappush(self._queue, ticket)
+            observe(f"scheduler.{self.name}.queue_depth", float(len(self._queue) - 1))
+            try:
+                while True:
+                    if abort is not None and abort.is_set():
+                        inc(f"scheduler.{self.name}.aborted")
+                        raise AcquireAborted(f"{self.name}: a várakozás megszakítva")
+                    now = time.monotonic()
+                    wait = self._wait_time(ticket, now)
+                    if wait is None:
+                        break
+                    if now >= deadline:
+                        self.timeouts += 1
+                        inc(f"scheduler.{self.name}.timeouts")
+                        raise QuotaWaitTimeout(
+                            f"{self.name}: nem jutott kvóta {self.max_wait:.0f} mp alatt"
+                        )
+                    self._cond.wait(min(wait, deadline - now))
+                heapq.heappop(self._queue)
+                ticket.granted = True
+                self.bucket.take()
+                self._in_flight += 1
+                self.granted[ticket.priority] = self.granted.get(ticket.priority, 0) + 1
+            finally:
+                if not ticket.granted:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                # a sor eleje megváltozhatott: a következő várakozó újraértékel
+                self._cond.notify_all()
+
+        observe(
+            f"scheduler.{self.name}.wait.{PRIORITY_NAMES.get(ticket.priority, ticket.priority)}",
+            (time.monotonic() - started) * 1000.0,
+        )
+
+    def release(self, throttled: bool = False) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                # multiplicative decrease + szünet a bucketben
+                self.throttle_count += 1
+                self.limit = max(1.0, self.limit / 2.0)
+                self.bucket.paused_until = time.monotonic() + self._cooldown
+                self._cooldown = min(COOLDOWN_MAX, self._cooldown * 2.0)
+                inc(f"scheduler.{self.name}.throttled")
+            else:
+                # additive increase: kb. +1 hely minden "limit" sikeres hívás után
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+                self._cooldown = COOLDOWN_BASE
+            self._cond.notify_all()
+
+    def abort(self, event: threading.Event) -> None:
+        """Az event-tel várakozó acquire hívások felébresztése és megszakítása."""
+        with self._cond:
+            event.set()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, level: Optional[int] = None):
+        self.acquire(level)
+        slot = Slot()
+        try:
+            yield slot
+        finally:
+            self.release(slot.was_throttled)
+
+    def promote(self, tag: Hashable, level: int = INTERACTIVE) -> int:
+        """A tag-gel várakozó (pl. előtöltés) hívások előléptetése; visszatér: hány."""
+        with self._cond:
+            promoted = 0
+            for ticket in self._queue:
+                if ticket.tag == tag and ticket.priority > level:
+                    ticket.priority = level
+                    promoted += 1
+            if promoted:
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+            return promoted
+
+    # --- állapot ---
+    def stats(self) -> dict:
+        with self._cond:
+            waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+            for ticket in self._queue:
+                waiting[PRIORITY_NAMES.get(ticket.priority, str(ticket.priority))] += 1
+            return {
+                "queued": waiting,
+                "in_flight": self._in_flight,
+                "limit": round(self.limit, 2),
+                "max_concurrency": self.max_concurrency,
+                "tokens": round(min(self.bucket.burst, self.bucket.tokens), 2),
+                "granted": {PRIORITY_NAMES[p]: n for p, n in self.granted.items()},
+                "throttled": self.throttle_count,
+                "timeouts": self.timeouts,
+            }
+
+
+def _env_number(name: str, default, cast):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+_schedulers: Dict[str, ApiScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(api: str) -> ApiScheduler:
+    """Folyamatszintű ütemező az adott API-hoz (első híváskor jön létre)."""
+    scheduler = _schedulers.get(api)
+    if scheduler is not None:
+        return scheduler
+    with _schedulers_lock:
+        scheduler = _schedulers.get(api)
+        if scheduler is None:
+            rate, burst, concurrency = API_LIMITS.get(api, API_LIMITS["google"])
+            prefix = f"TG_{api.upper()}_"
+            scheduler = _schedulers[api] = ApiScheduler(
+                api,
+                rate=_env_number(prefix + "RATE", rate, float),
+                burst=_env_number(prefix + "BURST", burst, int),
+                max_concurrency=_env_number(prefix + "CONCURRENCY", concurrency, int),
+            )
+    return scheduler
+
+
+def format_stats() -> str:
+    """Ember által olvasható összesítő (a Metrikák fülhöz)."""
+    with _schedulers_lock:
+        schedulers = sorted(_schedulers.items())
+    if not schedulers:
+        return ""
+    lines = [f"{'ütemező':<10}{'sor (int/háttér)':>18}{'fut':>6}{'korlát':>9}{'token':>8}{'429':>6}"]
+    for name, scheduler in schedulers:
+        s = scheduler.stats()
+        queued = f"{s['queued']['interactive']}/{s['queued']['background']}"
+        lines.append(
+            f"{name:<10}{queued:>18}{s['in_flight']:>6}"
+            f"{s['limit']:>6.1f}/{s['max_concurrency']:<2}{s['tokens']:>8.1f}{s['throttled']:>6}"
+        )
+    return "\n".join(lines)
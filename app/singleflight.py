@@ -0,0 +1,63 @@
+"""
+Azonos, egyszerre futó kérések összevonása (single-flight).
+
+Ha ugyanarra a kulcsra már fut egy hívás, a további hívók nem indítanak
+újat, hanem megvárják és megkapják ugyanazt az eredményt (vagy kivételt).
+A kulcs a hívás végeztével felszabadul – ez nem cache, csak a párhuzamos
+duplikátumokat szűri ki (dupla kattintás, ismétlődő sorok kötegelt módban).
+
+    _routes = SingleFlight("route")
+    info = _routes.do(key, client.get_route_info, origin, destination, mode)
+"""
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable
+
+from app.metrics import inc
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.calls = 0   # ténylegesen elindított hívások
+        self.saved = 0   # megspórolt (másik hívásra ráültetett) hívások
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+            else:
+                self.saved += 1
+
+        if not leader:
+            inc(f"singleflight.{self.name}.saved")
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "saved": self.saved,
+                "in_flight": len(self._in_flight),
+            }
@@ -0,0 +1,81 @@
+"""
+Indulási időmérés (hidegindítás követése a kioszk gépeken).
+
+    python main.py --startup-report
+
+Import idők és az első kirajzolásig (first paint) eltelt idő a main.py
+indulásától mérve. Ha a TG_STARTUP_REPORT_FILE környezeti változó be van
+állítva, minden indítás egy JSON sort is hozzáfűz ahhoz a fájlhoz.
+Ez a modul szándékosan nem importál semmi nehezet (Qt-t csak függvényen belül).
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+_T0 = time.perf_counter()
+
+_imports = []  # (modul, másodperc)
+_marks = []    # (esemény, másodperc az induláshoz képest)
+
+
+@contextmanager
+def timed_import(label: str):
+    """Egy import (vagy importcsoport) idejének mérése."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _imports.append((label, time.perf_counter() - started))
+
+
+def mark(label: str) -> None:
+    """Mérföldkő rögzítése (pl. 'window_created', 'first_paint')."""
+    _marks.append((label, time.perf_counter() - _T0))
+
+
+def report_data() -> dict:
+    return {
+        "timestamp": time.time(),
+        "imports_ms": {label: round(sec * 1000.0, 2) for label, sec in _imports},
+        "marks_ms": {label: round(sec * 1000.0, 2) for label, sec in _marks},
+    }
+
+
+def format_report() -> str:
+    lines = ["=== Indulási idők ==="]
+    for label, sec in _imports:
+        lines.append(f"  import {label:<28} {sec * 1000.0:8.1f} ms")
+    for label, sec in _marks:
+        lines.append(f"  {label:<35} {sec * 1000.0:8.1f} ms")
+    return "\n".join(lines)
+
+
+def emit_report(to_stderr: bool) -> None:
+    if to_stderr:
+        print(format_report(), file=sys.stderr)
+
+    path = os.getenv("TG_STARTUP_REPORT_FILE")
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report_data()) + "\n")
+
+
+def watch_first_paint(widget, callback) -> None:
+    """
+    callback() hívása a widget első Paint eseménye után (egyszer).
+    Eseményszűrővel figyeljük, így a mérés nem módosítja a widget osztályát.
+    """
+    from PySide6.QtCore import QEvent, QObject, QTimer
+
+    class _FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                widget.removeEventFilter(self)
+                # a Paint esemény feldolgozása után jelezzünk
+                QTimer.singleShot(0, callback)
+            return False
+
+    watcher = _FirstPaintFilter(widget)
+    widget.installEventFilter(watcher)
@@ -0,0 +1,138 @@
+"""
+Indulási idő keresés: melyik indulással a legrövidebb az út?
+
+A következő horizon_h órát step_min perces időrésekre bontjuk, de nem
+kérdezünk le minden rést:
+1. durva rács: minden coarse_every-edik rés (15 perc / 4 = óránként)
+2. finomítás: a legjobb helyi minimumok körül feleződő lépésközzel
+   (2 rés, majd 1 rés), amíg a szomszédos rések is ki nem derülnek
+24 óra / 15 perc (96 rés) így kb. 30–35 lekérés 96 helyett.
+
+A lekérések korlátos párhuzamossággal, háttér prioritással mennek (app.scheduler),
+a résenkénti eredmény a route cache-ben marad, így egy ismételt keresés
+(pl. más horizonttal) a már ismert réseket nem kérdezi újra.
+Autónál a forgalommal számolt idő (duration_in_traffic), tömegközlekedésnél
+a kapott menetrend menetideje számít.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from app.metrics import inc
+from app.route_info import RouteInfo
+from app.scheduler import BACKGROUND, priority
+
+SWEEP_STEP_MIN = 15
+SWEEP_HORIZON_H = 24
+COARSE_EVERY = 4
+REFINE_MINIMA = 2
+MAX_PARALLEL = 4
+
+
+class SweepPoint(NamedTuple):
+    departure: int       # Unix időbélyeg
+    duration_min: float  # autónál forgalommal
+    info: RouteInfo
+    cached: bool
+
+
+def departure_slots(start: Optional[float] = None, horizon_h: float = SWEEP_HORIZON_H,
+                    step_min: int = SWEEP_STEP_MIN) -> List[int]:
+    """A start utáni első kerek időponttól step_min percenként, horizon_h órán át."""
+    step = int(step_min * 60)
+    start = time.time() if start is None else start
+    first = (int(start) // step + 1) * step
+    return [first + i * step for i in range(max(1, int(horizon_h * 3600 // step)))]
+
+
+def _probe(origin: str, destination: str, travelmode: str, departure: int, use_cache: bool) -> SweepPoint:
+    from app.google_routes import get_cached_route_info, get_route_info
+
+    info = get_cached_route_info(origin, destination, travelmode, departure) if use_cache else None
+    cached = info is not None
+    if info is None:
+        with priority(BACKGROUND):
+            info = get_route_info(origin, destination, travelmode, use_cache, departure, refresh=True)
+    duration = info.traffic_duration_min if info.traffic_duration_min is not None else info.duration_min
+    return SweepPoint(departure, duration, info, cached)
+
+
+def _local_minima(results: Dict[int, Optional[float]], limit: int) -> List[int]:
+    """A kiértékelt rések közül a (kiértékelt szomszédaikhoz képest) legjobb limit minimum."""
+    known = sorted(i for i, value in results.items() if value is not None)
+    minima = []
+    for pos, i in enumerate(known):
+        left = results[known[pos - 1]] if pos > 0 else float("inf")
+        right = results[known[pos + 1]] if pos + 1 < len(known) else float("inf")
+        if results[i] <= left and results[i] <= right:
+            minima.append(i)
+    return sorted(minima, key=results.__getitem__)[:limit]
+
+
+def iter_departure_sweep(
+    origin: str,
+    destination: str,
+    travelmode: str = "driving",
+    start: Optional[float] = None,
+    horizon_h: float = SWEEP_HORIZON_H,
+    step_min: int = SWEEP_STEP_MIN,
+    coarse_every: int = COARSE_EVERY,
+    max_parallel: int = MAX_PARALLEL,
+    minima: int = REFINE_MINIMA,
+    use_cache: bool = True,
+) -> Iterator[SweepPoint]:
+    """
+    A kiértékelt rések érkezési sorrendben (a GUI így folyamatosan rajzolhat).
+    A nem elérhető rések (pl. éjjel nincs járat) kimaradnak; ha egy sem
+    sikerül, az utolsó hiba továbbmegy.
+    """
+    from app.google_routes import RouteError
+
+    slots = departure_slots(start, horizon_h, step_min)
+    n = len(slots)
+    coarse_every = max(1, coarse_every)
+    results: Dict[int, Optional[float]] = {}
+    last_error: Optional[RouteError] = None
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_parallel))
+    try:
+        def run(indices) -> Iterator[SweepPoint]:
+            nonlocal last_error
+            pending = {
+                pool.submit(_probe, origin, destination, travelmode, slots[i], use_cache): i
+                for i in sorted(set(indices))
+                if 0 <= i < n and i not in results
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    try:
+                        point = future.result()
+                    except RouteError as e:
+                        last_error = e
+                        results[i] = None
+                        inc("sweep.slot_errors")
+                        continue
+                    results[i] = point.duration_min
+                    yield point
+
+        coarse = list(range(0, n, coarse_every))
+        if coarse[-1] != n - 1:
+            coarse.append(n - 1)
+        yield from run(coarse)
+
+        half = coarse_every // 2
+        while half >= 1:
+            best = _local_minima(results, minima)
+            yield from run([i + d for i in best for d in (-half, half)])
+            half //= 2
+        # utolsó simítás: a legjobb minimumok közvetlen szomszédai is ismertek legyenek
+        yield from run([i + d for i in _local_minima(results, minima) for d in (-1, 1)])
+
+        if not any(value is not None for value in results.values()):
+            raise last_error or RouteError("Egyik indulási időre sem található útvonal.")
+    finally:
+        # leállításkor (generátor bezárása) a még el nem indult lekérések elmaradnak
+        pool.shutdown(wait=False, cancel_futures=True)
+
@@ -0,0 +1,141 @@
+"""
+Kompakt idősor az indulási idő kereséshez (app.sweep): vízszintesen az
+indulás, függőlegesen a menetidő. A pontok érkezés közben adódnak hozzá,
+a legjobb indulás kiemelve.
+"""
+import bisect
+import time
+from typing import List, Optional
+
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen
+from PySide6.QtWidgets import QWidget
+
+from app.sweep import SweepPoint
+
+MARGIN_LEFT = 48
+MARGIN_RIGHT = 12
+MARGIN_TOP = 24
+MARGIN_BOTTOM = 26
+
+
+def _departure(point: SweepPoint) -> int:
+    # csak indulás szerint: azonos indulásnál a teljes tuple a RouteInfo-ig hasonlítana
+    return point.departure
+
+
+def _hhmm(epoch: float) -> str:
+    return time.strftime("%H:%M", time.localtime(epoch))
+
+
+class DepartureSweepChart(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(300, 180)
+        self._points: List[SweepPoint] = []  # indulás szerint rendezve
+        self._span = None                    # (első, utolsó) rés – a tengely ehhez igazodik
+
+    def set_span(self, first: int, last: int) -> None:
+        self._span = (first, max(last, first + 1))
+        self.update()
+
+    def set_points(self, points) -> None:
+        self._points = sorted(points, key=_departure)
+        self.update()
+
+    def add_point(self, point: SweepPoint) -> None:
+        bisect.insort(self._points, point, key=_departure)
+        self.update()
+
+    def clear(self) -> None:
+        self._points = []
+        self._span = None
+        self.update()
+
+    @property
+    def point_count(self) -> int:
+        return len(self._points)
+
+    @property
+    def best(self) -> Optional[SweepPoint]:
+        if not self._points:
+            return None
+        return min(self._points, key=lambda p: (p.duration_min, p.departure))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        if not self._points:
+            painter.setPen(QColor("#667788"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Még nincs kiértékelt indulási idő.")
+            painter.end()
+            return
+
+        plot = QRectF(
+            MARGIN_LEFT, MARGIN_TOP,
+            max(1, self.width() - MARGIN_LEFT - MARGIN_RIGHT),
+            max(1, self.height() - MARGIN_TOP - MARGIN_BOTTOM),
+        )
+        t0, t1 = self._span or (self._points[0].departure, max(self._points[-1].departure, self._points[0].departure + 1))
+        durations = [p.duration_min for p in self._points]
+        lo, hi = min(durations), max(durations)
+        pad = max((hi - lo) * 0.1, 1.0)
+        lo, hi = max(0.0, lo - pad), hi + pad
+
+        def to_screen(point: SweepPoint) -> QPointF:
+            x = plot.left() + (point.departure - t0) / (t1 - t0) * plot.width()
+            y = plot.bottom() - (point.duration_min - lo) / (hi - lo) * plot.height()
+            return QPointF(x, y)
+
+        # tengelyek: óránkénti (sűrűn 3 óránkénti) felirat, min / max menetidő
+        painter.setPen(QPen(QColor("#cfd9e2"), 1))
+        painter.drawRect(plot)
+        hours = (t1 - t0) / 3600.0
+        label_every = 3600 * (1 if hours <= 8 else 3 if hours <= 24 else 6)
+        painter.setPen(QColor("#556677"))
+        tick = (t0 // 3600 + 1) * 3600
+        while tick <= t1:
+            x = plot.left() + (tick - t0) / (t1 - t0) * plot.width()
+            painter.drawLine(QPointF(x, plot.bottom()), QPointF(x, plot.bottom() + 3))
+            if tick % label_every == 0:
+                painter.drawText(QRectF(x - 20, plot.bottom() + 4, 40, 16), Qt.AlignCenter, _hhmm(tick))
+            tick += 3600
+        for value in (lo, hi):
+            y = plot.bottom() - (value - lo) / (hi - lo) * plot.height()
+            painter.drawText(QRectF(0, y - 8, MARGIN_LEFT - 4, 16), Qt.AlignRight | Qt.AlignVCenter, f"{value:.0f} p")
+
+        # idősor: vonal + pontok (a cache-ből jöttek halványabbak)
+        screen = [to_screen(p) for p in self._points]
+        path = QPainterPath()
+        path.moveTo(screen[0])
+        for pos in screen[1:]:
+            path.lineTo(pos)
+        painter.setPen(QPen(QColor("#1565c0"), 2))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(path)
+
+        painter.setPen(Qt.NoPen)
+        for point, pos in zip(self._points, screen):
+            painter.setBrush(QColor("#90a4ae" if point.cached else "#1565c0"))
+            painter.drawEllipse(pos, 2.5, 2.5)
+
+        best = self.best
+        pos = to_screen(best)
+        painter.setPen(QPen(QColor("white"), 2))
+        painter.setBrush(QColor("#2e7d32"))
+        painter.drawEllipse(pos, 5, 5)
+        painter.setPen(QColor("#2e7d32"))
+        label = f"{_hhmm(best.departure)} – {best.duration_min:.0f} perc"
+        align = Qt.AlignLeft if pos.x() < plot.center().x() else Qt.AlignRight
+        left = pos.x() + 8 if align == Qt.AlignLeft else pos.x() - 168
+        painter.drawText(QRectF(left, pos.y() - 20, 160, 16), align | Qt.AlignVCenter, label)
+
+        painter.setPen(QColor("#556677"))
+        painter.drawText(
+            QRectF(MARGIN_LEFT, 2, plot.width(), MARGIN_TOP - 4),
+            Qt.AlignRight | Qt.AlignVCenter,
+            f"{len(self._points)} indulási idő kiértékelve",
+        )
+        painter.end()
@@ -0,0 +1,170 @@
+import itertools
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class WorkerSignals(QObject):
+    """A QRunnable nem QObject, ezért a jelzések külön objektumban vannak."""
+    progress = Signal(int, object)  # task_id, részeredmény (pl. token)
+    finished = Signal(int, object)  # task_id, eredmény
+    failed = Signal(int, object)    # task_id, kivétel
+
+
+class Worker(QRunnable):
+    """Egy blokkoló függvényhívás futtatása a szálkészletben."""
+
+    def __init__(self, task_id: int, fn: Callable, *args, **kwargs):
+        super().__init__()
+        # a Python oldal tartja a referenciát, a Qt ne törölje futás után
+        self.setAutoDelete(False)
+        self.task_id = task_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.task_id, e)
+        else:
+            self.signals.finished.emit(self.task_id, result)
+
+
+class StreamWorker(Worker):
+    """
+    Generátor futtatása: minden elemét progress jelzésként küldi a GUI-nak.
+    Visszavonáskor (cancelled) a generátort idő előtt lezárja.
+    """
+
+    def run(self):
+        try:
+            stream = self.fn(*self.args, **self.kwargs)
+            try:
+                for item in stream:
+                    if self.cancelled:
+                        break
+                    self.signals.progress.emit(self.task_id, item)
+            finally:
+                stream.close()
+        except Exception as e:
+            self.signals.failed.emit(self.task_id, e)
+        else:
+            self.signals.finished.emit(self.task_id, None)
+
+
+class TaskRunner(QObject):
+    """
+    Háttérszálas feladatfuttató a GUI-hoz.
+    - minden feladat egy "csatornához" tartozik (pl. "route", "ai")
+    - ugyanazon a csatornán az új kérés felülírja az előzőt: a régi eredményét eldobjuk
+    - az eredmény / hiba callback mindig a GUI szálon fut (queued signal)
+    """
+
+    def __init__(self, parent: Optional[QObject] = None, max_threads: int = 4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._tasks = {}    # task_id -> (worker, channel, on_result, on_error, on_chunk)
+        self._current = {}  # channel -> legutóbbi task_id
+
+    def submit(
+        self,
+        channel: str,
+        fn: Callable,
+        *args,
+        on_result: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        **kwargs,
+    ) -> int:
+        return self._start(Worker, channel, fn, args, kwargs, on_result, on_error, None)
+
+    def submit_stream(
+        self,
+        channel: str,
+        fn: Callable,
+        *args,
+        on_chunk: Optional[Callable] = None,
+        on_result: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        **kwargs,
+    ) -> int:
+        """Mint a submit, de fn generátor: az elemei on_chunk-ként érkeznek a GUI szálra."""
+        return self._start(StreamWorker, channel, fn, args, kwargs, on_result, on_error, on_chunk)
+
+    def _start(self, worker_cls, channel, fn, args, kwargs, on_result, on_error, on_chunk) -> int:
+        self.cancel(channel)
+
+        task_id = next(self._ids)
+        worker = worker_cls(task_id, fn, *args, **kwargs)
+        worker.signals.progress.connect(self._on_progress)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+
+        self._tasks[task_id] = (worker, channel, on_result, on_error, on_chunk)
+        self._current[channel] = task_id
+        self.pool.start(worker)
+        return task_id
+
+    def cancel(self, channel: str) -> None:
+        """
+        A csatorna aktuális feladatának visszavonása.
+        Ha még nem indult el, kivesszük a sorból; ha már fut, az eredményét eldobjuk.
+        """
+        task_id = self._current.pop(channel, None)
+        if task_id is None:
+            return
+        task = self._tasks.get(task_id)
+        if task is None:
+            return
+        worker = task[0]
+        if self.pool.tryTake(worker):
+            del self._tasks[task_id]
+        else:
+            worker.cancelled = True
+
+    def is_busy(self, channel: str) -> bool:
+        return channel in self._current
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def shutdown(self) -> None:
+        """Ablak bezárásakor: várakozó feladatok törlése, futók eredményének eldobása."""
+        for channel in list(self._current):
+            self.cancel(channel)
+        self.pool.clear()
+
+    def _take(self, task_id: int):
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return None
+        _worker, channel, on_result, on_error, _on_chunk = task
+        if self._current.get(channel) != task_id:
+            return None  # felülírt / visszavont kérés
+        del self._current[channel]
+        return on_result, on_error
+
+    @Slot(int, object)
+    def _on_progress(self, task_id: int, chunk):
+        task = self._tasks.get(task_id)
+        if task is None or self._current.get(task[1]) != task_id:
+            return
+        if task[4] is not None:
+            task[4](chunk)
+
+    @Slot(int, object)
+    def _on_finished(self, task_id: int, result):
+        callbacks = self._take(task_id)
+        if callbacks and callbacks[0] is not None:
+            callbacks[0](result)
+
+    @Slot(int, object)
+    def _on_failed(self, task_id: int, error):
+        callbacks = self._take(task_id)
+        if callbacks and callbacks[1] is not None:
+            callbacks[1](error)
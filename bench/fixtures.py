@@ -0,0 +1,182 @@
+"""
+Valósághű (méretben és szerkezetben) Google Directions / Distance Matrix és
+HuggingFace chat-completion válaszok generálása a benchmarkokhoz.
+Determinisztikus: ugyanazokkal a paraméterekkel mindig ugyanazt a payloadot adja.
+"""
+import json
+import random
+import time
+
+import numpy as np
+
+from app.polyline import encode_polyline
+
+_WORDS = (
+    "Turn left onto Váci út Continue straight Keep right at the fork "
+    "Merge onto M1 Take the exit toward Wien Slight right Destination will be on the left"
+).split()
+
+
+def _polyline(rng: random.Random, length: int) -> str:
+    # a valódi encoded polyline-hoz hasonló karakterkészlet és hossz
+    return "".join(chr(rng.randint(63, 126)) for _ in range(length))
+
+
+def route_path(n_points: int, seed: int = 1) -> np.ndarray:
+    """Kanyargós [lat, lon] pontsor Budapest és Róma között (a térképes méréshez)."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0.0, 1.0, n_points)[:, None]
+    line = (1 - t) * np.array([47.4979, 19.0402]) + t * np.array([41.9028, 12.4964])
+    # ~10 m-es lépésekből álló véletlen bolyongás, a két végén rögzítve
+    walk = np.cumsum(rng.normal(0.0, 0.0001, size=(n_points, 2)), axis=0)
+    walk -= t * walk[-1]
+    return line + walk
+
+
+def route_polyline(n_points: int, seed: int = 1) -> str:
+    return encode_polyline(route_path(n_points, seed))
+
+
+def _instructions(rng: random.Random) -> str:
+    words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 12)))
+    return f"<b>{words}</b><div style=\"font-size:0.9em\">{rng.choice(_WORDS)}</div>"
+
+
+def _value(text_unit: str, value: int) -> dict:
+    return {"text": f"{value} {text_unit}", "value": value}
+
+
+def _step(rng: random.Random, travel_mode: str, transit: bool) -> dict:
+    step = {
+        "distance": _value("m", rng.randint(50, 40000)),
+        "duration": _value("s", rng.randint(10, 3600)),
+        "end_location": {"lat": rng.uniform(35, 60), "lng": rng.uniform(-5, 30)},
+        "start_location": {"lat": rng.uniform(35, 60), "lng": rng.uniform(-5, 30)},
+        "html_instructions": _instructions(rng),
+        "polyline": {"points": _polyline(rng, rng.randint(40, 400))},
+        "travel_mode": travel_mode,
+    }
+    if transit:
+        step["transit_details"] = {
+            "arrival_stop": {"name": f"Megálló {rng.randint(1, 999)}",
+                             "location": {"lat": 47.5, "lng": 19.0}},
+            "departure_stop": {"name": f"Megálló {rng.randint(1, 999)}",
+                               "location": {"lat": 47.4, "lng": 19.1}},
+            "arrival_time": {"text": "14:35", "time_zone": "Europe/Budapest", "value": 1700000000},
+            "departure_time": {"text": "12:05", "time_zone": "Europe/Budapest", "value": 1699990000},
+            "headsign": "Wien Hauptbahnhof",
+            "line": {
+                "agencies": [{"name": "MÁV-START", "url": "https://www.mavcsoport.hu/"}],
+                "name": f"RJX {rng.randint(40, 69)}",
+                "short_name": "RJX",
+                "vehicle": {"icon": "//maps.gstatic.com/rail2.png", "name": "Train", "type": "HEAVY_RAIL"},
+            },
+            "num_stops": rng.randint(1, 30),
+        }
+        # a transit lépéseknek gyalogos al-lépései is vannak
+        step["steps"] = [_step(rng, "WALKING", False) for _ in range(rng.randint(0, 3))]
+    return step
+
+
+def directions_payload(travelmode: str = "driving", n_steps: int = 60, seed: int = 1, n_routes: int = 1) -> dict:
+    """
+    n_routes útvonal (alternatives=true-hoz), mindegyik egy leg, n_steps lépéssel
+    (transit módban transit_details-szel). Az alternatívák hosszabbak, de
+    részben gyorsabbak, hogy a rangsor ne legyen triviális.
+    """
+    rng = random.Random(seed)
+    transit = travelmode == "transit"
+    routes = []
+    for r in range(n_routes):
+        steps = [
+            _step(rng, "TRANSIT" if transit and i % 3 == 1 else travelmode.upper(), transit and i % 3 == 1)
+            for i in range(n_steps)
+        ]
+        leg = {
+            "distance": _value("m", 1250000 + 60000 * r),
+            "duration": _value("s", 45000 - 1500 * r * (-1) ** r),
+            "end_address": "Róma, Olaszország",
+            "start_address": "Budapest, Magyarország",
+            "end_location": {"lat": 41.9028, "lng": 12.4964},
+            "start_location": {"lat": 47.4979, "lng": 19.0402},
+            "steps": steps,
+            "traffic_speed_entry": [],
+            "via_waypoint": [],
+        }
+        if travelmode == "driving":
+            leg["duration_in_traffic"] = _value("s", 47000 - 1500 * r * (-1) ** r)
+        routes.append({
+            "bounds": {"northeast": {"lat": 47.5, "lng": 19.1}, "southwest": {"lat": 41.9, "lng": 12.4}},
+            "copyrights": "Map data ©2024",
+            "legs": [leg],
+            "overview_polyline": {"points": route_polyline(700, seed + r)},
+            "summary": ("E65", "E71 és A1", "E59 és A13", "E66")[r % 4],
+            "warnings": ["Útdíjas szakaszokat tartalmaz."],
+            "waypoint_order": [],
+        })
+    return {"geocoded_waypoints": [], "routes": routes, "status": "OK"}
+
+
+def distance_matrix_payload(n_origins: int, n_destinations: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    return {
+        "destination_addresses": [f"Cél {j}" for j in range(n_destinations)],
+        "origin_addresses": [f"Indulás {i}" for i in range(n_origins)],
+        "rows": [
+            {"elements": [
+                {
+                    "distance": _value("m", rng.randint(1000, 3000000)),
+                    "duration": _value("s", rng.randint(600, 100000)),
+                    "status": "OK",
+                }
+                for _ in range(n_destinations)
+            ]}
+            for _ in range(n_origins)
+        ],
+        "status": "OK",
+    }
+
+
+ANSWER_TEXT = (
+    "1. **Tromsø, Norvégia** – Fjordok, hegyek és sarki fény; drónozáshoz látványos.\n"
+    "2. **Bergen, Norvégia** – Színes kikötő, közeli fjordtúrák, enyhébb klíma.\n"
+    "3. **Lofoten-szigetek** – Drámai sziklák és halászfalvak, nyáron éjféli nap.\n"
+    "4. **Reykjavík, Izland** – Vízesések, gejzírek és vulkáni tájak a közelben.\n"
+) * 3
+
+
+def chat_completion_payload(model: str = "stub-model") -> dict:
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "system_fingerprint": "bench",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": ANSWER_TEXT},
+            "logprobs": None,
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 120, "completion_tokens": 600, "total_tokens": 720},
+    }
+
+
+def chat_stream_events(model: str = "stub-model", chunk_chars: int = 6):
+    """SSE események (bytes), ahogy egy streamelt chat-completion érkezik."""
+    for i in range(0, len(ANSWER_TEXT), chunk_chars):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "system_fingerprint": "bench",
+            "choices": [{
+                "index": 0,
+                "delta": {"role": "assistant", "content": ANSWER_TEXT[i:i + chunk_chars]},
+                "logprobs": None,
+                "finish_reason": None,
+            }],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+    yield b"data: [DONE]\n\n"
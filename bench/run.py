@@ -0,0 +1,205 @@
+"""
+Offline benchmark: feldolgozás, költségszámítás és teljes kérés-útvonalak
+helyi stub szerverekkel (Google Maps + HuggingFace helyett).
+
+    python -m bench.run --latency-ms 20 --iterations 200 -o bench_results.json
+
+Minden mérésnél: p50 / p95 / p99 késleltetés, áteresztőképesség (op/s) és
+műveletenkénti memóriafoglalás (tracemalloc csúcs). Az eredmény JSON fájlba
+kerül, így commitok között összehasonlítható.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+# a benchmark ne a felhasználó cache-ét használja / töltse
+os.environ.setdefault("TG_CACHE_DIR", tempfile.mkdtemp(prefix="tg_bench_"))
+# a kliens / feldolgozás sebességét mérjük, nem a kvóta ütemezőt
+for _api in ("GOOGLE", "HF"):
+    os.environ.setdefault(f"TG_{_api}_RATE", "1000000")
+    os.environ.setdefault(f"TG_{_api}_BURST", "1000000")
+    os.environ.setdefault(f"TG_{_api}_CONCURRENCY", "64")
+
+import numpy as np
+
+from app import ai_recommend
+from app.airports import estimate_flight
+from app.alternatives import rank_routes
+from app.cost_model import car_cost, flight_cost, transit_cost
+from app.google_routes import RoutesClient, _parse_route, _parse_routes
+from app.polyline import clip_to_view, decode_polyline, project, simplify
+from bench import fixtures
+from bench.stub_server import StubServer
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def measure(fn, iterations: int, concurrency: int = 1, warmup: int = 3, alloc_samples: int = 20) -> dict:
+    """fn() futtatása iterations-ször (concurrency szálon), statisztikákkal."""
+    for _ in range(warmup):
+        fn()
+
+    def timed(_):
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
+
+    wall_started = time.perf_counter()
+    if concurrency <= 1:
+        latencies = [timed(i) for i in range(iterations)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, range(iterations)))
+    wall = time.perf_counter() - wall_started
+
+    # memóriafoglalás: műveletenkénti tracemalloc csúcs (külön, szekvenciális futás)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(alloc_samples, iterations)):
+            tracemalloc.reset_peak()
+            base, _peak = tracemalloc.get_traced_memory()
+            fn()
+            _current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "p50_ms": _percentile(latencies, 50) * 1000.0,
+        "p95_ms": _percentile(latencies, 95) * 1000.0,
+        "p99_ms": _percentile(latencies, 99) * 1000.0,
+        "mean_ms": statistics.fmean(latencies) * 1000.0,
+        "throughput_ops": iterations / wall if wall > 0 else float("inf"),
+        "alloc_peak_kib": statistics.median(peaks) / 1024.0 if peaks else 0.0,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_scenarios(server: StubServer, args) -> dict:
+    """név → (függvény, párhuzamosság)"""
+    driving_body = server.httpd.directions_bodies["driving"]
+    transit_body = server.httpd.directions_bodies["transit"]
+    alternatives_body = server.httpd.directions_bodies["driving+alternatives"]
+
+    distances = np.random.default_rng(1).uniform(10.0, 12000.0, size=args.vector_size)
+    consumption = np.random.default_rng(2).uniform(4.0, 12.0, size=args.vector_size)
+
+    client = RoutesClient(api_key="bench", base_url=server.maps_base_url, max_retries=0)
+
+    os.environ["HF_BASE_URL"] = server.hf_base_url
+    os.environ["HF_API_TOKEN"] = "hf_bench"
+
+    long_polyline = fixtures.route_polyline(50_000)
+
+    def map_frame():
+        # egy kirajzolás teljes nagyításnál: dekódolás + vetítés + vágás + egyszerűsítés
+        points = project(decode_polyline(long_polyline))
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        tolerance = 0.5 * (x1 - x0) / 800.0
+        return [simplify(points[run], tolerance) for run in clip_to_view(points, x0, y0, x1, y1)]
+
+    def ai_first_token():
+        stream = ai_recommend.ask_travel_ai_stream("északi ország, drónozás", use_cache=False)
+        next(stream)
+        stream.close()
+
+    return {
+        "parse.directions_driving": (lambda: _parse_route(json.loads(driving_body), "driving"), 1),
+        "parse.directions_transit": (lambda: _parse_route(json.loads(transit_body), "transit"), 1),
+        "parse.directions_alternatives_ranked": (
+            lambda: rank_routes(_parse_routes(json.loads(alternatives_body), "driving"), "driving", "score"), 1
+        ),
+        "cost.scalar_all_modes": (lambda: (
+            flight_cost(1234.5), transit_cost(1234.5), car_cost(1234.5, 7.0, 650.0)
+        ), 1),
+        f"cost.vector_{args.vector_size}": (lambda: (
+            flight_cost(distances), transit_cost(distances), car_cost(distances, consumption, 650.0)
+        ), 1),
+        "flight.offline_estimate": (lambda: estimate_flight("Budapest", "47.5, -122.3"), 1),
+        "map.decode_simplify_50k": (map_frame, 1),
+        "e2e.route_driving": (lambda: client.get_route_info("Budapest", "Róma", "driving"), 1),
+        "e2e.route_transit_concurrent": (
+            lambda: client.get_route_info("Budapest", "Wien", "transit"), args.concurrency
+        ),
+        "e2e.route_matrix_30x30": (
+            lambda: client.get_route_matrix([f"o{i}" for i in range(30)], [f"d{j}" for j in range(30)]), 1
+        ),
+        "e2e.ai_chat": (lambda: ai_recommend.ask_travel_ai("északi ország, drónozás", use_cache=False), 1),
+        "e2e.ai_stream_first_token": (ai_first_token, 1),
+        "e2e.ai_batch_8": (lambda: list(ai_recommend.ask_travel_ai_batch(
+            [f"északi ország, drónozás {i}" for i in range(8)], use_cache=False
+        )), 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub szerver késleltetése")
+    parser.add_argument("--token-delay-ms", type=float, default=0.0, help="késleltetés stream tokenenként")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--vector-size", type=int, default=100_000)
+    parser.add_argument("--only", help="csak az ezzel kezdődő nevű mérések (pl. 'parse.')")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with StubServer(latency_ms=args.latency_ms, token_delay_ms=args.token_delay_ms) as server:
+        for name, (fn, concurrency) in build_scenarios(server, args).items():
+            if args.only and not name.startswith(args.only):
+                continue
+            # a hálózatos méréseknél kevesebb iteráció is elég
+            iterations = args.iterations if not name.startswith("e2e.") else max(20, args.iterations // 4)
+            results[name] = measure(fn, iterations, concurrency)
+            r = results[name]
+            print(
+                f"{name:<34} p50 {r['p50_ms']:9.3f} ms  p95 {r['p95_ms']:9.3f} ms  "
+                f"p99 {r['p99_ms']:9.3f} ms  {r['throughput_ops']:10.1f} op/s  "
+                f"{r['alloc_peak_kib']:9.1f} KiB"
+            )
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "latency_ms": args.latency_ms,
+            "token_delay_ms": args.token_delay_ms,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[OK] Eredmények: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Helyi stub HTTP szerver a Google Maps és a HuggingFace API helyett.
+Beállítható késleltetéssel (latency_ms) válaszol, így hálózat és kvóta nélkül
+mérhető a teljes kérés-útvonal.
+
+    with StubServer(latency_ms=30) as server:
+        client = RoutesClient(api_key="bench", base_url=server.maps_base_url)
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench import fixtures
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, mint a valódi API-k
+    disable_nagle_algorithm = True  # különben a fejléc + törzs külön írása ~40 ms-ot késik
+
+    def log_message(self, format, *args):
+        pass  # ne szemetelje a benchmark kimenetét
+
+    def _delay(self):
+        latency = self.server.latency_ms
+        if latency > 0:
+            time.sleep(latency / 1000.0)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._delay()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path.endswith("/directions/json"):
+            mode = query.get("mode", ["driving"])[0]
+            if query.get("alternatives", ["false"])[0] == "true":
+                mode += "+alternatives"
+            body = self.server.directions_bodies.get(mode) or self.server.directions_bodies["driving"]
+            self._send(200, body)
+        elif url.path.endswith("/distancematrix/json"):
+            n_o = len(query.get("origins", [""])[0].split("|"))
+            n_d = len(query.get("destinations", [""])[0].split("|"))
+            body = json.dumps(fixtures.distance_matrix_payload(n_o, n_d)).encode("utf-8")
+            self._send(200, body)
+        else:
+            self._send(404, b'{"status": "NOT_FOUND"}')
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self._delay()
+
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self._send(404, b'{"error": "not found"}')
+            return
+
+        if not request.get("stream"):
+            self._send(200, json.dumps(fixtures.chat_completion_payload()).encode("utf-8"))
+            return
+
+        # SSE stream, darabonként (token_delay_ms késleltetéssel)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for event in fixtures.chat_stream_events():
+                if self.server.token_delay_ms > 0:
+                    time.sleep(self.server.token_delay_ms / 1000.0)
+                self.wfile.write(f"{len(event):X}\r\n".encode("ascii") + event + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # a kliens idő előtt lezárta a streamet (pl. első token mérése)
+            self.close_connection = True
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # a kliens oldali kapcsolatbontás (stream leállítás) nem hiba
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Háttérszálon futó stub szerver (context managerként is használható)."""
+
+    def __init__(self, latency_ms: float = 0.0, token_delay_ms: float = 0.0, transit_steps: int = 300):
+        self.httpd = _QuietServer(("127.0.0.1", 0), _Handler)
+        self.httpd.latency_ms = latency_ms
+        self.httpd.token_delay_ms = token_delay_ms
+        # előre szerializált válaszok: a szerver oldali JSON ne torzítsa a mérést
+        self.httpd.directions_bodies = {
+            "driving": json.dumps(fixtures.directions_payload("driving", 60)).encode("utf-8"),
+            "transit": json.dumps(fixtures.directions_payload("transit", transit_steps)).encode("utf-8"),
+            "driving+alternatives": json.dumps(
+                fixtures.directions_payload("driving", 60, n_routes=3)
+            ).encode("utf-8"),
+            "transit+alternatives": json.dumps(
+                fixtures.directions_payload("transit", transit_steps, n_routes=3)
+            ).encode("utf-8"),
+        }
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def maps_base_url(self) -> str:
+        return f"{self.base_url}/maps/api"
+
+    @property
+    def hf_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,12 +1,34 @@
 import sys
-from PySide6.QtWidgets import QApplication
-from app.main_window import MainWindow
+
+from app import startup
 
 
 def main():
-    app = QApplication(sys.argv)
+    # Parancssoros kötegelt mód: python main.py batch trips.csv (Qt nélkül)
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from app.cli import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    # --startup-report: indulási idők kiírása (import + első kirajzolás)
+    show_report = "--startup-report" in sys.argv
+    argv = [arg for arg in sys.argv if arg != "--startup-report"]
+
+    with startup.timed_import("PySide6.QtWidgets"):
+        from PySide6.QtWidgets import QApplication
+    with startup.timed_import("app.main_window"):
+        from app.main_window import MainWindow
+
+    app = QApplication(argv)
+    startup.mark("qapplication_created")
 
     window = MainWindow()
+    startup.mark("window_created")
+
+    def on_first_paint():
+        startup.mark("first_paint")
+        startup.emit_report(show_report)
+
+    startup.watch_first_paint(window, on_first_paint)
     window.show()
 
     sys.exit(app.exec())